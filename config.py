@@ -8,11 +8,115 @@ DRUGS_FILE = os.path.join(DATA_DIR, "drugs.csv")
 PUBMED_CSV_FILE = os.path.join(DATA_DIR, "pubmed.csv")
 CLINICAL_TRIALS_CSV_FILE = os.path.join(DATA_DIR, "clinical_trials.csv")
 PUBMED_JSON_FILE = os.path.join(DATA_DIR, "pubmed.json")
+# Synonymes des médicaments (noms commerciaux, sels...) : une ligne par forme
+# (colonnes atccode, synonym), attribuée au médicament de même atccode. Tous
+# les synonymes sont compilés dans le même automate que les noms ; None pour
+# ne détecter que les noms de drugs.csv
+DRUG_SYNONYMS_FILE = os.path.join(DATA_DIR, "drug_synonyms.csv")
+
+# Les chemins CSV ci-dessus peuvent aussi désigner un dossier ou un motif glob
+# (ex. "data/pubmed/*.csv") : les fichiers sont lus par INGEST_WORKERS threads,
+# par lots de INGEST_BATCH_FILES fichiers
+INGEST_WORKERS = 8
+INGEST_BATCH_FILES = 1000
+
+# Ces chemins peuvent aussi être des URL d'objets "gs://bucket/..." ou
+# "s3://bucket/..." (fichier, préfixe terminé par "/" ou motif glob), lues
+# avec pyarrow.fs : les petits objets sont téléchargés en parallèle, les gros
+# sont lus par plages sans copie sur disque. Serveur et
+# identifiants : variables d'environnement OBJECT_STORE_ENDPOINT (ex. un
+# émulateur local), AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY (clés HMAC, aussi
+# pour GCS), AWS_REGION ou OBJECT_STORE_TOKEN (jeton OAuth) et
+# OBJECT_STORE_TOKEN_EXPIRY (son expiration ISO 8601, relus à l'expiration)
+
+# Journalisation, configurée par les points d'entrée (src/main.py, benchmark)
+# et non à l'import des modules ; Airflow configure la sienne
+LOG_LEVEL = "INFO"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 
 # Dossiers de sortie
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output")
 LINK_GRAPH_DIR = os.path.join(OUTPUT_DIR, "link_graph")
 AD_HOC_DIR = os.path.join(OUTPUT_DIR, "ad_hoc")
+STATE_DIR = os.path.join(OUTPUT_DIR, "state")
+# Artefacts Arrow échangés entre les tâches du DAG, un sous-dossier par
+# exécution, supprimé par la dernière tâche (cleanup_artifacts)
+ARTIFACTS_DIR = os.path.join(OUTPUT_DIR, "artifacts")
+
+# Résultats des benchmarks (un fichier JSON par commit et par échelle, pour
+# comparer les exécutions d'un commit à l'autre)
+BENCHMARK_DIR = os.path.join(OUTPUT_DIR, "benchmarks")
+
+# Budgets de démarrage en secondes, vérifiés par `make startup` : import de
+# src/main.py (python -X importtime) et analyse du fichier du DAG dans un
+# process où Airflow est déjà importé, comme dans le scheduler. Ni l'un ni
+# l'autre ne doit importer pandas, numpy ou pyarrow
+STARTUP_BUDGETS = {"main_import": 0.15, "dag_parse": 0.5}
+
+# Métriques par étape (durée, CPU, pic de RSS, lignes, débit) écrites en JSON
+# et au format du textfile collector Prometheus (<nom>.prom) dans METRICS_DIR
+METRICS_ENABLED = True
+METRICS_DIR = os.path.join(OUTPUT_DIR, "metrics")
+
+# Profilage par étape (cProfile, tracemalloc et piles échantillonnées pour les
+# flamegraphs), un sous-dossier de PROFILE_DIR par exécution. La variable
+# d'environnement PIPELINE_PROFILE=1 l'active sans changer le code (ex. dans
+# Airflow) et PIPELINE_PROFILE_DIR remplace le dossier
+PROFILING_ENABLED = False
+PROFILE_DIR = os.path.join(OUTPUT_DIR, "profiles")
 
 OUTPUT_JSON_PATH = os.path.join(LINK_GRAPH_DIR, "drug_mentions_graph.json")
-AD_HOC_OUTPUT_PATH = os.path.join(AD_HOC_DIR, "most_mentioned_journal.json")
\ No newline at end of file
+AD_HOC_OUTPUT_PATH = os.path.join(AD_HOC_DIR, "most_mentioned_journal.json")
+
+# Formats de sortie du graphe : "json" (OUTPUT_JSON_PATH) et/ou "parquet"
+# (jeu de données partitionné façon Hive dans PARQUET_OUTPUT_DIR, par source
+# puis, en option, par "drug" ou "year" ; compression "snappy", "zstd", ...).
+# Le niveau "drug" est écrit dans des dossiers drug_key=<nom assaini>.
+OUTPUT_FORMATS = ["json"]
+PARQUET_OUTPUT_DIR = os.path.join(LINK_GRAPH_DIR, "parquet")
+PARQUET_PARTITION_BY = ["source"]
+PARQUET_COMPRESSION = "snappy"
+
+# Nombre de revues retenues par le classement ad hoc "top_journals_by_unique_drugs"
+AD_HOC_TOP_K = 10
+
+# Index du graphe (tableaux .npy mappés en mémoire) écrit à côté du JSON,
+# pour répondre aux requêtes sans relire le graphe complet
+GRAPH_INDEX_DIR = os.path.join(LINK_GRAPH_DIR, "index")
+
+# Index inversé des titres nettoyés (termes, revues et dates, tableaux .npy
+# mappés en mémoire), construit en mode batch après le nettoyage, pour
+# interroger les publications sans relancer le pipeline :
+# python src/main.py query --term X --journal Y --from A --to B
+TITLE_INDEX_ENABLED = True
+TITLE_INDEX_DIR = os.path.join(OUTPUT_DIR, "title_index")
+
+# Moteur de détection des mentions : "automaton" (un seul parcours par titre)
+# ou "regex" (une regex par médicament, chemin de référence)
+MATCHER_ENGINE = "automaton"
+
+# Parallélisme de la détection des mentions : nombre de processus (1 = série,
+# None = tous les cœurs) et nombre de titres envoyés à un processus par tâche
+MATCH_WORKERS = 1
+MATCH_CHUNK_SIZE = 50_000
+
+# Cache de l'automate compilé, indexé par une empreinte du dictionnaire des
+# médicaments (noms et synonymes) et de la version du moteur : les processus le
+# chargent au lieu de le recompiler (None = pas de cache)
+MATCHER_CACHE_DIR = os.path.join(OUTPUT_DIR, "matcher_cache")
+
+# Mode d'exécution du pipeline : "batch" (tout en mémoire), "streaming"
+# (lecture par blocs de STREAMING_CHUNK_SIZE lignes, mémoire bornée) ou
+# "incremental" (seules les publications nouvelles ou modifiées depuis la
+# dernière exécution sont traitées, d'après le manifeste de STATE_DIR)
+PIPELINE_MODE = "batch"
+STREAMING_CHUNK_SIZE = 100_000
+
+# Dédoublonnage des identifiants en mode streaming, hors mémoire : les blocs et
+# les identifiants sont écrits sur disque (dans DEDUP_SPILL_DIR, le dossier
+# temporaire du système si None), les identifiants répartis par hachage en
+# DEDUP_PARTITIONS partitions ; une partition de plus de DEDUP_PARTITION_ROWS
+# lignes est redécoupée, ce qui borne la mémoire utilisée
+DEDUP_PARTITIONS = 64
+DEDUP_PARTITION_ROWS = 5_000_000
+DEDUP_SPILL_DIR = None
@@ -8,40 +8,48 @@ import logging
 # Dynamically set the PROJECT_ROOT to the current directory (where this script is executed)
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
-# Add the root folder to the Python path (where config.py is located)
-sys.path.insert(0, project_root)
-
-# Add src directory to Python path
-sys.path.insert(0, os.path.join(project_root, "src"))
+# Add the root folder (where config.py is located) and the src directory to the
+# Python path, once: the scheduler parses this file again and again
+for path in (project_root, os.path.join(project_root, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
 
 # Import config from root folder
-from config import OUTPUT_JSON_PATH, AD_HOC_OUTPUT_PATH
-
-# Check if the src directory is in the path
-print("--------------------------------------------------------------------------")
-print("project_root:", project_root)
-print("PYTHONPATH:", os.getenv('PYTHONPATH', ''))
-print("src Path:", os.path.join(project_root, "src"))
-print("--------------------------------------------------------------------------")
-
-# Import required modules from data_transform
-from data_transform.data_processing import load_csv_files
-from data_transform.drug_mentions import find_mentions
-from data_transform.relationships import build_relationships
-from data_transform.data_cleaning import clean_data
-
-# Import required modules for ad-hoc analysis
-from ad_hoc.ad_hoc import get_top_journal_by_unique_drugs
-
-# Import the data_load module to save output
-from data_load.load import save_to_json
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
+from config import (
+    ARTIFACTS_DIR,
+    AD_HOC_DIR,
+    AD_HOC_TOP_K,
+    TITLE_INDEX_ENABLED,
+    TITLE_INDEX_DIR,
+    MATCHER_ENGINE,
+    MATCH_WORKERS,
+    MATCH_CHUNK_SIZE,
+    MATCHER_CACHE_DIR,
+    METRICS_ENABLED,
+    METRICS_DIR,
+    PROFILING_ENABLED,
+    PROFILE_DIR,
 )
 
+# Pipeline modules import pandas, numpy and pyarrow: they are imported inside
+# the task callables, so that parsing this file by the scheduler stays cheap
+# and has no side effect
+
+
+def task_metrics(task_id, run_id):
+    """Metrics of a task, profiling each stage when PIPELINE_PROFILE is set."""
+    from monitoring.metrics import PipelineMetrics
+    from monitoring.profiling import StageProfiler, profile_run_dir, profiling_enabled
+
+    profiler = None
+    # Read when the task runs, so the switch can be flipped in Airflow
+    if profiling_enabled(PROFILING_ENABLED):
+        profiler = StageProfiler(
+            os.path.join(profile_run_dir(PROFILE_DIR, run_id), task_id)
+        )
+    return PipelineMetrics(METRICS_ENABLED, labels={"task": task_id}, profiler=profiler)
+
+
 default_args = {
     "owner": "airflow",
     "depends_on_past": False,
@@ -61,66 +69,140 @@ with DAG(
 ) as dag:
 
     def extract_data(**context):
+        from data_transform.data_processing import load_input_files
+        from data_load.artifacts import run_artifact_dir, write_artifacts
+        from monitoring.metrics import count_rows
+
         logging.info("=" * 50)
         logging.info("1- Starting data extraction process")
         logging.info("Loading CSV files...")
 
-        loaded_dataframes = load_csv_files()
-        logging.info(f"Extracted {len(loaded_dataframes)} dataframes")
-
-        context['ti'].xcom_push(key='loaded_dataframes', value=loaded_dataframes)
+        metrics = task_metrics("extract_data", context['run_id'])
+        try:
+            with metrics.stage("load_input_files") as stage:
+                loaded_dataframes = load_input_files()
+                stage["rows_out"] = count_rows(loaded_dataframes)
+            logging.info(f"Extracted {len(loaded_dataframes)} dataframes")
+
+            # Only artifact paths and row counts go through XCom
+            run_dir = run_artifact_dir(ARTIFACTS_DIR, context['run_id'])
+            with metrics.stage("write_artifacts", count_rows(loaded_dataframes)):
+                artifacts = write_artifacts(
+                    loaded_dataframes, os.path.join(run_dir, "extract")
+                )
+            context['ti'].xcom_push(key='loaded_artifacts', value=artifacts)
+        finally:
+            metrics.save(METRICS_DIR, "dag_extract_data")
         logging.info("Data extraction completed successfully")
 
     def transform_data(**context):
+        from data_transform.data_processing import load_drug_synonyms
+        from data_transform.data_cleaning import clean_data
+        from data_transform.drug_mentions import find_mention_table
+        from data_load.artifacts import read_artifacts, run_artifact_dir, write_artifact
+        from data_load.title_index import build_title_index
+        from monitoring.metrics import count_rows
+
         logging.info("=" * 50)
         logging.info("2- Starting data transformation process")
 
         ti = context['ti']
-        loaded_dataframes = ti.xcom_pull(task_ids='extract_data', key='loaded_dataframes')
-        logging.info(f"Retrieved {len(loaded_dataframes)} dataframes from previous task")
-
-        logging.info("Cleaning data...")
-        cleaned_data_df = clean_data(loaded_dataframes)
-        logging.info("Data cleaning completed")
-
-        logging.info("3- Finding drug mentions in publications...")
-        mentions = find_mentions(
-            cleaned_data_df["PubMed"],
-            cleaned_data_df["ClinicalTrials"],
-            cleaned_data_df["Drugs"],
-        )
-        logging.info(f"Found {len(mentions)} drug mentions")
-
-        logging.info("4- Building relationships...")
-        relationships = build_relationships(mentions)
-        logging.info("Relationships built successfully")
-
-        ti.xcom_push(key='relationships', value=relationships)
+        metrics = task_metrics("transform_data", context['run_id'])
+        try:
+            artifacts = ti.xcom_pull(task_ids='extract_data', key='loaded_artifacts')
+            with metrics.stage("read_artifacts") as stage:
+                loaded_dataframes = read_artifacts(artifacts)
+                stage["rows_out"] = count_rows(loaded_dataframes)
+            logging.info(f"Retrieved {len(loaded_dataframes)} dataframes from previous task")
+
+            logging.info("Cleaning data...")
+            with metrics.stage("clean_data", count_rows(loaded_dataframes)) as stage:
+                cleaned_data_df = clean_data(loaded_dataframes)
+                stage["rows_out"] = count_rows(cleaned_data_df)
+            logging.info("Data cleaning completed")
+
+            if TITLE_INDEX_ENABLED:
+                with metrics.stage("build_title_index", count_rows(cleaned_data_df)):
+                    build_title_index(cleaned_data_df, TITLE_INDEX_DIR)
+
+            logging.info("3- Finding drug mentions in publications...")
+            publications = len(cleaned_data_df["PubMed"]) + len(
+                cleaned_data_df["ClinicalTrials"]
+            )
+            with metrics.stage("find_mentions", publications) as stage:
+                stage["match"] = {}
+                mentions = find_mention_table(
+                    cleaned_data_df["PubMed"],
+                    cleaned_data_df["ClinicalTrials"],
+                    cleaned_data_df["Drugs"],
+                    engine=MATCHER_ENGINE,
+                    workers=MATCH_WORKERS,
+                    chunk_size=MATCH_CHUNK_SIZE,
+                    stats=stage["match"] if metrics.enabled else None,
+                    synonyms_df=load_drug_synonyms(),
+                    cache_dir=MATCHER_CACHE_DIR,
+                )
+                stage["rows_out"] = len(mentions)
+            logging.info(f"Found {len(mentions)} drug mentions")
+
+            run_dir = run_artifact_dir(ARTIFACTS_DIR, context['run_id'])
+            with metrics.stage("write_artifacts", len(mentions)):
+                summary = write_artifact(
+                    mentions, os.path.join(run_dir, "transform", "mentions.arrow")
+                )
+            ti.xcom_push(key='mentions_artifact', value=summary)
+        finally:
+            metrics.save(METRICS_DIR, "dag_transform_data")
         logging.info("Data transformation completed successfully")
 
     def load_data(**context):
+        from data_transform.relationships import build_relationship_graph
+        from ad_hoc.analytics import run_analytics, save_analytics
+        from data_load.artifacts import read_artifact
+        from data_load.outputs import save_graph
+
         logging.info("=" * 50)
         logging.info("5- Starting data loading process")
 
         ti = context['ti']
-        relationships = ti.xcom_pull(task_ids='transform_data', key='relationships')
-        logging.info(f"Retrieved relationships data from previous task")
-
-        logging.info(f"6- Saving final JSON output to {OUTPUT_JSON_PATH}...")
-        print(f"6- Saving final JSON output to {OUTPUT_JSON_PATH}...")
-        save_to_json(relationships, OUTPUT_JSON_PATH)
-        logging.info("JSON output saved successfully")
-
-        logging.info("7- Generating ad-hoc analysis...{''}\n")
-        dataframe_df = get_top_journal_by_unique_drugs(OUTPUT_JSON_PATH)
-        logging.info("Ad-hoc analysis completed")
-    
-        logging.info(f"8- Saving ad-hoc file to {AD_HOC_OUTPUT_PATH}...")
-        save_to_json(dataframe_df, AD_HOC_OUTPUT_PATH)
-        logging.info("Ad-hoc file saved successfully")
+        metrics = task_metrics("load_data", context['run_id'])
+        try:
+            summary = ti.xcom_pull(task_ids='transform_data', key='mentions_artifact')
+            with metrics.stage("read_artifacts") as stage:
+                mentions = read_artifact(summary['path'])
+                stage["rows_out"] = len(mentions)
+            logging.info(f"Retrieved {summary['rows']} drug mentions from previous task")
+
+            logging.info("Building relationships...")
+            with metrics.stage("build_relationships", len(mentions)) as stage:
+                relationships = build_relationship_graph(mentions)
+                stage["rows_out"] = len(relationships)
+            logging.info("Relationships built successfully")
+
+            logging.info("6- Saving the graph outputs...")
+            save_graph(relationships, mentions, metrics)
+            logging.info("Graph outputs saved successfully")
+
+            logging.info("7- Generating ad-hoc analysis...{''}\n")
+            with metrics.stage("ad_hoc", len(mentions)) as stage:
+                analytics = run_analytics(mentions, top_k=AD_HOC_TOP_K)
+                stage["rows_out"] = len(analytics)
+            logging.info("Ad-hoc analysis completed")
+
+            logging.info(f"8- Saving ad-hoc files to {AD_HOC_DIR}...")
+            with metrics.stage("save_ad_hoc", len(analytics)):
+                save_analytics(analytics, AD_HOC_DIR)
+            logging.info("Ad-hoc files saved successfully")
+        finally:
+            metrics.save(METRICS_DIR, "dag_load_data")
 
         logging.info("✅ Data processing pipeline completed successfully")
 
+    def cleanup_artifacts(**context):
+        from data_load.artifacts import remove_run_artifacts
+
+        remove_run_artifacts(ARTIFACTS_DIR, context['run_id'])
+
     extract_task = PythonOperator(
         task_id="extract_data",
         python_callable=extract_data,
@@ -139,7 +221,13 @@ with DAG(
         dag=dag
     )
 
-    # Set task dependencies
-    extract_task >> transform_task >> load_task
+    # Also runs after a failure, so that no run leaves its artifacts on disk
+    cleanup_task = PythonOperator(
+        task_id="cleanup_artifacts",
+        python_callable=cleanup_artifacts,
+        trigger_rule="all_done",
+        dag=dag
+    )
 
-logging.info("DAG 'data_pipeline_dag' has been defined")
\ No newline at end of file
+    # Set task dependencies
+    extract_task >> transform_task >> load_task >> cleanup_task
@@ -2,10 +2,7 @@ import logging
 import json
 from collections import defaultdict
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+from data_load.graph_index import GraphIndex
 
 
 def get_top_journal_by_unique_drugs(json_file: str) -> dict:
@@ -60,3 +57,35 @@ def get_top_journal_by_unique_drugs(json_file: str) -> dict:
         logging.error(f"Error: Failed to parse JSON file. Details: {e}")
     except Exception as e:
         logging.error(f"An unexpected error occurred: {e}")
+
+
+def get_top_journal_from_index(index_dir: str) -> dict:
+    """
+    Extract the journal that mentions the most unique drugs from the graph index.
+
+    Reads a few memory-mapped pages of the index written next to the JSON graph
+    instead of parsing the graph itself.
+
+    Args:
+        index_dir (str): Folder of the index written by `build_graph_index`.
+
+    Returns:
+        dict: A dictionary with the journal name and the number of mentions.
+    """
+    try:
+        top_journal = GraphIndex(index_dir).top_journals_by_unique_drugs(k=1)[0]
+
+        logging.info(
+            f"The journal mentioning the most unique drugs is "
+            f"'{top_journal['journal']}' with {top_journal['unique_drugs']} unique "
+            f"drugs and {top_journal['mentions']} total mentions of drugs."
+        )
+
+        return {"journal": top_journal["journal"], "mentions": top_journal["mentions"]}
+
+    except FileNotFoundError:
+        logging.error(f"Error: No graph index found in {index_dir}.")
+    except IndexError:
+        logging.error(f"Error: The graph index in {index_dir} has no journal.")
+    except Exception as e:
+        logging.error(f"An unexpected error occurred: {e}")
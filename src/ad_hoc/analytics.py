@@ -0,0 +1,218 @@
+import logging
+import os
+import pandas as pd
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from data_transform.relationships import RelationshipGraph, order_by_drug
+from data_load.load import save_to_json
+
+CUBE_COLUMNS = ["drug", "source", "journal", "year", "mentions"]
+UNKNOWN_YEAR = "unknown"
+DEFAULT_TOP_K = 10
+
+# Registered metrics, by name; each one is computed from the count cube only
+METRICS: Dict[str, Callable[..., Any]] = {}
+
+
+def register_metric(name: str) -> Callable:
+    """
+    Register an aggregation under `name`, which is also the name of its output file.
+
+    A metric is called with the count cube built by `build_count_cube` and the
+    keyword options given to `run_analytics`, and returns a JSON-serializable
+    result. It never reads the mentions themselves, so adding a metric does not
+    add a scan over the data.
+
+    Args:
+        name (str): Name of the metric.
+
+    Returns:
+        Callable: A decorator registering the function.
+    """
+
+    def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+        METRICS[name] = function
+        return function
+
+    return decorator
+
+
+def _year(date: Any) -> str:
+    return str(date)[:4] if isinstance(date, str) and date else ""
+
+
+def _cube_from_mention_table(mention_table: pd.DataFrame) -> pd.DataFrame:
+    # Same row order as the JSON graph, so ties resolve as in the graph
+    table = order_by_drug(mention_table)
+    keys = pd.DataFrame(
+        {
+            "drug": table["drug"].astype(object).to_numpy(),
+            "source": table["source"].astype(object).to_numpy(),
+            "journal": table["journal"].astype(object).fillna("").to_numpy(),
+            "year": [_year(date) for date in table["date"]],
+        }
+    )
+    cube = keys.groupby(CUBE_COLUMNS[:-1], sort=False).size()
+    return cube.rename("mentions").reset_index()
+
+
+def _cube_from_relationships(relationships: Mapping) -> pd.DataFrame:
+    counts: Dict[tuple, int] = {}
+    for drug, details in relationships.items():
+        for publication in details.get("publications", []):
+            key = (
+                drug,
+                publication.get("source"),
+                publication.get("journal") or "",
+                _year(publication.get("date")),
+            )
+            counts[key] = counts.get(key, 0) + 1
+    return pd.DataFrame(
+        [key + (count,) for key, count in counts.items()], columns=CUBE_COLUMNS
+    )
+
+
+def build_count_cube(data: Union[pd.DataFrame, Mapping]) -> pd.DataFrame:
+    """
+    Count mentions per (drug, source, journal, year) in a single pass over the data.
+
+    Rows are in order of first appearance in the JSON graph (drug, then
+    publication order), so metrics can break ties the way the graph lists them.
+
+    Args:
+        data (Union[pd.DataFrame, Mapping]): A mention table returned by
+            `find_mention_table`, or the relationships returned by
+            `build_relationships`.
+
+    Returns:
+        pd.DataFrame: One row per combination with the columns drug, source,
+            journal ("" if missing), year ("" if unknown) and mentions.
+    """
+    if isinstance(data, pd.DataFrame):
+        return _cube_from_mention_table(data)
+    if isinstance(data, RelationshipGraph):
+        return _cube_from_mention_table(data.to_mention_frame())
+    if isinstance(data, Mapping):
+        return _cube_from_relationships(data)
+    raise TypeError("Expected a mention table or a relationships mapping.")
+
+
+def _journal_stats(cube: pd.DataFrame) -> pd.DataFrame:
+    """Unique drugs and mentions per journal, best first; ties keep graph order."""
+    cube = cube[cube["journal"] != ""]
+    grouped = cube.groupby("journal", sort=False)
+    stats = pd.DataFrame(
+        {
+            "unique_drugs": grouped["drug"].nunique(),
+            "mentions": grouped["mentions"].sum(),
+        }
+    )
+    return stats.sort_values("unique_drugs", ascending=False, kind="stable")
+
+
+@register_metric("most_mentioned_journal")
+def most_mentioned_journal(cube: pd.DataFrame, **options) -> Optional[dict]:
+    """The journal mentioning the most unique drugs, with its number of mentions."""
+    stats = _journal_stats(cube)
+    if stats.empty:
+        return None
+    journal = stats.index[0]
+    logging.info(
+        f"The journal mentioning the most unique drugs is "
+        f"'{journal}' with {stats['unique_drugs'].iloc[0]} unique drugs and "
+        f"{stats['mentions'].iloc[0]} total mentions of drugs."
+    )
+    return {"journal": journal, "mentions": int(stats["mentions"].iloc[0])}
+
+
+@register_metric("top_journals_by_unique_drugs")
+def top_journals_by_unique_drugs(
+    cube: pd.DataFrame, top_k: int = DEFAULT_TOP_K, **options
+) -> List[dict]:
+    """The `top_k` journals mentioning the most unique drugs."""
+    stats = _journal_stats(cube).head(top_k)
+    return [
+        {
+            "journal": journal,
+            "unique_drugs": int(row.unique_drugs),
+            "mentions": int(row.mentions),
+        }
+        for journal, row in zip(stats.index, stats.itertuples(index=False))
+    ]
+
+
+@register_metric("mentions_per_drug_per_source")
+def mentions_per_drug_per_source(
+    cube: pd.DataFrame, **options
+) -> Dict[str, Dict[str, int]]:
+    """Number of mentions of each drug in each source."""
+    counts = cube.groupby(["drug", "source"], sort=False)["mentions"].sum()
+    result: Dict[str, Dict[str, int]] = {}
+    for (drug, source), mentions in counts.items():
+        result.setdefault(drug, {})[source] = int(mentions)
+    return result
+
+
+@register_metric("drugs_per_journal_per_year")
+def drugs_per_journal_per_year(
+    cube: pd.DataFrame, **options
+) -> Dict[str, Dict[str, int]]:
+    """Number of unique drugs mentioned by each journal in each year."""
+    cube = cube[cube["journal"] != ""]
+    counts = cube.groupby(["journal", "year"], sort=False)["drug"].nunique()
+    result: Dict[str, Dict[str, int]] = {}
+    for (journal, year), drugs in counts.items():
+        result.setdefault(journal, {})[year or UNKNOWN_YEAR] = int(drugs)
+    # Journals in graph order, years in ascending order
+    return {journal: dict(sorted(years.items())) for journal, years in result.items()}
+
+
+def run_analytics(
+    data: Union[pd.DataFrame, Mapping],
+    metrics: Optional[Iterable[str]] = None,
+    **options,
+) -> Dict[str, Any]:
+    """
+    Compute several registered metrics from a single pass over the data.
+
+    Args:
+        data (Union[pd.DataFrame, Mapping]): A mention table or relationships.
+        metrics (Optional[Iterable[str]]): Names of the metrics to compute;
+            defaults to every registered metric.
+        **options: Options passed to every metric, e.g. `top_k`.
+
+    Returns:
+        Dict[str, Any]: The result of each metric, by name.
+
+    Raises:
+        ValueError: If a metric is not registered.
+    """
+    names = list(METRICS) if metrics is None else list(metrics)
+    unknown = [name for name in names if name not in METRICS]
+    if unknown:
+        raise ValueError(
+            f"Unknown metrics {unknown}. Expected some of {list(METRICS)}."
+        )
+
+    cube = build_count_cube(data)
+    logging.info(f"Built a count cube of {len(cube)} rows for {len(names)} metrics.")
+    return {name: METRICS[name](cube, **options) for name in names}
+
+
+def save_analytics(results: Dict[str, Any], output_dir: str) -> Dict[str, str]:
+    """
+    Write the result of each metric to `<output_dir>/<metric name>.json`.
+
+    Args:
+        results (Dict[str, Any]): Results returned by `run_analytics`.
+        output_dir (str): Folder receiving the files.
+
+    Returns:
+        Dict[str, str]: The path written for each metric.
+    """
+    paths = {}
+    for name, result in results.items():
+        paths[name] = os.path.join(output_dir, f"{name}.json")
+        save_to_json(result, paths[name])
+    return paths
@@ -0,0 +1,242 @@
+import logging
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+DEFAULT_SEED = 42
+# Share of publications mentioning at least one drug
+DEFAULT_MENTION_DENSITY = 0.3
+# Share of the publications written as clinical trials
+DEFAULT_CLINICAL_TRIALS_SHARE = 0.2
+# Rows generated and written at a time, so 10M publications fit in memory
+DEFAULT_GENERATE_CHUNK_SIZE = 100_000
+
+# Title length in words: PubMed titles average about 14 words
+TITLE_WORDS_MEAN = 14
+TITLE_WORDS_STD = 5
+TITLE_WORDS_MIN = 3
+TITLE_WORDS_MAX = 40
+# Number of drugs mentioned by a title that mentions one, from 1 to 3
+MENTIONS_PER_TITLE = (1, 2, 3)
+MENTIONS_PER_TITLE_WEIGHTS = (0.8, 0.15, 0.05)
+
+# Drug names are syllables followed by a suffix: uppercase, never a title word
+_CONSONANTS = "BCDFGHKLMNPRSTVZ"
+_VOWELS = "AEIOU"
+_SYLLABLES = [consonant + vowel for consonant in _CONSONANTS for vowel in _VOWELS]
+_DRUG_SUFFIXES = ["INE", "OL", "ATE", "IDE", "ONE", "AN", "IUM", "AZOLE"]
+
+_TITLE_WORDS = (
+    "a an and the of in on for with by to from versus after during among "
+    "study trial analysis effect effects treatment therapy patients children "
+    "adults randomized controlled clinical evaluation comparison efficacy "
+    "safety dose doses acute chronic pain infection resistance outcomes risk "
+    "case report review cohort phase use injection oral hydrochloride "
+    "management prevention syndrome disease disorder reactions response "
+    "levels plasma severe mild group strains assessment associated induced "
+    "allergy sedation emergency cardiac renal hepatic pediatric elderly "
+    "women men trial-based prospective retrospective long-term short-term "
+    "novel combined single double-blind placebo standard care hospital"
+).split()
+
+_JOURNAL_WORDS = (
+    "journal annals archives review reports of the clinical medicine "
+    "pharmacology emergency nursing pediatrics psychiatry cardiology "
+    "oncology research international american european therapeutics"
+).split()
+
+_MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+
+def drug_names(n_drugs: int) -> List[str]:
+    """
+    Build `n_drugs` distinct drug names, e.g. "BABABAINE", "BEBABAOL".
+
+    Args:
+        n_drugs (int): Number of names.
+
+    Returns:
+        List[str]: The names; the same `n_drugs` always gives the same names.
+    """
+    length = 3
+    while len(_SYLLABLES) ** length < n_drugs:
+        length += 1
+    names = []
+    for index in range(n_drugs):
+        digits, value = [], index
+        for _ in range(length):
+            value, digit = divmod(value, len(_SYLLABLES))
+            digits.append(_SYLLABLES[digit])
+        names.append("".join(digits) + _DRUG_SUFFIXES[index % len(_DRUG_SUFFIXES)])
+    return names
+
+
+def _journal_names(rng: np.random.Generator, n_journals: int) -> List[str]:
+    journals = []
+    for index in range(n_journals):
+        words = rng.choice(_JOURNAL_WORDS, size=rng.integers(2, 6))
+        journals.append(f"{' '.join(words).capitalize()} {index}")
+    return journals
+
+
+def _titles(
+    rng: np.random.Generator, size: int, drugs: np.ndarray, mention_density: float
+) -> List[str]:
+    lengths = rng.normal(TITLE_WORDS_MEAN, TITLE_WORDS_STD, size)
+    lengths = np.clip(np.rint(lengths), TITLE_WORDS_MIN, TITLE_WORDS_MAX)
+    lengths = lengths.astype(np.int64)
+    words = np.array(_TITLE_WORDS, dtype=object)[
+        rng.integers(0, len(_TITLE_WORDS), lengths.sum())
+    ]
+    mentions = np.where(
+        rng.random(size) < mention_density,
+        rng.choice(MENTIONS_PER_TITLE, size, p=MENTIONS_PER_TITLE_WEIGHTS),
+        0,
+    )
+    mentioned = drugs[rng.integers(0, len(drugs), mentions.sum())]
+    # Drug names are written in upper, title or lower case
+    cases = rng.integers(0, 3, mentions.sum())
+    periods = rng.random(size) < 0.5
+
+    titles = []
+    word_start, drug_start = 0, 0
+    for length, count, period in zip(lengths, mentions, periods):
+        word_end = word_start + length
+        title = list(words[word_start:word_end])
+        for offset in range(count):
+            drug, case = mentioned[drug_start + offset], cases[drug_start + offset]
+            drug = drug if case == 0 else drug.title() if case == 1 else drug.lower()
+            title.insert(rng.integers(0, len(title) + 1), drug)
+        word_start = word_end
+        drug_start += count
+        text = " ".join(title)
+        titles.append(text[0].upper() + text[1:] + ("." if period else ""))
+    return titles
+
+
+def _pubmed_dates(rng: np.random.Generator, days: np.ndarray) -> List[str]:
+    # Mostly "dd/mm/yyyy", some ISO dates, as in the PubMed sources
+    dates = pd.to_datetime(days, unit="D")
+    iso = rng.random(len(days)) < 0.1
+    return [
+        date.strftime("%Y-%m-%d") if is_iso else date.strftime("%d/%m/%Y")
+        for date, is_iso in zip(dates, iso)
+    ]
+
+
+def _clinical_trials_dates(days: np.ndarray) -> List[str]:
+    return [
+        f"{date.day} {_MONTHS[date.month - 1]} {date.year}"
+        for date in pd.to_datetime(days, unit="D")
+    ]
+
+
+def _write_chunk(df: pd.DataFrame, path: str, first: bool) -> None:
+    df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+
+def generate_dataset(
+    output_dir: str,
+    n_publications: int = 1_000,
+    n_drugs: int = 10,
+    mention_density: float = DEFAULT_MENTION_DENSITY,
+    clinical_trials_share: float = DEFAULT_CLINICAL_TRIALS_SHARE,
+    seed: int = DEFAULT_SEED,
+    chunk_size: int = DEFAULT_GENERATE_CHUNK_SIZE,
+) -> Dict[str, str]:
+    """
+    Write a synthetic drugs / PubMed / clinical trials dataset in the input format.
+
+    The output only depends on the arguments: the same seed and scale always
+    give the same files, so benchmark runs on different commits read the same
+    data. Publications are generated and appended `chunk_size` rows at a time.
+
+    Args:
+        output_dir (str): Folder receiving drugs.csv, pubmed.csv and
+            clinical_trials.csv.
+        n_publications (int): Total number of publications, e.g. 1k to 10M.
+        n_drugs (int): Number of drugs, e.g. 10 to 100k.
+        mention_density (float): Share of titles mentioning at least one drug.
+        clinical_trials_share (float): Share of publications that are
+            clinical trials rather than PubMed articles.
+        seed (int): Seed of the random generator.
+        chunk_size (int): Number of publications generated at a time.
+
+    Returns:
+        Dict[str, str]: The path of each file, keyed like `load_csv_files`:
+            'PubMed', 'ClinicalTrials' and 'Drugs'.
+
+    Raises:
+        ValueError: If a count or a share is out of range.
+    """
+    if n_publications < 0 or n_drugs < 1 or chunk_size < 1:
+        raise ValueError(
+            "n_publications must be >= 0, n_drugs and chunk_size must be >= 1."
+        )
+    if not 0 <= mention_density <= 1 or not 0 <= clinical_trials_share <= 1:
+        raise ValueError("mention_density and clinical_trials_share must be in [0, 1].")
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        "PubMed": os.path.join(output_dir, "pubmed.csv"),
+        "ClinicalTrials": os.path.join(output_dir, "clinical_trials.csv"),
+        "Drugs": os.path.join(output_dir, "drugs.csv"),
+    }
+    rng = np.random.default_rng(seed)
+
+    drugs = np.array(drug_names(n_drugs), dtype=object)
+    pd.DataFrame(
+        {"atccode": [f"A{index:05d}" for index in range(n_drugs)], "drug": drugs}
+    ).to_csv(paths["Drugs"], index=False)
+
+    journals = np.array(
+        _journal_names(rng, max(10, n_publications // 1_000)), dtype=object
+    )
+    n_clinical_trials = int(round(n_publications * clinical_trials_share))
+    counts = {
+        "PubMed": n_publications - n_clinical_trials,
+        "ClinicalTrials": n_clinical_trials,
+    }
+    # 2015-01-01 to 2024-12-31, in days since the epoch
+    first_day, last_day = 16436, 20088
+
+    for name, count in counts.items():
+        title_column = "title" if name == "PubMed" else "scientific_title"
+        for start in range(0, max(count, 1), chunk_size):
+            size = min(chunk_size, count - start)
+            days = rng.integers(first_day, last_day + 1, size)
+            if name == "PubMed":
+                ids = np.arange(start + 1, start + size + 1).astype(str)
+                dates = _pubmed_dates(rng, days)
+            else:
+                ids = [f"NCT{index:08d}" for index in range(start, start + size)]
+                dates = _clinical_trials_dates(days)
+            chunk = pd.DataFrame(
+                {
+                    "id": ids,
+                    title_column: _titles(rng, size, drugs, mention_density),
+                    "date": dates,
+                    "journal": journals[rng.integers(0, len(journals), size)],
+                }
+            )
+            _write_chunk(chunk, paths[name], first=start == 0)
+
+    logging.info(
+        f"✅ Synthetic dataset written to {output_dir} "
+        f"({n_publications} publications, {n_drugs} drugs)"
+    )
+    return paths
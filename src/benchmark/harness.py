@@ -0,0 +1,253 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import BENCHMARK_DIR, LOG_FORMAT, LOG_LEVEL
+from benchmark.generate import DEFAULT_MENTION_DENSITY, DEFAULT_SEED, generate_dataset
+from data_transform.data_processing import load_csv_files
+from data_transform.data_cleaning import clean_data
+from data_transform.drug_mentions import find_mention_table
+from data_transform.relationships import build_relationship_graph
+from data_load.load import save_to_json
+from ad_hoc.analytics import run_analytics, save_analytics
+
+BENCHMARK_STAGES = [
+    "load_csv_files",
+    "clean_data",
+    "find_mentions",
+    "build_relationships",
+    "save_to_json",
+    "ad_hoc",
+]
+RESULTS_VERSION = 1
+
+
+def _peak_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_commit() -> Optional[str]:
+    """Return the commit of the working tree, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def measure(stage: str, results: List[dict], trace_memory: bool) -> Iterator[None]:
+    """
+    Time the enclosed block and append its measures to `results`.
+
+    Args:
+        stage (str): Name of the stage.
+        results (List[dict]): Receives {stage, seconds, peak_traced_bytes,
+            peak_rss_bytes}.
+        trace_memory (bool): Record the peak of Python allocations with
+            `tracemalloc`, which slows the stage down.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak_traced = None
+        if trace_memory:
+            peak_traced = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append(
+            {
+                "stage": stage,
+                "seconds": round(seconds, 6),
+                "peak_traced_bytes": peak_traced,
+                # Peak of the whole process so far, native allocations included
+                "peak_rss_bytes": _peak_rss_bytes(),
+            }
+        )
+        logging.info(f"⏱ {stage}: {seconds:.3f}s")
+
+
+def run_benchmark(
+    input_files: Dict[str, str],
+    output_dir: str,
+    engine: str = "automaton",
+    workers: Optional[int] = 1,
+    trace_memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run the batch pipeline once on `input_files`, measuring each stage.
+
+    Args:
+        input_files (Dict[str, str]): Path of 'PubMed', 'ClinicalTrials' and
+            'Drugs', e.g. returned by `generate_dataset`.
+        output_dir (str): Folder receiving the JSON graph and the ad hoc files.
+        engine (str): Matching engine passed to `find_mention_table`.
+        workers (Optional[int]): Matching processes passed to `find_mention_table`.
+        trace_memory (bool): Record the peak of Python allocations per stage.
+
+    Returns:
+        Dict[str, Any]: The measures of each stage in `BENCHMARK_STAGES` order,
+            with the row counts and the environment of the run.
+    """
+    stages: List[dict] = []
+
+    with measure("load_csv_files", stages, trace_memory):
+        dataframes = load_csv_files(input_files)
+    with measure("clean_data", stages, trace_memory):
+        cleaned = clean_data(dataframes)
+    with measure("find_mentions", stages, trace_memory):
+        mentions = find_mention_table(
+            cleaned["PubMed"],
+            cleaned["ClinicalTrials"],
+            cleaned["Drugs"],
+            engine=engine,
+            workers=workers,
+        )
+    with measure("build_relationships", stages, trace_memory):
+        relationships = build_relationship_graph(mentions)
+    with measure("save_to_json", stages, trace_memory):
+        save_to_json(
+            relationships, os.path.join(output_dir, "drug_mentions_graph.json")
+        )
+    with measure("ad_hoc", stages, trace_memory):
+        save_analytics(run_analytics(mentions), os.path.join(output_dir, "ad_hoc"))
+
+    return {
+        "version": RESULTS_VERSION,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": engine,
+        "workers": workers,
+        "rows": {name: len(df) for name, df in dataframes.items() if df is not None},
+        "mentions": len(mentions),
+        "total_seconds": round(sum(stage["seconds"] for stage in stages), 6),
+        "stages": stages,
+    }
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    """
+    Write benchmark results as JSON.
+
+    Args:
+        results (Dict[str, Any]): Results returned by `run_benchmark`.
+        path (str): Path of the JSON file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    logging.info(f"✔ Benchmark results saved at: {path}")
+
+
+def compare_results(
+    baseline: Dict[str, Any], current: Dict[str, Any]
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Compare two benchmark runs stage by stage, e.g. from two commits.
+
+    Args:
+        baseline (Dict[str, Any]): Results of the reference run.
+        current (Dict[str, Any]): Results of the run to compare.
+
+    Returns:
+        Dict[str, Dict[str, Optional[float]]]: For each stage of both runs,
+            the seconds of each run and their ratio (current / baseline).
+    """
+    before = {stage["stage"]: stage["seconds"] for stage in baseline["stages"]}
+    comparison = {}
+    for stage in current["stages"]:
+        name, seconds = stage["stage"], stage["seconds"]
+        if name not in before:
+            continue
+        comparison[name] = {
+            "baseline_seconds": before[name],
+            "current_seconds": seconds,
+            "ratio": round(seconds / before[name], 3) if before[name] else None,
+        }
+    return comparison
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Command line entry point, e.g. `python -m benchmark.harness --drugs 100`."""
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic dataset and time each pipeline stage."
+    )
+    parser.add_argument("--publications", type=int, default=100_000)
+    parser.add_argument("--drugs", type=int, default=1_000)
+    parser.add_argument(
+        "--mention-density", type=float, default=DEFAULT_MENTION_DENSITY
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--engine", default="automaton")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--no-trace-memory", action="store_true", help="Skip tracemalloc."
+    )
+    parser.add_argument("--data-dir", help="Keep the generated dataset here.")
+    parser.add_argument(
+        "--output",
+        help="Path of the results JSON; defaults to a file of BENCHMARK_DIR "
+        "named after the commit and the scale.",
+    )
+    parser.add_argument("--baseline", help="Results JSON to compare against.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_files = generate_dataset(
+            args.data_dir or os.path.join(work_dir, "data"),
+            n_publications=args.publications,
+            n_drugs=args.drugs,
+            mention_density=args.mention_density,
+            seed=args.seed,
+        )
+        results = run_benchmark(
+            input_files,
+            os.path.join(work_dir, "output"),
+            engine=args.engine,
+            workers=args.workers,
+            trace_memory=not args.no_trace_memory,
+        )
+    results["scale"] = {
+        "publications": args.publications,
+        "drugs": args.drugs,
+        "mention_density": args.mention_density,
+        "seed": args.seed,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            results["comparison"] = compare_results(json.load(file), results)
+    output = args.output or os.path.join(
+        BENCHMARK_DIR,
+        f"{(results['commit'] or 'unknown')[:10]}_"
+        f"{args.publications}x{args.drugs}.json",
+    )
+    save_results(results, output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
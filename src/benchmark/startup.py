@@ -0,0 +1,244 @@
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import BENCHMARK_DIR, LOG_FORMAT, LOG_LEVEL, STARTUP_BUDGETS
+
+PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+DAG_FILE = os.path.join(PROJECT_ROOT, "dags", "data_pipeline_dag.py")
+# Modules the scheduler already holds when it parses a DAG file
+AIRFLOW_MODULES = ("airflow", "airflow.operators.python")
+# Imports that must stay out of `import main` and of the DAG file parse
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow")
+DEFAULT_RUNS = 5
+# Slowest imports listed in the results
+TOP_IMPORTS = 10
+RESULTS_VERSION = 1
+_IMPORTTIME_PREFIX = "import time:"
+
+# Run in a fresh interpreter: time the execution of a DAG file once the
+# Airflow modules are imported, and list the heavy modules it pulled in
+_DAG_PARSE_SCRIPT = """
+import importlib, json, runpy, sys, time
+for module in {preload!r}:
+    importlib.import_module(module)
+before = set(sys.modules)
+start = time.perf_counter()
+runpy.run_path({dag_file!r})
+seconds = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules and m not in before]
+print(json.dumps({{"seconds": seconds, "heavy_modules": heavy}}))
+"""
+
+
+def _environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    paths = [PROJECT_ROOT, os.path.join(PROJECT_ROOT, "src")]
+    env["PYTHONPATH"] = os.pathsep.join(paths + [env.get("PYTHONPATH", "")])
+    return env
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """
+    Read the report of `python -X importtime`.
+
+    Args:
+        stderr (str): Standard error of the interpreter.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Per imported module, its own and cumulative
+            import time in microseconds and its nesting depth.
+    """
+    modules = {}
+    start = len(_IMPORTTIME_PREFIX)
+    for line in stderr.splitlines():
+        if not line.startswith(_IMPORTTIME_PREFIX) or "self [us]" in line:
+            continue
+        own, cumulative, name = line[start:].split("|")
+        modules[name.strip()] = {
+            "self_us": int(own),
+            "cumulative_us": int(cumulative),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+        }
+    return modules
+
+
+def measure_import(module: str = "main", runs: int = DEFAULT_RUNS) -> Dict[str, Any]:
+    """
+    Time `import <module>` with `python -X importtime`, in fresh interpreters.
+
+    Args:
+        module (str): Module importable from the project root or `src`.
+        runs (int): Interpreters started; the median time is kept.
+
+    Returns:
+        Dict[str, Any]: Median seconds, the slowest imports of the last run
+            and the heavy modules it imported.
+
+    Raises:
+        RuntimeError: If the module cannot be imported.
+    """
+    timings = []
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            env=_environment(),
+            cwd=PROJECT_ROOT,
+        )
+        if process.returncode:
+            raise RuntimeError(f"import {module} failed:\n{process.stderr[-2000:]}")
+        modules = parse_importtime(process.stderr)
+        timings.append(modules[module]["cumulative_us"] / 1e6)
+
+    slowest = sorted(
+        (name for name, times in modules.items() if times["depth"] == 1),
+        key=lambda name: -modules[name]["cumulative_us"],
+    )[:TOP_IMPORTS]
+    return {
+        "module": module,
+        "seconds": round(statistics.median(timings), 6),
+        "slowest_imports": {
+            name: round(modules[name]["cumulative_us"] / 1e6, 6) for name in slowest
+        },
+        "heavy_modules": [name for name in HEAVY_MODULES if name in modules],
+    }
+
+
+def measure_dag_parse(
+    dag_file: str = DAG_FILE,
+    runs: int = DEFAULT_RUNS,
+    preload: Sequence[str] = AIRFLOW_MODULES,
+) -> Optional[Dict[str, Any]]:
+    """
+    Time the execution of a DAG file the way the scheduler parses it: in an
+    interpreter where the Airflow modules are already imported.
+
+    Args:
+        dag_file (str): Path of the DAG file.
+        runs (int): Interpreters started; the median time is kept.
+        preload (Sequence[str]): Modules imported before the timed parse.
+
+    Returns:
+        Optional[Dict[str, Any]]: Median seconds and the heavy modules the
+            parse imported, or None if a `preload` module is not installed.
+
+    Raises:
+        RuntimeError: If the DAG file fails to run.
+    """
+    script = _DAG_PARSE_SCRIPT.format(
+        preload=tuple(preload), dag_file=dag_file, heavy=HEAVY_MODULES
+    )
+    timings = []
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            env=_environment(),
+            cwd=PROJECT_ROOT,
+        )
+        if process.returncode:
+            missing = [
+                module
+                for module in preload
+                if f"No module named '{module.split('.')[0]}'" in process.stderr
+            ]
+            if missing:
+                logging.warning(f"⚠ {missing[0]} is not installed, DAG parse skipped")
+                return None
+            raise RuntimeError(f"Parsing {dag_file} failed:\n{process.stderr[-2000:]}")
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+    return {
+        "dag_file": os.path.relpath(dag_file, PROJECT_ROOT),
+        "seconds": round(statistics.median(timings), 6),
+        "heavy_modules": result["heavy_modules"],
+    }
+
+
+def check_budgets(
+    results: Dict[str, Any], budgets: Dict[str, float] = STARTUP_BUDGETS
+) -> List[str]:
+    """
+    Compare startup measures with their budgets.
+
+    Args:
+        results (Dict[str, Any]): Results of `measure_startup`.
+        budgets (Dict[str, float]): Seconds allowed for "main_import" and
+            "dag_parse".
+
+    Returns:
+        List[str]: One message per exceeded budget or heavy import; empty if
+            the startup is within budget. Skipped measures are not checked.
+    """
+    problems = []
+    for name, budget in budgets.items():
+        measure = results.get(name)
+        if measure is None:
+            continue
+        if measure["seconds"] > budget:
+            problems.append(f"{name} took {measure['seconds']:.3f}s > {budget}s")
+        if measure["heavy_modules"]:
+            problems.append(f"{name} imported {', '.join(measure['heavy_modules'])}")
+    return problems
+
+
+def measure_startup(runs: int = DEFAULT_RUNS) -> Dict[str, Any]:
+    """
+    Measure the import of `src/main.py` and the parse of the DAG file.
+
+    Returns:
+        Dict[str, Any]: Both measures, None for the DAG if Airflow is missing,
+            with the budgets and the problems found by `check_budgets`.
+    """
+    results = {
+        "version": RESULTS_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "main_import": measure_import("main", runs),
+        "dag_parse": measure_dag_parse(DAG_FILE, runs),
+        "budgets": STARTUP_BUDGETS,
+    }
+    results["problems"] = check_budgets(results)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Command line entry point, e.g. `python -m benchmark.startup --runs 10`."""
+    parser = argparse.ArgumentParser(
+        description="Check the import time of src/main.py and the DAG parse time."
+    )
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument(
+        "--output",
+        default=os.path.join(BENCHMARK_DIR, "startup.json"),
+        help="Path of the results JSON.",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+
+    results = measure_startup(args.runs)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    logging.info(f"⏱ import main: {results['main_import']['seconds']:.3f}s")
+    if results["dag_parse"] is not None:
+        logging.info(f"⏱ DAG parse: {results['dag_parse']['seconds']:.3f}s")
+    for problem in results["problems"]:
+        logging.error(f"❌ Startup budget exceeded: {problem}")
+    logging.info(f"✔ Startup results saved at: {args.output}")
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main()["problems"] else 0)
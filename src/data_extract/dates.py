@@ -0,0 +1,143 @@
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+ISO_DATE_FORMAT = "%Y-%m-%d"
+# Formats tried in order on each distinct date string. Slash dates are read
+# month first, as `pd.to_datetime` infers them, and day first when the first
+# number cannot be a month (e.g. "25/05/2020"). Values none of them matches
+# are inferred by `pd.to_datetime`, e.g. "Jan 2020", "2020" or "20200105".
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%Y/%m/%d",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%B %d, %Y",
+    "%b %d, %Y",
+)
+# Distinct raw values kept by the parser cache, shared by every call
+DATE_CACHE_SIZE = 100_000
+# Unparseable values quoted in the warning
+UNPARSEABLE_SAMPLE_SIZE = 5
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(raw: str, formats: Tuple[str, ...] = DATE_FORMATS) -> Optional[str]:
+    """
+    Parse one raw date string with the first matching format of `formats`,
+    or else with the format `pd.to_datetime` infers (dateutil).
+
+    Results are cached, so a value seen in an earlier call or chunk is not
+    parsed again.
+
+    Args:
+        raw (str): The raw date, e.g. "01/01/2019" or "1 January 2020".
+        formats (Tuple[str, ...]): `strptime` formats, tried in order.
+
+    Returns:
+        Optional[str]: The date as 'YYYY-MM-DD', or None if neither a format
+            nor the inference parses it.
+    """
+    text = raw.strip()
+    for date_format in formats:
+        try:
+            return datetime.strptime(text, date_format).strftime(ISO_DATE_FORMAT)
+        except ValueError:
+            continue
+    parsed = pd.to_datetime(text, errors="coerce")
+    return None if pd.isna(parsed) else parsed.strftime(ISO_DATE_FORMAT)
+
+
+def _parse_distinct_dates(
+    values: pd.Series, formats: Tuple[str, ...]
+) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Parse each distinct value of `values` once.
+
+    Returns the code of each row, the 'YYYY-MM-DD' date of each code with NaN
+    for missing ones, and the distinct values that could not be parsed. The
+    code of a missing row is -1, which picks the trailing NaN of the dates.
+    """
+    codes, uniques = pd.factorize(values)
+    dates = np.full(len(uniques) + 1, np.nan, dtype=object)
+    unparseable = []
+    for code, value in enumerate(uniques):
+        if isinstance(value, datetime):
+            dates[code] = value.strftime(ISO_DATE_FORMAT)
+            continue
+        text = value if isinstance(value, str) else str(value)
+        if not text.strip():
+            continue
+        parsed = parse_date(text, formats)
+        if parsed is None:
+            unparseable.append(text)
+        else:
+            dates[code] = parsed
+    return codes, dates, unparseable
+
+
+def report_unparseable_dates(name: str, unparseable: List[str]) -> None:
+    """
+    Log the distinct date values that could not be parsed.
+
+    Args:
+        name (str): Column or source the values come from.
+        unparseable (List[str]): The values, e.g. returned by `normalize_dates`.
+    """
+    if unparseable:
+        sample = ", ".join(
+            repr(value) for value in unparseable[:UNPARSEABLE_SAMPLE_SIZE]
+        )
+        logging.warning(
+            f"⚠ {len(unparseable)} unparseable date value(s) in '{name}', "
+            f"left empty: {sample}"
+        )
+
+
+def normalize_dates(
+    values: pd.Series, formats: Tuple[str, ...] = DATE_FORMATS
+) -> Tuple[pd.Series, List[str]]:
+    """
+    Format dates as 'YYYY-MM-DD', parsing each distinct value only once.
+
+    Raw strings go through the `formats` chain, then the inference of
+    `pd.to_datetime`; datetime values are formatted as they are. The cost
+    grows with the number of distinct values, and the results are mapped back
+    to the rows with one array lookup.
+
+    Args:
+        values (pd.Series): Raw date strings, or datetimes.
+        formats (Tuple[str, ...]): `strptime` formats, tried in order.
+
+    Returns:
+        Tuple[pd.Series, List[str]]: The dates as an object column, NaN where
+            missing or unparseable, and the distinct unparseable values.
+    """
+    codes, dates, unparseable = _parse_distinct_dates(values, formats)
+    return pd.Series(dates[codes], index=values.index, dtype=object), unparseable
+
+
+def parse_dates(
+    values: pd.Series, formats: Tuple[str, ...] = DATE_FORMATS
+) -> Tuple[pd.Series, List[str]]:
+    """
+    Parse dates into a datetime column, each distinct value only once.
+
+    Args:
+        values (pd.Series): Raw date strings, or datetimes.
+        formats (Tuple[str, ...]): `strptime` formats, tried in order.
+
+    Returns:
+        Tuple[pd.Series, List[str]]: The datetime column, NaT where missing or
+            unparseable, and the distinct unparseable values.
+    """
+    codes, dates, unparseable = _parse_distinct_dates(values, formats)
+    parsed = pd.to_datetime(pd.Series(dates), format=ISO_DATE_FORMAT).to_numpy()
+    return pd.Series(parsed[codes], index=values.index), unparseable
@@ -1,25 +1,242 @@
+import io
+import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import logging
 import json
+from typing import BinaryIO, Dict, Iterator, List, Optional, TextIO, Union
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+from .dates import parse_dates, report_unparseable_dates
+from .json_stream import iter_json_records
+from .object_store import is_object_url, open_object
 
+DATETIME = "datetime64[ns]"
+JSON_EXTENSIONS = (".json", ".ndjson", ".jsonl")
+DEFAULT_JSON_CHUNK_SIZE = 100_000
 
-def load_csv(file_path: str) -> pd.DataFrame:
+# Column dtypes per source; unlisted columns (e.g. ids) are inferred. Dates are
+# read as strings, then parsed with the same format chain as the cleaning step.
+SOURCE_SCHEMAS = {
+    "pubmed": {
+        # Ids are strings, so that JSON ids (9 or "9") match CSV ones
+        "id": "string[pyarrow]",
+        "title": "string[pyarrow]",
+        "journal": "category",
+        "date": DATETIME,
+    },
+    "clinical_trials": {
+        "id": "string[pyarrow]",
+        "scientific_title": "string[pyarrow]",
+        "journal": "category",
+        "date": DATETIME,
+    },
+    "drugs": {"atccode": "string[pyarrow]", "drug": "string[pyarrow]"},
+    "drug_synonyms": {"atccode": "string[pyarrow]", "synonym": "string[pyarrow]"},
+}
+
+
+def _read_dtypes(schema: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    """Dtypes passed to the reader: date columns are read as strings."""
+    if schema is None:
+        return None
+    return {
+        column: "string[pyarrow]" if dtype == DATETIME else dtype
+        for column, dtype in schema.items()
+    }
+
+
+def apply_schema(df: pd.DataFrame, schema: Optional[Dict[str, str]]) -> pd.DataFrame:
+    """
+    Cast the columns of `df` listed in `schema`; missing columns are ignored.
+
+    Date columns are parsed with `parse_dates`, as `standardize_date_format`
+    does: unparseable values are logged and become NaT.
+
+    Args:
+        df (pd.DataFrame): The loaded dataframe.
+        schema (Optional[Dict[str, str]]): Dtype per column, e.g. from
+            `SOURCE_SCHEMAS`.
+
+    Returns:
+        pd.DataFrame: The dataframe with typed columns.
+    """
+    for column, dtype in (schema or {}).items():
+        if column not in df.columns:
+            continue
+        if dtype == DATETIME:
+            df[column], unparseable = parse_dates(df[column])
+            report_unparseable_dates(column, unparseable)
+        elif df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def _iter_typed_chunks(chunks, schema: Optional[Dict[str, str]]):
+    for chunk in chunks:
+        yield apply_schema(chunk, schema)
+
+
+def _iter_parquet_chunks(
+    parquet_file: pq.ParquetFile, chunksize: int, schema: Optional[Dict[str, str]]
+) -> Iterator[pd.DataFrame]:
+    for batch in parquet_file.iter_batches(batch_size=chunksize):
+        yield apply_schema(batch.to_pandas(), schema)
+
+
+def open_input(file_path: str) -> Union[str, BinaryIO]:
+    """
+    Resolve an input for the readers: local paths are returned as they are,
+    object URLs ("s3://", "gs://") are opened as streams of ranged reads.
+
+    Raises:
+        FileNotFoundError: If the object does not exist.
+    """
+    return open_object(file_path) if is_object_url(file_path) else file_path
+
+
+def is_parquet(file_path: str) -> bool:
+    """Whether `file_path` is read as Parquet, based on its extension."""
+    return os.path.splitext(file_path)[1].lower() in (".parquet", ".pq")
+
+
+def is_json(file_path: str) -> bool:
+    """Whether `file_path` is read as a JSON array or NDJSON, based on its extension."""
+    return os.path.splitext(file_path)[1].lower() in JSON_EXTENSIONS
+
+
+def is_csv(file_path: str) -> bool:
+    """Whether `file_path` is read as CSV (any extension not read otherwise)."""
+    return not is_parquet(file_path) and not is_json(file_path)
+
+
+def _is_category(frame: pd.DataFrame, column: str) -> bool:
+    return column in frame.columns and isinstance(
+        frame[column].dtype, pd.CategoricalDtype
+    )
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    Concatenate dataframes with a single copy, keeping category columns.
+
+    `pd.concat` turns categories that differ between frames into objects;
+    category columns are therefore combined with `union_categoricals`.
+
+    Args:
+        frames (List[pd.DataFrame]): The dataframes, in order.
+
+    Returns:
+        pd.DataFrame or None: The concatenated dataframe, or None if `frames`
+            is empty.
+    """
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+
+    columns = list(dict.fromkeys(c for frame in frames for c in frame.columns))
+    categorical = [
+        column
+        for column in columns
+        if all(_is_category(frame, column) for frame in frames)
+    ]
+    df = pd.concat(
+        [frame.drop(columns=categorical) for frame in frames], ignore_index=True
+    )
+    for column in categorical:
+        df[column] = pd.api.types.union_categoricals(
+            [frame[column] for frame in frames], ignore_order=True
+        )
+    return df[columns]
+
+
+def parse_csv(
+    source: Union[str, BinaryIO], schema: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """
+    Parse a whole CSV with the multithreaded pyarrow engine and apply `schema`.
+
+    Inputs the pyarrow parser rejects are parsed again with the C parser.
+
+    Args:
+        source (Union[str, BinaryIO]): A file path or a binary buffer.
+        schema (Optional[Dict[str, str]]): Dtype per column.
+
+    Returns:
+        pd.DataFrame: The typed dataframe.
+
+    Raises:
+        FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError: As
+            raised by `pd.read_csv`.
+    """
+    try:
+        df = pd.read_csv(
+            source, encoding="utf-8", engine="pyarrow", dtype=_read_dtypes(schema)
+        )
+    except pa.ArrowInvalid as e:
+        # The pyarrow parser rejects rows the C parser skips, e.g. blank
+        # lines holding only whitespace
+        logging.warning(f"⚠ pyarrow engine failed ({e}), falling back to the C parser")
+        if hasattr(source, "seek"):
+            source.seek(0)
+        df = pd.read_csv(
+            source, encoding="utf-8", low_memory=False, dtype=_read_dtypes(schema)
+        )
+    return apply_schema(df, schema)
+
+
+def load_csv(
+    file_path: str,
+    chunksize: Optional[int] = None,
+    schema: Optional[Dict[str, str]] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
     """
     Load a CSV file into a Pandas DataFrame with error handling.
 
+    Whole files are parsed by the multithreaded pyarrow engine. Files with a
+    `.parquet` (or `.pq`) extension are read as Parquet instead.
+
     Args:
-        file_path (str): The path to the CSV file.
+        file_path (str): The path to the CSV or Parquet file.
+        chunksize (Optional[int]): If set, return an iterator yielding DataFrames
+            of at most `chunksize` rows instead of loading the whole file.
+        schema (Optional[Dict[str, str]]): Dtype per column, e.g. one of
+            `SOURCE_SCHEMAS`; other columns are inferred.
 
     Returns:
-        pd.DataFrame or None: The loaded DataFrame, or None if an error occurs.
+        pd.DataFrame, Iterator[pd.DataFrame] or None: The loaded DataFrame (or chunk
+            iterator), or None if an error occurs.
     """
     try:
-        df = pd.read_csv(file_path, encoding="utf-8", low_memory=False)
+        if is_parquet(file_path):
+            if chunksize is not None:
+                # Opened here so that a missing file is reported right away
+                parquet_file = pq.ParquetFile(open_input(file_path))
+                logging.info(
+                    f"✅ Streaming Parquet: {file_path} (Chunks of {chunksize} rows)"
+                )
+                return _iter_parquet_chunks(parquet_file, chunksize, schema)
+
+            df = apply_schema(pd.read_parquet(open_input(file_path)), schema)
+            logging.info(
+                f"✅ Successfully loaded Parquet: {file_path} (Rows: {len(df)})"
+            )
+            return df
+
+        if chunksize is not None:
+            # The pyarrow engine cannot read by chunks
+            reader = pd.read_csv(
+                open_input(file_path),
+                encoding="utf-8",
+                chunksize=chunksize,
+                dtype=_read_dtypes(schema),
+            )
+            logging.info(f"✅ Streaming CSV: {file_path} (Chunks of {chunksize} rows)")
+            return _iter_typed_chunks(reader, schema) if schema else reader
+
+        df = parse_csv(open_input(file_path), schema)
         logging.info(f"✅ Successfully loaded CSV: {file_path} " f"(Rows: {len(df)})")
 
         return df
@@ -38,34 +255,96 @@ def load_csv(file_path: str) -> pd.DataFrame:
     return None  # Return None instead of raising an error
 
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+def _open_json(file_path: str) -> TextIO:
+    return (
+        io.TextIOWrapper(open_object(file_path), encoding="utf-8")
+        if is_object_url(file_path)
+        else open(file_path, "r", encoding="utf-8")
+    )
+
+
+def _iter_json_chunks(
+    file: TextIO, file_path: str, chunksize: int, schema: Optional[Dict[str, str]]
+) -> Iterator[pd.DataFrame]:
+    skipped = 0
+    with file:
+        records: List[dict] = []
+        for record in iter_json_records(file):
+            if not isinstance(record, dict):
+                skipped += 1
+                continue
+            records.append(record)
+            if len(records) == chunksize:
+                yield apply_schema(pd.DataFrame.from_records(records), schema)
+                records = []
+        if records:
+            yield apply_schema(pd.DataFrame.from_records(records), schema)
+    if skipped:
+        logging.warning(
+            f"⚠ Skipped {skipped} values that are not objects in {file_path}"
+        )
 
 
-def load_json(file_path: str) -> pd.DataFrame:
+def load_json(
+    file_path: str,
+    chunksize: Optional[int] = None,
+    schema: Optional[Dict[str, str]] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
     """
-    Load a JSON file into a Pandas DataFrame with error handling.
+    Load a JSON array or NDJSON file into a Pandas DataFrame with error handling.
+
+    Records are parsed incrementally by `iter_json_records`, which tolerates
+    trailing commas, and turned into dataframes `chunksize` records at a time.
 
     Args:
         file_path (str): The path to the JSON file.
+        chunksize (Optional[int]): If set, return an iterator yielding DataFrames
+            of at most `chunksize` records instead of loading the whole file.
+        schema (Optional[Dict[str, str]]): Dtype per column, e.g. one of
+            `SOURCE_SCHEMAS`; other columns are inferred.
 
     Returns:
-        pd.DataFrame or None: The loaded DataFrame, or None if an error occurs.
+        pd.DataFrame, Iterator[pd.DataFrame] or None: The loaded DataFrame (or chunk
+            iterator), or None if an error occurs.
     """
     try:
-        df = pd.read_json(file_path, encoding="utf-8")
+        if chunksize is not None:
+            # Opened here so that a missing file is reported right away
+            file = _open_json(file_path)
+            logging.info(f"✅ Streaming JSON: {file_path} (Chunks of {chunksize} rows)")
+            return _iter_json_chunks(file, file_path, chunksize, schema)
+
+        chunks = _iter_json_chunks(
+            _open_json(file_path), file_path, DEFAULT_JSON_CHUNK_SIZE, schema
+        )
+        df = concat_frames(list(chunks))
+        if df is None:
+            df = pd.DataFrame()
         logging.info(f"✅ Successfully loaded JSON: {file_path} (Rows: {len(df)})")
         return df
 
     except FileNotFoundError:
         logging.error(f"❌ JSON file not found: {file_path}")
-    except json.JSONDecodeError:
-        logging.error(f"❌ Failed to parse JSON file: {file_path}")
+    except (json.JSONDecodeError, ValueError) as e:
+        logging.error(f"❌ Failed to parse JSON file: {file_path} ({e})")
     except Exception as e:
         logging.error(
             f"❌ Unexpected error while loading JSON {file_path}: {e}", exc_info=True
         )
 
     return None  # Return None instead of raising an error
+
+
+def load_file(
+    file_path: str,
+    chunksize: Optional[int] = None,
+    schema: Optional[Dict[str, str]] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Load a CSV, Parquet or JSON file, picking the reader from its extension.
+
+    Args and return value are those of `load_csv` and `load_json`.
+    """
+    if is_json(file_path):
+        return load_json(file_path, chunksize=chunksize, schema=schema)
+    return load_csv(file_path, chunksize=chunksize, schema=schema)
@@ -0,0 +1,252 @@
+import fnmatch
+import glob
+import io
+import logging
+import os
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .extract import concat_frames, is_csv, load_file, parse_csv
+from .object_store import get_object_store, is_object_url
+
+INPUT_EXTENSIONS = (".csv", ".parquet", ".pq", ".json", ".ndjson", ".jsonl")
+DEFAULT_INGEST_WORKERS = 8
+DEFAULT_BATCH_FILES = 1000
+# Number of failed files listed in the warning of a source
+MAX_REPORTED_ERRORS = 10
+
+
+def _resolve_objects(url: str) -> List[str]:
+    """List the objects of a prefix ending with "/" or matching a glob URL."""
+    if glob.has_magic(url):
+        magic = min(url.find(char) for char in "*?[" if char in url)
+        objects = get_object_store().list_objects(url[:magic])
+        return [
+            object_url
+            for object_url, _ in objects
+            if fnmatch.fnmatchcase(object_url, url)
+        ]
+    objects = get_object_store().list_objects(url)
+    return [
+        object_url
+        for object_url, _ in objects
+        if os.path.splitext(object_url)[1].lower() in INPUT_EXTENSIONS
+    ]
+
+
+def resolve_input_files(path: Union[str, Sequence[str]]) -> List[str]:
+    """
+    List the input files of a source.
+
+    Args:
+        path (Union[str, Sequence[str]]): A file, a directory (its CSV, Parquet
+            and JSON files are used) or a glob pattern such as
+            "data/pubmed/*.csv" ("**" is recursive), or a list of those.
+            Object URLs work the same way: "gs://bucket/pubmed.csv", a prefix
+            ending with "/" such as "s3://bucket/pubmed/", or a glob such as
+            "gs://bucket/pubmed/2020-*.csv" ("*" also matches "/").
+
+    Returns:
+        List[str]: The matching files, sorted by path within each entry.
+    """
+    if not isinstance(path, str):
+        return [file for entry in path for file in resolve_input_files(entry)]
+    if is_object_url(path):
+        return (
+            _resolve_objects(path)
+            if path.endswith("/") or glob.has_magic(path)
+            else [path]
+        )
+    if os.path.isdir(path):
+        with os.scandir(path) as entries:
+            files = [entry.path for entry in entries if entry.is_file()]
+        return sorted(
+            file
+            for file in files
+            if os.path.splitext(file)[1].lower() in INPUT_EXTENSIONS
+        )
+    if glob.has_magic(path):
+        return sorted(
+            file for file in glob.glob(path, recursive=True) if os.path.isfile(file)
+        )
+    return [path]
+
+
+def _load_file(path: str, schema: Optional[Dict[str, str]]) -> Optional[pd.DataFrame]:
+    """Load one whole file; CSV files go through `parse_csv` like batched ones."""
+    if not is_csv(path):
+        return load_file(path, schema=schema)
+    try:
+        df = parse_csv(path, schema)
+        logging.info(f"✅ Successfully loaded CSV: {path} (Rows: {len(df)})")
+        return df
+    except Exception as e:
+        logging.error(f"❌ Failed to load CSV file {path}: {e}")
+        return None
+
+
+def _read_file(path: str, schema: Optional[Dict[str, str]]) -> Tuple[str, object]:
+    """Read one file in a worker thread: raw bytes for CSV, else a dataframe."""
+    try:
+        if not is_csv(path):
+            return path, _load_file(path, schema)
+        with open(path, "rb") as file:
+            return path, file.read()
+    except OSError as e:
+        logging.error(f"❌ Failed to read {path}: {e}")
+        return path, None
+
+
+def _read_files(
+    paths: List[str], schema: Optional[Dict[str, str]], executor: ThreadPoolExecutor
+) -> List[Tuple[str, object]]:
+    """
+    Read a batch of files, in order, like `_read_file`. CSV objects are
+    downloaded together over the pooled connections of the object store.
+    """
+    remote = [path for path in paths if is_object_url(path) and is_csv(path)]
+    contents = dict(get_object_store().read_many(remote)) if remote else {}
+    others = [path for path in paths if path not in contents]
+    contents.update(executor.map(lambda file: _read_file(file, schema), others))
+    return [(path, contents[path]) for path in paths]
+
+
+def _split_header(data: bytes) -> Tuple[bytes, bytes]:
+    """Split a CSV into its header line and its body, which ends with a newline."""
+    if data.startswith(b"\xef\xbb\xbf"):
+        data = data[3:]
+    header, _, body = data.partition(b"\n")
+    if body and not body.endswith(b"\n"):
+        body += b"\n"
+    return header.rstrip(b"\r"), body
+
+
+def _parse_csv_files(
+    files: List[Tuple[str, bytes]], schema: Optional[Dict[str, str]], errors: List[str]
+) -> List[pd.DataFrame]:
+    """
+    Parse CSV files sharing a header as one buffer, checking that it holds one
+    row per line of the files. A file with an unterminated quote would swallow
+    the rows of the next ones, so on any error or row count mismatch, e.g.
+    also with quoted line breaks or blank lines, the files are parsed one by
+    one and only the faulty ones are reported.
+    """
+    groups: Dict[bytes, List[Tuple[str, bytes]]] = {}
+    for path, data in files:
+        header, body = _split_header(data)
+        if not header.strip():
+            logging.warning(f"⚠ CSV file is empty: {path}")
+            errors.append(path)
+            continue
+        groups.setdefault(header, []).append((path, body))
+
+    frames = []
+    for header, group in groups.items():
+        buffer = io.BytesIO(header + b"\n" + b"".join(body for _, body in group))
+        lines = sum(body.count(b"\n") for _, body in group)
+        try:
+            df = parse_csv(buffer, schema)
+        except Exception as e:
+            logging.warning(f"⚠ Combined parse of {len(group)} files failed ({e})")
+        else:
+            if len(df) == lines:
+                frames.append(df)
+                continue
+            logging.warning(
+                f"⚠ Combined parse of {len(group)} files read {len(df)} rows "
+                f"from {lines} lines, parsing the files one by one"
+            )
+        for path, body in group:
+            try:
+                frames.append(parse_csv(io.BytesIO(header + b"\n" + body), schema))
+            except Exception as e:
+                logging.error(f"❌ Failed to parse CSV file {path}: {e}")
+                errors.append(path)
+    return frames
+
+
+def _load_source(
+    name: str,
+    path: Union[str, Sequence[str]],
+    schema: Optional[Dict[str, str]],
+    executor: ThreadPoolExecutor,
+    batch_files: int,
+) -> Optional[pd.DataFrame]:
+    """Load every file of one source, `batch_files` files at a time."""
+    paths = resolve_input_files(path)
+    if len(paths) == 1:
+        # A single file: its own multithreaded parse is the fastest path
+        return _load_file(paths[0], schema)
+    if not paths:
+        logging.error(f"❌ No input file found for {name} at: {path}")
+        return None
+
+    frames: List[pd.DataFrame] = []
+    errors: List[str] = []
+    for start in range(0, len(paths), batch_files):
+        end = start + batch_files
+        csv_files = []
+        for file, content in _read_files(paths[start:end], schema, executor):
+            if content is None:
+                errors.append(file)
+            elif isinstance(content, bytes):
+                csv_files.append((file, content))
+            else:
+                frames.append(content)
+        frames.extend(_parse_csv_files(csv_files, schema, errors))
+
+    if errors:
+        logging.warning(
+            f"⚠ {len(errors)} of {len(paths)} {name} files could not be loaded: "
+            f"{errors[:MAX_REPORTED_ERRORS]}"
+        )
+    df = concat_frames(frames)
+    if df is not None:
+        logging.info(
+            f"✅ Loaded {len(paths) - len(errors)} {name} files (Rows: {len(df)})"
+        )
+    return df
+
+
+def load_sources(
+    sources: Dict[str, Tuple[str, Optional[Dict[str, str]]]],
+    workers: int = DEFAULT_INGEST_WORKERS,
+    batch_files: int = DEFAULT_BATCH_FILES,
+) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    Load several sources at the same time, each from one or many files.
+
+    Sources load concurrently, while file reads of all sources share a thread
+    pool of `workers` threads. Small CSV files sharing a header are parsed as
+    one buffer, so the cost per file is a read, not a parse. A file that cannot
+    be read or parsed is reported and skipped.
+
+    Args:
+        sources (Dict[str, Tuple[str, Optional[Dict[str, str]]]]): For each
+            source name, a file, directory or glob pattern (or a list of those)
+            and its schema.
+        workers (int): Maximum number of concurrent file reads.
+        batch_files (int): Number of files read before they are parsed, which
+            bounds the raw bytes held per source.
+
+    Returns:
+        Dict[str, Optional[pd.DataFrame]]: The dataframe of each source, or None
+            if none of its files could be loaded.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        with ThreadPoolExecutor(max_workers=len(sources) or 1) as source_executor:
+            futures = {
+                name: source_executor.submit(
+                    _load_source, name, path, schema, executor, batch_files
+                )
+                for name, (path, schema) in sources.items()
+            }
+            dataframes = {}
+            for name, future in futures.items():
+                try:
+                    dataframes[name] = future.result()
+                except Exception as e:
+                    logging.error(f"❌ Failed to load {name}: {e}")
+                    dataframes[name] = None
+            return dataframes
@@ -0,0 +1,86 @@
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+# Skipped between values: whitespace, commas, so that trailing or doubled
+# commas (e.g. "},\n]") do not break parsing, and a byte order mark
+_SEPARATORS = frozenset(" \t\r\n,\ufeff")
+# What more input may still complete when decoding fails on it: the start of
+# a number, a literal (true, false, null) or an escape cut by the block end
+_TOKEN_PREFIX = re.compile(r"[0-9A-Za-z.+\-\\]*")
+
+
+def iter_json_records(
+    file: TextIO, block_size: int = DEFAULT_BLOCK_SIZE
+) -> Iterator[Any]:
+    """
+    Parse a JSON array, or newline-delimited JSON, one value at a time.
+
+    The file is read by blocks of `block_size` characters and only the value
+    being parsed is buffered, so memory does not grow with the file. Commas
+    between values are optional and repeated or trailing commas are ignored.
+    A malformed value raises as soon as no more input can make it valid, not
+    at the end of the file.
+
+    Args:
+        file (TextIO): A text file opened for reading.
+        block_size (int): Number of characters read at a time.
+
+    Yields:
+        Any: Each value of the top-level array, or each top-level value.
+
+    Raises:
+        ValueError: If a value is not valid JSON or the array is not closed.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+    in_array, started = False, False
+
+    while True:
+        while position < len(buffer) and buffer[position] in _SEPARATORS:
+            position += 1
+
+        if position == len(buffer):
+            if eof:
+                break
+            buffer, position = file.read(block_size), 0
+            eof = not buffer
+            continue
+
+        char = buffer[position]
+        if not started:
+            started = True
+            if char == "[":
+                in_array = True
+                position += 1
+                continue
+        if in_array and char == "]":
+            in_array = False
+            position += 1
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+            # A number or literal cut at the end of a block may continue
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError as e:
+            truncated = e.msg.startswith("Unterminated string") or (
+                _TOKEN_PREFIX.fullmatch(buffer, e.pos) is not None
+            )
+            if eof or not truncated:
+                raise ValueError(f"Invalid JSON value at offset {e.pos}: {e.msg}")
+            complete = False
+
+        if not complete:
+            block = file.read(block_size)
+            eof = not block
+            buffer, position = buffer[position:] + block, 0
+            continue
+
+        position = end
+        yield value
+
+    if in_array:
+        raise ValueError("Unterminated JSON array.")
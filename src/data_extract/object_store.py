@@ -0,0 +1,379 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.fs as pafs
+
+# Input paths starting with one of these schemes are read from an object store
+OBJECT_URL_SCHEMES = ("s3", "gs")
+# GCS serves HMAC keys through its S3-compatible XML API
+GCS_ENDPOINT = "https://storage.googleapis.com"
+
+# Environment of the default reader, read when it is created. The endpoint
+# points every scheme at one S3-compatible server, e.g. a local emulator
+# (MinIO, fake-gcs-server) or a private S3 service.
+ENDPOINT_ENV_VAR = "OBJECT_STORE_ENDPOINT"
+ACCESS_KEY_ENV_VAR = "AWS_ACCESS_KEY_ID"
+SECRET_KEY_ENV_VAR = "AWS_SECRET_ACCESS_KEY"
+SESSION_TOKEN_ENV_VAR = "AWS_SESSION_TOKEN"
+REGION_ENV_VARS = ("AWS_REGION", "AWS_DEFAULT_REGION")
+# OAuth access token of GCS, used when there are no HMAC keys, and its expiry
+# as an ISO 8601 timestamp (UTC unless it has an offset). Both are read again
+# when the token expires, so a refreshed token can be put in the environment.
+TOKEN_ENV_VAR = "OBJECT_STORE_TOKEN"
+TOKEN_EXPIRY_ENV_VAR = "OBJECT_STORE_TOKEN_EXPIRY"
+DEFAULT_REGION = "us-east-1"
+
+# Objects downloaded at the same time by `read_many`: throughput on many
+# small objects comes from this concurrency and from the connections the
+# filesystem keeps open, not from faster single requests
+DEFAULT_CONNECTIONS = 64
+# Attempts of a request failing on a network error, a throttle or a 5xx
+MAX_ATTEMPTS = 4
+REQUEST_TIMEOUT_SECONDS = 60.0
+# Lifetime assumed for an OAuth token whose expiry is not given. The filesystem
+# cannot refresh a token: it is created again, with the token read again, once
+# the token expires.
+TOKEN_LIFETIME = timedelta(hours=1)
+
+
+def token_from_environment() -> Tuple[Optional[str], Optional[datetime]]:
+    """
+    Returns:
+        Tuple[Optional[str], Optional[datetime]]: The OAuth token of GCS and its
+            expiry, as currently set by `OBJECT_STORE_TOKEN` and
+            `OBJECT_STORE_TOKEN_EXPIRY`.
+    """
+    expiry = os.environ.get(TOKEN_EXPIRY_ENV_VAR)
+    expiry = datetime.fromisoformat(expiry) if expiry else None
+    if expiry is not None and expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    return os.environ.get(TOKEN_ENV_VAR) or None, expiry
+
+
+def is_object_url(path: str) -> bool:
+    """
+    Whether an input path names an object, e.g. "gs://bucket/pubmed.csv".
+
+    Args:
+        path (str): An input path.
+
+    Returns:
+        bool: True for "s3://" and "gs://" URLs.
+    """
+    scheme, separator, _ = path.partition("://")
+    return bool(separator) and scheme.lower() in OBJECT_URL_SCHEMES
+
+
+def split_object_url(url: str) -> Tuple[str, str, str]:
+    """
+    Split an object URL into its scheme, bucket and key.
+
+    Args:
+        url (str): E.g. "s3://bucket/pubmed/2020.csv".
+
+    Returns:
+        Tuple[str, str, str]: E.g. ("s3", "bucket", "pubmed/2020.csv").
+
+    Raises:
+        ValueError: If the URL has no bucket or an unknown scheme.
+    """
+    scheme, _, rest = url.partition("://")
+    bucket, _, key = rest.partition("/")
+    if scheme.lower() not in OBJECT_URL_SCHEMES or not bucket:
+        raise ValueError(f"Not an object URL: '{url}'.")
+    return scheme.lower(), bucket, key
+
+
+class ObjectStoreReader:
+    """
+    Read objects with the filesystems of pyarrow (`pyarrow.fs`).
+
+    The filesystems sign the requests, retry them, keep their connections
+    open and read objects by ranges; one is created per scheme and shared by
+    every caller and thread. Batches of small objects are fanned out from an
+    event loop onto `connections` threads.
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        connections: int = DEFAULT_CONNECTIONS,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        session_token: Optional[str] = None,
+        region: str = DEFAULT_REGION,
+        token: Optional[str] = None,
+        token_expiry: Optional[datetime] = None,
+        token_provider: Optional[
+            Callable[[], Tuple[Optional[str], Optional[datetime]]]
+        ] = None,
+    ):
+        """
+        Args:
+            endpoint (Optional[str]): S3-compatible server of every scheme,
+                e.g. "http://localhost:9000"; by default "s3" URLs go to AWS
+                and "gs" URLs to GCS.
+            connections (int): Objects downloaded at the same time by
+                `read_many`.
+            access_key, secret_key, session_token (Optional[str]): HMAC keys,
+                also accepted by GCS; without them the filesystems look up the
+                default credentials of their cloud.
+            region (str): Region of the S3 buckets.
+            token (Optional[str]): OAuth access token for "gs" URLs.
+            token_expiry (Optional[datetime]): When `token` expires; by
+                default `TOKEN_LIFETIME` after the filesystem is created.
+            token_provider (Optional[Callable]): Returns a fresh (token,
+                expiry) pair once the token expires, e.g.
+                `token_from_environment`. A token past its known expiry
+                raises PermissionError.
+        """
+        if connections <= 0:
+            raise ValueError("connections must be positive.")
+        self.endpoint = endpoint
+        self.connections = connections
+        self.region = region
+        self._keys = {
+            "access_key": access_key,
+            "secret_key": secret_key,
+            "session_token": session_token,
+        }
+        self._token = token
+        self._token_expiry = token_expiry
+        self._token_provider = token_provider
+        self._filesystems: Dict[str, pafs.FileSystem] = {}
+        # Expiry of the token of each filesystem created with one
+        self._expirations: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=connections, thread_name_prefix="object-store"
+        )
+
+    @classmethod
+    def from_environment(cls, **kwargs) -> "ObjectStoreReader":
+        """Create a reader configured by `OBJECT_STORE_ENDPOINT` and the keys."""
+        region = next(
+            (os.environ[name] for name in REGION_ENV_VARS if os.environ.get(name)),
+            DEFAULT_REGION,
+        )
+        kwargs.setdefault("endpoint", os.environ.get(ENDPOINT_ENV_VAR) or None)
+        kwargs.setdefault("access_key", os.environ.get(ACCESS_KEY_ENV_VAR))
+        kwargs.setdefault("secret_key", os.environ.get(SECRET_KEY_ENV_VAR))
+        kwargs.setdefault("session_token", os.environ.get(SESSION_TOKEN_ENV_VAR))
+        token, token_expiry = token_from_environment()
+        kwargs.setdefault("token", token)
+        kwargs.setdefault("token_expiry", token_expiry)
+        kwargs.setdefault("token_provider", token_from_environment)
+        kwargs.setdefault("region", region)
+        return cls(**kwargs)
+
+    def _s3(self, endpoint: Optional[str]) -> pafs.FileSystem:
+        options = {}
+        if endpoint:
+            scheme, _, host = endpoint.rpartition("://")
+            options = {"endpoint_override": host, "scheme": scheme or "https"}
+        return pafs.S3FileSystem(
+            region=self.region,
+            request_timeout=REQUEST_TIMEOUT_SECONDS,
+            retry_strategy=pafs.AwsStandardS3RetryStrategy(max_attempts=MAX_ATTEMPTS),
+            **self._keys,
+            **options,
+        )
+
+    def _create_filesystem(self, scheme: str) -> pafs.FileSystem:
+        if self.endpoint or scheme == "s3":
+            return self._s3(self.endpoint)
+        if self._keys["access_key"]:
+            return self._s3(GCS_ENDPOINT)
+        if self._token:
+            now = datetime.now(timezone.utc)
+            expiration = self._token_expiry or now + TOKEN_LIFETIME
+            if expiration <= now:
+                raise PermissionError(
+                    f"The OAuth token of GCS expired at {expiration.isoformat()}: "
+                    f"supply a fresh token."
+                )
+            self._expirations[scheme] = expiration
+            return pafs.GcsFileSystem(
+                access_token=self._token, credential_token_expiration=expiration
+            )
+        return pafs.GcsFileSystem()
+
+    def _expire_token(self, scheme: str) -> None:
+        """Drop the filesystem of `scheme` once its token expired, then renew it."""
+        expiration = self._expirations.get(scheme)
+        if expiration is None or datetime.now(timezone.utc) < expiration:
+            return
+        del self._filesystems[scheme], self._expirations[scheme]
+        if self._token_provider is not None:
+            self._token, self._token_expiry = self._token_provider()
+        logging.info(f"OAuth token expired, connecting to {scheme} again")
+
+    def filesystem(self, scheme: str) -> pafs.FileSystem:
+        """
+        Returns:
+            pyarrow.fs.FileSystem: The filesystem serving the URLs of `scheme`.
+        """
+        with self._lock:
+            self._expire_token(scheme)
+            if scheme not in self._filesystems:
+                self._filesystems[scheme] = self._create_filesystem(scheme)
+            return self._filesystems[scheme]
+
+    def _resolve(self, url: str) -> Tuple[pafs.FileSystem, str]:
+        scheme, bucket, key = split_object_url(url)
+        return self.filesystem(scheme), f"{bucket}/{key}"
+
+    def list_objects(self, url: str) -> List[Tuple[str, int]]:
+        """
+        List the objects whose URL starts with `url`.
+
+        Args:
+            url (str): A bucket or key prefix, e.g. "gs://bucket/pubmed/" or
+                "gs://bucket/pubmed/2020-".
+
+        Returns:
+            List[Tuple[str, int]]: URL and size of each object, sorted by URL.
+        """
+        scheme, bucket, prefix = split_object_url(url)
+        filesystem, path = self._resolve(url)
+        # Listings go by folder: list the one holding the prefix, then filter
+        folder = f"{bucket}/{prefix.rpartition('/')[0]}".rstrip("/")
+        selector = pafs.FileSelector(folder, recursive=True, allow_not_found=True)
+        return sorted(
+            (f"{scheme}://{info.path}", info.size)
+            for info in filesystem.get_file_info(selector)
+            if info.type == pafs.FileType.File and info.path.startswith(path)
+        )
+
+    def info(self, url: str) -> pafs.FileInfo:
+        """
+        Returns:
+            pyarrow.fs.FileInfo: The size and, if the store reports it, the
+                modification time of the object.
+
+        Raises:
+            FileNotFoundError: If the object does not exist.
+        """
+        filesystem, path = self._resolve(url)
+        info = filesystem.get_file_info(path)
+        if info.type != pafs.FileType.File:
+            raise FileNotFoundError(f"Object not found: {url}")
+        return info
+
+    def size(self, url: str) -> int:
+        """
+        Returns:
+            int: The size of the object in bytes.
+
+        Raises:
+            FileNotFoundError: If the object does not exist.
+        """
+        return self.info(url).size
+
+    def read(self, url: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        """
+        Read a whole object, or its bytes `start` to `end` (excluded).
+
+        Raises:
+            FileNotFoundError: If the object does not exist.
+        """
+        filesystem, path = self._resolve(url)
+        with filesystem.open_input_file(path) as file:
+            if start == 0 and end is None:
+                return file.read()
+            end = file.size() if end is None else min(end, file.size())
+            return file.read_at(max(end - start, 0), start)
+
+    async def _read_all(self, urls: Sequence[str]) -> list:
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self.read, url) for url in urls),
+            return_exceptions=True,
+        )
+
+    def read_many(self, urls: Sequence[str]) -> List[Tuple[str, Optional[bytes]]]:
+        """
+        Download whole objects concurrently, `connections` at a time.
+
+        Args:
+            urls (Sequence[str]): Object URLs.
+
+        Returns:
+            List[Tuple[str, Optional[bytes]]]: Each URL with its content, in
+                order; None, logged, for the objects that could not be read.
+        """
+        results = []
+        for url, content in zip(urls, asyncio.run(self._read_all(urls))):
+            if isinstance(content, BaseException):
+                logging.error(f"❌ Failed to read {url}: {content}")
+                content = None
+            results.append((url, content))
+        return results
+
+    def open(self, url: str) -> pa.NativeFile:
+        """
+        Open an object as a seekable binary file read by ranged requests, so
+        large objects stream into the CSV, JSON and Parquet readers without
+        being staged on disk.
+
+        Args:
+            url (str): Object URL.
+
+        Returns:
+            pyarrow.NativeFile: The file, to be read by chunks.
+
+        Raises:
+            FileNotFoundError: If the object does not exist.
+        """
+        filesystem, path = self._resolve(url)
+        return filesystem.open_input_file(path)
+
+    def close(self) -> None:
+        """Stop the download threads; the filesystems close their connections."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._filesystems.clear()
+            self._expirations.clear()
+
+
+_default_reader: Optional[ObjectStoreReader] = None
+_default_reader_lock = threading.Lock()
+
+
+def get_object_store() -> ObjectStoreReader:
+    """
+    Returns:
+        ObjectStoreReader: The reader shared by the loaders, created from the
+            environment on first use (see `ObjectStoreReader.from_environment`).
+    """
+    global _default_reader
+    with _default_reader_lock:
+        if _default_reader is None:
+            _default_reader = ObjectStoreReader.from_environment()
+        return _default_reader
+
+
+def set_object_store(reader: Optional[ObjectStoreReader]) -> None:
+    """
+    Replace the reader shared by the loaders, closing the previous one.
+
+    Args:
+        reader (Optional[ObjectStoreReader]): The new reader; None creates one
+            from the environment on next use.
+    """
+    global _default_reader
+    with _default_reader_lock:
+        previous, _default_reader = _default_reader, reader
+    if previous is not None and previous is not reader:
+        previous.close()
+
+
+def open_object(url: str) -> pa.NativeFile:
+    """Open an object with the shared reader, see `ObjectStoreReader.open`."""
+    return get_object_store().open(url)
@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import re
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from typing import Dict, Optional
+
+ARTIFACT_EXTENSION = ".arrow"
+# Schema metadata listing the string[pyarrow] columns, which pandas would
+# otherwise read back as string[python]
+PYARROW_STRING_COLUMNS = b"pyarrow_string_columns"
+
+
+def run_artifact_dir(base_dir: str, run_id: str) -> str:
+    """
+    Folder holding the artifacts of one pipeline run.
+
+    Args:
+        base_dir (str): Root folder of all runs.
+        run_id (str): Identifier of the run, e.g. the Airflow `run_id`.
+
+    Returns:
+        str: `base_dir/<run_id>`, with characters unsafe in a path replaced.
+    """
+    return os.path.join(base_dir, re.sub(r"[^\w.-]", "_", run_id))
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    # Object columns mixing types, e.g. ids read as 9 and "9", are stored as strings
+    mixed = {}
+    for column in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            values = df[column]
+            mixed[column] = values.where(values.isna(), values.astype(str))
+            logging.warning(f"⚠ Column '{column}' mixes types, stored as strings")
+    return pa.Table.from_pandas(df.assign(**mixed), preserve_index=False)
+
+
+def write_artifact(df: pd.DataFrame, path: str) -> dict:
+    """
+    Write a dataframe as an uncompressed Arrow IPC file, which readers load
+    without decoding.
+
+    Column dtypes round-trip: categories as dictionaries, `string[pyarrow]`,
+    datetimes and object columns as Arrow types plus pandas metadata. Values
+    of an object column mixing types are stored as strings.
+    The file is written under a temporary name then renamed into place.
+
+    Args:
+        df (pd.DataFrame): The dataframe to write.
+        path (str): Path of the artifact.
+
+    Returns:
+        dict: A summary small enough for XCom: path, rows, columns and bytes.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    table = _to_arrow(df)
+    string_columns = [
+        column for column, dtype in df.dtypes.items() if dtype == "string[pyarrow]"
+    ]
+    table = table.replace_schema_metadata(
+        {
+            **table.schema.metadata,
+            PYARROW_STRING_COLUMNS: json.dumps(string_columns).encode("utf-8"),
+        }
+    )
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(temp_path, "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    summary = {
+        "path": path,
+        "rows": table.num_rows,
+        "columns": table.column_names,
+        "bytes": os.path.getsize(path),
+    }
+    logging.info(f"✔ Artifact saved at: {path} ({table.num_rows} rows)")
+    return summary
+
+
+def read_artifact(path: str) -> pd.DataFrame:
+    """
+    Read an artifact written by `write_artifact`.
+
+    The Arrow buffers are released column by column while the dataframe is
+    built, so the artifact is not held twice in memory.
+
+    Args:
+        path (str): Path of the artifact.
+
+    Returns:
+        pd.DataFrame: The dataframe, with its original dtypes.
+    """
+    with pa.OSFile(path, "rb") as source:
+        table = ipc.open_file(source).read_all()
+    metadata = table.schema.metadata or {}
+    df = table.to_pandas(self_destruct=True, split_blocks=True)
+    del table
+    for column in json.loads(metadata.get(PYARROW_STRING_COLUMNS, b"[]")):
+        df[column] = df[column].astype("string[pyarrow]")
+    return df
+
+
+def write_artifacts(
+    dataframes: Dict[str, Optional[pd.DataFrame]], directory: str
+) -> Dict[str, Optional[dict]]:
+    """
+    Write each named dataframe to `directory/<name>.arrow`.
+
+    Args:
+        dataframes (Dict[str, Optional[pd.DataFrame]]): Dataframes by name;
+            None values are kept as None.
+        directory (str): Folder receiving the artifacts.
+
+    Returns:
+        Dict[str, Optional[dict]]: The summary of each artifact.
+    """
+    return {
+        name: None
+        if df is None
+        else write_artifact(df, os.path.join(directory, f"{name}{ARTIFACT_EXTENSION}"))
+        for name, df in dataframes.items()
+    }
+
+
+def read_artifacts(
+    summaries: Dict[str, Optional[dict]]
+) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    Read back the artifacts listed by `write_artifacts`.
+
+    Args:
+        summaries (Dict[str, Optional[dict]]): Summaries by name.
+
+    Returns:
+        Dict[str, Optional[pd.DataFrame]]: The dataframes by name.
+    """
+    return {
+        name: None if summary is None else read_artifact(summary["path"])
+        for name, summary in summaries.items()
+    }
+
+
+def remove_run_artifacts(base_dir: str, run_id: str) -> None:
+    """
+    Delete the artifacts of a pipeline run, once its last task is done.
+
+    Args:
+        base_dir (str): Root folder of all runs.
+        run_id (str): Identifier of the run, e.g. the Airflow `run_id`.
+    """
+    run_dir = run_artifact_dir(base_dir, run_id)
+    try:
+        shutil.rmtree(run_dir)
+    except FileNotFoundError:
+        return
+    logging.info(f"✔ Artifacts removed: {run_dir}")
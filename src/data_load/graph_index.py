@@ -0,0 +1,238 @@
+import json
+import os
+import logging
+import numpy as np
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Bump when the layout of the index files changes
+INDEX_VERSION = 1
+
+META_FILE = "index.json"
+
+
+def _save_array(index_dir: str, name: str, array: np.ndarray) -> None:
+    path = os.path.join(index_dir, f"{name}.npy")
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        np.save(file, array)
+    os.replace(temp_path, path)
+
+
+def _save_strings(index_dir: str, name: str, values: Sequence[str]) -> None:
+    """Store strings as one UTF-8 blob plus offsets, so one value is read at a time."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    _save_array(index_dir, f"{name}_offsets", offsets)
+    _save_array(index_dir, f"{name}_blob", np.frombuffer(b"".join(encoded), np.uint8))
+    # Positions of the values in sorted order, for binary search by name
+    _save_array(
+        index_dir,
+        f"{name}_order",
+        np.array(sorted(range(len(encoded)), key=encoded.__getitem__), np.int64),
+    )
+
+
+def build_graph_index(
+    relationships: Mapping,
+    index_dir: str,
+    json_path: Optional[str] = None,
+    spans: Optional[List[Tuple[int, int]]] = None,
+) -> None:
+    """
+    Write a compact, memory-mappable index of the drug mentions graph.
+
+    The index holds, as `.npy` arrays: drug and journal names, journal -> drug ids
+    (CSR layout), per-journal mention and unique drug counts, and the byte span of
+    each drug's entry in the JSON graph so a single drug can be read on its own.
+
+    Args:
+        relationships (Mapping): The graph, mapping each drug to its publications.
+        index_dir (str): Folder receiving the index files.
+        json_path (Optional[str]): Path of the JSON graph the spans refer to.
+        spans (Optional[List[Tuple[int, int]]]): Byte span of each drug's entry,
+            as returned by `save_to_json`.
+
+    Raises:
+        ValueError: If the number of spans does not match the number of drugs.
+    """
+    if spans is not None and len(spans) != len(relationships):
+        raise ValueError("There must be one byte span per drug of the graph.")
+    os.makedirs(index_dir, exist_ok=True)
+
+    journal_ids: Dict[str, int] = {}
+    journal_drugs: List[List[int]] = []
+    mention_counts: List[int] = []
+
+    for drug_id, details in enumerate(relationships.values()):
+        for publication in details.get("publications", []):
+            journal = publication.get("journal")
+            if not isinstance(journal, str) or not journal:
+                continue
+            journal_id = journal_ids.setdefault(journal, len(journal_ids))
+            if journal_id == len(journal_drugs):
+                journal_drugs.append([])
+                mention_counts.append(0)
+            # Drugs are visited one after the other, so a drug is only added once
+            drugs = journal_drugs[journal_id]
+            if not drugs or drugs[-1] != drug_id:
+                drugs.append(drug_id)
+            mention_counts[journal_id] += 1
+
+    unique_drugs = np.array([len(drugs) for drugs in journal_drugs], dtype=np.int64)
+    journal_drug_offsets = np.zeros(len(journal_drugs) + 1, dtype=np.int64)
+    np.cumsum(unique_drugs, out=journal_drug_offsets[1:])
+
+    _save_strings(index_dir, "drug", [str(drug) for drug in relationships])
+    _save_strings(index_dir, "journal", list(journal_ids))
+    _save_array(index_dir, "journal_drug_offsets", journal_drug_offsets)
+    _save_array(
+        index_dir,
+        "journal_drug_ids",
+        np.array([d for drugs in journal_drugs for d in drugs], dtype=np.int32),
+    )
+    _save_array(index_dir, "journal_unique_drugs", unique_drugs)
+    _save_array(index_dir, "journal_mentions", np.array(mention_counts, dtype=np.int64))
+    _save_array(
+        index_dir,
+        "drug_spans",
+        np.array(spans or [], dtype=np.int64).reshape(-1, 2),
+    )
+
+    # Written last: an index without its meta file is never opened
+    meta = {
+        "version": INDEX_VERSION,
+        "json_path": os.path.abspath(json_path) if json_path else None,
+        "drugs": len(relationships),
+        "journals": len(journal_ids),
+    }
+    meta_path = os.path.join(index_dir, META_FILE)
+    with open(f"{meta_path}.{os.getpid()}.tmp", "w", encoding="utf-8") as file:
+        json.dump(meta, file, indent=4)
+    os.replace(f"{meta_path}.{os.getpid()}.tmp", meta_path)
+
+    logging.info(
+        f"✔ Graph index saved at: {index_dir} "
+        f"({len(relationships)} drugs, {len(journal_ids)} journals)"
+    )
+
+
+class GraphIndex:
+    """
+    Read-only view over an index written by `build_graph_index`.
+
+    Arrays are memory-mapped on first use, so a query only touches the pages it
+    needs instead of parsing the whole JSON graph.
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        Open an index.
+
+        Args:
+            index_dir (str): Folder holding the index files.
+
+        Raises:
+            FileNotFoundError: If the folder holds no index.
+            ValueError: If the index was written with another layout version.
+        """
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, META_FILE), "r", encoding="utf-8") as file:
+            self.meta = json.load(file)
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(
+                f"Unsupported graph index version {self.meta.get('version')} "
+                f"in {index_dir}."
+            )
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def _array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(
+                os.path.join(self.index_dir, f"{name}.npy"), mmap_mode="r"
+            )
+        return self._arrays[name]
+
+    def _bytes(self, kind: str, position: int) -> bytes:
+        offsets = self._array(f"{kind}_offsets")
+        start, end = int(offsets[position]), int(offsets[position + 1])
+        return bytes(self._array(f"{kind}_blob")[start:end])
+
+    def _string(self, kind: str, position: int) -> str:
+        return self._bytes(kind, position).decode("utf-8")
+
+    def _find(self, kind: str, value: str) -> int:
+        """Binary search a name; returns its position or -1."""
+        order = self._array(f"{kind}_order")
+        target = value.encode("utf-8")
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if self._bytes(kind, int(order[middle])) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and self._bytes(kind, int(order[low])) == target:
+            return int(order[low])
+        return -1
+
+    def drug(self, drug_id: int) -> str:
+        """Name of a drug from its position in the graph."""
+        return self._string("drug", drug_id)
+
+    def journal(self, journal_id: int) -> str:
+        """Name of a journal from its id (order of first appearance in the graph)."""
+        return self._string("journal", journal_id)
+
+    def top_journals_by_unique_drugs(self, k: int = 1) -> List[dict]:
+        """
+        Journals mentioning the most unique drugs; ties keep graph order.
+
+        Args:
+            k (int): Number of journals to return.
+
+        Returns:
+            List[dict]: Dictionaries with the journal name, its number of unique
+                drugs and its number of mentions.
+        """
+        unique_drugs = self._array("journal_unique_drugs")
+        mentions = self._array("journal_mentions")
+        top = np.argsort(-np.asarray(unique_drugs), kind="stable")[:k]
+        return [
+            {
+                "journal": self.journal(int(journal_id)),
+                "unique_drugs": int(unique_drugs[journal_id]),
+                "mentions": int(mentions[journal_id]),
+            }
+            for journal_id in top
+        ]
+
+    def journal_drugs(self, journal: str) -> List[str]:
+        """Drugs mentioned by a journal, in graph order (empty if unknown)."""
+        journal_id = self._find("journal", journal)
+        if journal_id < 0:
+            return []
+        offsets = self._array("journal_drug_offsets")
+        start, end = int(offsets[journal_id]), int(offsets[journal_id + 1])
+        drug_ids = self._array("journal_drug_ids")[start:end]
+        return [self.drug(int(drug_id)) for drug_id in drug_ids]
+
+    def drug_publications(self, drug: str) -> List[dict]:
+        """
+        Publications of one drug, read from its byte span in the JSON graph.
+
+        Raises:
+            KeyError: If the drug is not in the graph.
+            ValueError: If the index was built without byte spans.
+        """
+        drug_id = self._find("drug", drug)
+        if drug_id < 0:
+            raise KeyError(drug)
+        spans = self._array("drug_spans")
+        if len(spans) == 0 or not self.meta.get("json_path"):
+            raise ValueError("The graph index was built without JSON byte spans.")
+        start, end = (int(value) for value in spans[drug_id])
+        with open(self.meta["json_path"], "rb") as file:
+            file.seek(start)
+            return json.loads(file.read(end - start))["publications"]
@@ -1,42 +1,113 @@
 import json
 import os
 import logging
+from collections.abc import Mapping
+from typing import Any, BinaryIO, List, Tuple
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+INDENT = 4
 
 
-def save_to_json(data: dict, file_output_path: str) -> None:
+def _encode_key(key: Any) -> str:
+    """Encode a mapping key the way `json.dumps` does (non-str keys are stringified)."""
+    if isinstance(key, str):
+        return json.dumps(key, ensure_ascii=False)
+    # '{"<key>": 0}' -> '"<key>"'
+    return json.dumps({key: 0}, ensure_ascii=False)[1:-4]
+
+
+def _write_json_stream(
+    data: Any, file: BinaryIO, compact: bool
+) -> List[Tuple[int, int]]:
+    """
+    Write `data` to `file` as UTF-8, serializing one top-level entry at a time.
+
+    The indented output is byte-identical to `json.dump(data, file, indent=4,
+    ensure_ascii=False)`; only one entry is held as a string at any time.
+
+    Returns:
+        List[Tuple[int, int]]: The [start, end) byte span of each top-level value
+            when `data` is a mapping, in iteration order.
+    """
+    if compact:
+        options = {"ensure_ascii": False, "separators": (",", ":")}
+        item_separator, key_separator = ",", ":"
+        opening, closing = "{", "}"
+    else:
+        options = {"ensure_ascii": False, "indent": INDENT}
+        item_separator, key_separator = ",\n" + " " * INDENT, ": "
+        opening, closing = "{\n" + " " * INDENT, "\n}"
+
+    if not isinstance(data, Mapping) or not data:
+        # An empty mapping which is not a dict, e.g. a graph, is written as {}
+        data = {} if isinstance(data, Mapping) else data
+        file.write(json.dumps(data, **options).encode("utf-8"))
+        return []
+
+    spans = []
+    offset = file.write(opening.encode("utf-8"))
+    for position, (key, value) in enumerate(data.items()):
+        encoded = json.dumps(value, **options)
+        if not compact:
+            # Nested lines are one level deeper; newlines inside strings are escaped
+            encoded = encoded.replace("\n", "\n" + " " * INDENT)
+        prefix = (item_separator if position else "") + _encode_key(key) + key_separator
+        offset += file.write(prefix.encode("utf-8"))
+        end = offset + file.write(encoded.encode("utf-8"))
+        spans.append((offset, end))
+        offset = end
+    file.write(closing.encode("utf-8"))
+    return spans
+
+
+def save_to_json(
+    data: dict, file_output_path: str, compact: bool = False
+) -> List[Tuple[int, int]]:
     """
     Save data to a JSON file.
 
+    The data is serialized once, entry by entry, into a temporary file in the
+    destination folder, which is then atomically renamed into place. Readers
+    therefore never see a partially written file.
+
     Args:
         data (dict): The data to save.
         file_output_path (str): The path to save the JSON file.
+        compact (bool): Write without indentation or spaces after separators.
+
+    Returns:
+        List[Tuple[int, int]]: The [start, end) byte span of each top-level value
+            in the file, used to index the graph (empty if `data` is not a dict).
 
     Raises:
         ValueError: If the data is not serializable to JSON.
         IOError: If there is an issue writing the file.
     """
+    temp_path = None
     try:
-        # Vérifier si les données sont bien sérialisables avant d'écrire le fichier
-        json.dumps(data, ensure_ascii=False, indent=4)
-
         # S'assurer que le dossier de destination existe
-        os.makedirs(os.path.dirname(file_output_path), exist_ok=True)
+        output_dir = os.path.dirname(file_output_path) or "."
+        os.makedirs(output_dir, exist_ok=True)
 
-        # Sauvegarde du fichier JSON
-        with open(file_output_path, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4, ensure_ascii=False)
+        # Écriture dans un fichier temporaire puis renommage atomique
+        temp_path = os.path.join(
+            output_dir, f".{os.path.basename(file_output_path)}.{os.getpid()}.tmp"
+        )
+        with open(temp_path, "wb") as file:
+            spans = _write_json_stream(data, file, compact)
+        os.replace(temp_path, file_output_path)
+        temp_path = None
 
         logging.info(f"✔ JSON file successfully saved at: {file_output_path}")
+        return spans
 
-    except TypeError as e:
+    except (TypeError, ValueError) as e:
         logging.error(f"❌ Data is not serializable to JSON: {e}")
         raise ValueError(f"Data provided is not serializable to JSON: {e}")
 
     except IOError as e:
         logging.error(f"❌ Failed to write JSON file at {file_output_path}: {e}")
         raise IOError(f"Failed to write JSON file at {file_output_path}: {e}")
+
+    finally:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -0,0 +1,77 @@
+import logging
+from typing import Optional, Sequence
+
+from monitoring.metrics import PipelineMetrics, count_rows
+from .graph_index import build_graph_index
+from .load import save_to_json
+from .parquet import save_to_parquet
+from config import (
+    OUTPUT_FORMATS,
+    OUTPUT_JSON_PATH,
+    GRAPH_INDEX_DIR,
+    PARQUET_OUTPUT_DIR,
+    PARQUET_PARTITION_BY,
+    PARQUET_COMPRESSION,
+)
+
+SUPPORTED_OUTPUT_FORMATS = ("json", "parquet")
+
+
+def check_output_formats(formats: Sequence[str]) -> None:
+    """
+    Reject output formats other than "json" and "parquet".
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    unknown = [fmt for fmt in formats if fmt not in SUPPORTED_OUTPUT_FORMATS]
+    if unknown:
+        raise ValueError(
+            f"Unknown output formats {unknown}. "
+            f"Expected some of {SUPPORTED_OUTPUT_FORMATS}."
+        )
+
+
+def save_graph(
+    relationships,
+    mentions,
+    metrics: Optional[PipelineMetrics] = None,
+    formats: Sequence[str] = OUTPUT_FORMATS,
+    json_path: str = OUTPUT_JSON_PATH,
+    index_dir: str = GRAPH_INDEX_DIR,
+    parquet_dir: str = PARQUET_OUTPUT_DIR,
+) -> None:
+    """
+    Save the drug link graph in every format of `formats`, the same way from
+    `main.py` and from the DAG.
+
+    Args:
+        relationships (Mapping): The relationships, written as JSON with its index.
+        mentions: The mention table or relationships, written as Parquet.
+        metrics (Optional[PipelineMetrics]): Collector measuring each save, if any.
+        formats (Sequence[str]): Output formats among "json" and "parquet".
+        json_path (str): Path of the JSON graph.
+        index_dir (str): Folder of the graph index built next to the JSON.
+        parquet_dir (str): Root folder of the Parquet dataset.
+
+    Raises:
+        ValueError: If a format is unknown, before anything is written.
+    """
+    check_output_formats(formats)
+    metrics = metrics or PipelineMetrics(enabled=False)
+
+    if "json" in formats:
+        logging.info("=" * 50)
+        logging.info(f"5- Saving final JSON output to {json_path}...\n")
+        with metrics.stage("save_to_json", rows_in=len(relationships)):
+            spans = save_to_json(relationships, json_path)
+        with metrics.stage("build_graph_index", rows_in=len(relationships)):
+            build_graph_index(relationships, index_dir, json_path, spans)
+
+    if "parquet" in formats:
+        logging.info("=" * 50)
+        logging.info(f"5- Saving Parquet output to {parquet_dir}...\n")
+        with metrics.stage("save_to_parquet", rows_in=count_rows(mentions)):
+            save_to_parquet(
+                mentions, parquet_dir, PARQUET_PARTITION_BY, PARQUET_COMPRESSION
+            )
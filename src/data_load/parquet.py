@@ -0,0 +1,186 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from collections.abc import Mapping
+from typing import Sequence, Union
+
+PARQUET_COLUMNS = ["drug", "source", "title", "journal", "date", "year"]
+PARTITION_COLUMNS = ("source", "drug", "year")
+# Folder level of the "drug" partition; the files keep the drug name itself
+DRUG_PARTITION_FIELD = "drug_key"
+# Longest drug name kept in a folder name, before its hash suffix
+MAX_DRUG_KEY_LENGTH = 64
+_UNSAFE_KEY_CHARACTERS = re.compile(r"[^A-Za-z0-9_-]+")
+PARQUET_COMPRESSIONS = ("snappy", "gzip", "brotli", "zstd", "lz4", "none")
+
+
+def _mention_frame(data: Union[pd.DataFrame, Mapping]) -> pd.DataFrame:
+    """One row per mention with the drug, source, title, journal and date."""
+    if hasattr(data, "to_mention_frame"):
+        # A RelationshipGraph expands to rows without building its nested dicts
+        data = data.to_mention_frame()
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(
+            {column: data[column].astype(object) for column in PARQUET_COLUMNS[:-1]}
+        )
+    if isinstance(data, Mapping):
+        return pd.DataFrame(
+            [
+                (drug, *(publication.get(field) for field in PARQUET_COLUMNS[1:-1]))
+                for drug, details in data.items()
+                for publication in details.get("publications", [])
+            ],
+            columns=PARQUET_COLUMNS[:-1],
+            dtype=object,
+        )
+    raise TypeError("Expected a mention table or a relationships mapping.")
+
+
+def mentions_to_arrow(data: Union[pd.DataFrame, Mapping]) -> pa.Table:
+    """
+    Convert mentions to an Arrow table with dictionary-encoded string columns.
+
+    Args:
+        data (Union[pd.DataFrame, Mapping]): A mention table returned by
+            `find_mention_table`, or the relationships returned by
+            `build_relationships`.
+
+    Returns:
+        pa.Table: The columns drug, source, title, journal, date and year (the
+            first four characters of the date, null when the date is empty).
+    """
+    frame = _mention_frame(data)
+    dates = frame["date"].where(frame["date"].astype(bool) & frame["date"].notna())
+    frame["date"] = dates
+    frame["year"] = dates.str[:4]
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    return pa.table(
+        {
+            column: pc.dictionary_encode(table[column].cast(pa.string()))
+            for column in PARQUET_COLUMNS
+        }
+    )
+
+
+def drug_partition_key(drug: str) -> str:
+    """
+    Folder-safe form of a drug name, used as its `drug_key=` partition value.
+
+    Names made of ASCII letters, digits, "_" and "-" are kept as they are.
+    Other names are reduced to these characters and suffixed with a hash of
+    the name, so two drugs never share a folder.
+
+    Args:
+        drug (str): The drug name.
+
+    Returns:
+        str: The partition value, e.g. "ASPIRIN" or "A_B-1f2e3d4c" for "A/B".
+    """
+    key = _UNSAFE_KEY_CHARACTERS.sub("_", drug).strip("_")[:MAX_DRUG_KEY_LENGTH]
+    if key != drug:
+        key = f"{key}-{hashlib.sha1(drug.encode('utf-8')).hexdigest()[:8]}"
+    return key
+
+
+def _with_drug_keys(table: pa.Table) -> pa.Table:
+    """Add the `drug_partition_key` column, computed once per distinct drug."""
+    drugs = table["drug"].combine_chunks()
+    keys = pa.array([drug_partition_key(drug) for drug in drugs.dictionary.to_pylist()])
+    return table.append_column(
+        DRUG_PARTITION_FIELD, pa.DictionaryArray.from_arrays(drugs.indices, keys)
+    )
+
+
+def save_to_parquet(
+    data: Union[pd.DataFrame, Mapping],
+    output_dir: str,
+    partition_by: Sequence[str] = ("source",),
+    compression: str = "snappy",
+) -> None:
+    """
+    Save the drug mentions as a Hive-partitioned Parquet dataset.
+
+    Each partition column becomes a `column=value` folder level, so readers can
+    prune partitions (e.g. `pyarrow.dataset.dataset(output_dir,
+    partitioning="hive")` with a filter) and read only the columns they need.
+    Drug names are not used as folder names as they are: the "drug" level is
+    `drug_key=<drug_partition_key(drug)>`, and the files keep the drug column.
+    The dataset is written to a temporary folder next to `output_dir`, which
+    then replaces the previous dataset.
+
+    Args:
+        data (Union[pd.DataFrame, Mapping]): A mention table or relationships.
+        output_dir (str): Root folder of the dataset.
+        partition_by (Sequence[str]): Partition columns in folder order:
+            "source" first, then optionally "drug" and/or "year".
+        compression (str): Parquet compression codec.
+
+    Raises:
+        ValueError: If the partition columns do not start with "source", or a
+            partition column or the compression is not supported.
+        IOError: If there is an issue writing the dataset.
+    """
+    partition_by = list(partition_by)
+    unknown = [column for column in partition_by if column not in PARTITION_COLUMNS]
+    if unknown:
+        raise ValueError(
+            f"Unsupported partition columns {unknown}. "
+            f"Expected some of {PARTITION_COLUMNS}."
+        )
+    if partition_by[:1] != ["source"] or len(set(partition_by)) < len(partition_by):
+        raise ValueError(
+            f"Partition columns {partition_by} must start with 'source', "
+            "optionally followed by 'drug' and/or 'year'."
+        )
+    if compression not in PARQUET_COMPRESSIONS:
+        raise ValueError(
+            f"Unsupported compression '{compression}'. "
+            f"Expected one of {PARQUET_COMPRESSIONS}."
+        )
+
+    table = mentions_to_arrow(data)
+    fields = list(partition_by)
+    if "drug" in partition_by:
+        table = _with_drug_keys(table)
+        fields[partition_by.index("drug")] = DRUG_PARTITION_FIELD
+    partitioning = ds.partitioning(
+        pa.schema([table.schema.field(column) for column in fields]), flavor="hive"
+    )
+    file_options = ds.ParquetFileFormat().make_write_options(
+        compression=compression, use_dictionary=True
+    )
+
+    output_dir = os.path.abspath(output_dir)
+    temp_dir = f"{output_dir}.{os.getpid()}.tmp"
+    try:
+        ds.write_dataset(
+            table,
+            temp_dir,
+            format="parquet",
+            partitioning=partitioning,
+            file_options=file_options,
+            existing_data_behavior="delete_matching",
+        )
+        if os.path.exists(output_dir):
+            shutil.rmtree(output_dir)
+        os.replace(temp_dir, output_dir)
+
+        logging.info(
+            f"✔ Parquet dataset successfully saved at: {output_dir} "
+            f"({table.num_rows} mentions, partitioned by {partition_by})"
+        )
+
+    except (OSError, pa.ArrowException) as e:
+        logging.error(f"❌ Failed to write Parquet dataset at {output_dir}: {e}")
+        raise IOError(f"Failed to write Parquet dataset at {output_dir}: {e}")
+
+    finally:
+        if os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir)
@@ -0,0 +1,419 @@
+import json
+import os
+import re
+import logging
+import numpy as np
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .graph_index import _save_array
+
+# pandas and pyarrow only build the index: queries import numpy alone
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Bump when the layout of the index files changes
+TITLE_INDEX_VERSION = 1
+
+META_FILE = "index.json"
+
+# Indexed sources, in document order: (key of the cleaned frames, source, title column)
+INDEXED_SOURCES = [
+    ("PubMed", "pubmed", "title"),
+    ("ClinicalTrials", "clinical_trials", "scientific_title"),
+]
+
+# Titles are indexed by their lower-cased word runs, like the matcher's word tokens
+TERM_PATTERN = re.compile(r"\w+")
+
+# Titles tokenized at a time while building, to bound the temporary lists
+TOKENIZE_BATCH_SIZE = 500_000
+
+# Day number of documents without a valid date
+MISSING_DATE = np.iinfo(np.int32).min
+
+
+def title_terms(text: str) -> List[str]:
+    """
+    Split a title or a query into index terms.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        List[str]: Its lower-cased word runs, in order.
+    """
+    return TERM_PATTERN.findall(text.lower())
+
+
+def _save_strings(index_dir: str, name: str, values: Sequence) -> None:
+    """Store strings as one UTF-8 blob plus offsets; missing values are empty."""
+    import pyarrow as pa
+
+    array = pa.array(values, type=pa.large_string(), from_pandas=True)
+    array = array.fill_null("")
+    first, last = array.offset, array.offset + len(array) + 1
+    offsets = np.frombuffer(array.buffers()[1], dtype=np.int64)[first:last]
+    data = array.buffers()[2]
+    blob = np.frombuffer(data, dtype=np.uint8) if data else np.empty(0, np.uint8)
+    start, end = offsets[0], offsets[-1]
+    _save_array(index_dir, f"{name}_offsets", offsets - start)
+    _save_array(index_dir, f"{name}_blob", blob[start:end])
+
+
+def _csr(keys: np.ndarray, values: np.ndarray, size: int) -> Tuple[np.ndarray, ...]:
+    """Offsets of `size` keys, then the values grouped by key in stable order."""
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=offsets[1:])
+    return offsets, values[order]
+
+
+def _iter_term_postings(
+    titles: "pd.Series",
+) -> Iterator[Tuple[List[str], np.ndarray, np.ndarray]]:
+    """Yield, per batch of titles, its distinct terms and its (term, doc) pairs."""
+    import pandas as pd
+
+    for start in range(0, len(titles), TOKENIZE_BATCH_SIZE):
+        end = start + TOKENIZE_BATCH_SIZE
+        batch = titles.iloc[start:end]
+        terms = [title_terms(t) if isinstance(t, str) else [] for t in batch]
+        counts = np.fromiter(map(len, terms), dtype=np.int64, count=len(terms))
+        flat = np.fromiter(
+            (term for found in terms for term in found),
+            dtype=object,
+            count=int(counts.sum()),
+        )
+        codes, uniques = pd.factorize(flat)
+        docs = np.repeat(np.arange(start, start + len(batch), dtype=np.int64), counts)
+        yield list(uniques), codes.astype(np.int64), docs
+
+
+def build_title_index(dataframes: Dict[str, "pd.DataFrame"], index_dir: str) -> dict:
+    """
+    Write a memory-mappable inverted index of the cleaned publications.
+
+    Every PubMed then ClinicalTrials row is a document. The index holds, as
+    `.npy` arrays: the sorted title terms with the documents containing each
+    term (CSR layout), the sorted journals with their documents, the documents
+    sorted by date, and the source, id, title, journal and date of each
+    document, so a query never loads the dataset.
+
+    Args:
+        dataframes (Dict[str, pd.DataFrame]): Cleaned frames returned by
+            `clean_data`; only 'PubMed' and 'ClinicalTrials' are indexed.
+        index_dir (str): Folder receiving the index files.
+
+    Returns:
+        dict: The index meta data: version, documents, terms and journals.
+
+    Raises:
+        ValueError: If a source lacks its title column.
+    """
+    import pandas as pd
+
+    frames = []
+    for key, source, title_column in INDEXED_SOURCES:
+        df = dataframes.get(key)
+        if df is None:
+            continue
+        if title_column not in df.columns:
+            raise ValueError(f"Missing required '{title_column}' column in {key}.")
+        columns = {
+            "id": "id",
+            title_column: "title",
+            "journal": "journal",
+            "date": "date",
+        }
+        frame = pd.DataFrame(
+            {
+                name: (
+                    df[column].astype(object)
+                    if column in df.columns
+                    else pd.Series(np.nan, index=df.index, dtype=object)
+                )
+                for column, name in columns.items()
+            }
+        )
+        frame["source"] = source
+        frames.append(frame)
+    docs = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    os.makedirs(index_dir, exist_ok=True)
+    n_docs = len(docs)
+
+    # Terms: global ids in order of appearance, then renumbered in sorted order
+    vocabulary: Dict[str, int] = {}
+    pairs = []
+    titles = docs["title"] if n_docs else pd.Series([], dtype=object)
+    for uniques, codes, doc_ids in _iter_term_postings(titles):
+        mapping = np.array(
+            [vocabulary.setdefault(term, len(vocabulary)) for term in uniques],
+            dtype=np.int64,
+        )
+        # One sortable key per pair: term in the high bits, document in the low
+        pairs.append((mapping[codes] << 32) | doc_ids)
+    terms = list(vocabulary)
+    rank = np.empty(len(terms), dtype=np.int64)
+    rank[sorted(range(len(terms)), key=terms.__getitem__)] = np.arange(len(terms))
+    keys = np.concatenate(pairs) if pairs else np.empty(0, dtype=np.int64)
+    keys = np.unique((rank[keys >> 32] << 32) | (keys & 0xFFFFFFFF))
+    term_offsets = np.searchsorted(keys >> 32, np.arange(len(terms) + 1))
+    _save_strings(index_dir, "term", sorted(terms))
+    _save_array(index_dir, "term_postings_offsets", term_offsets.astype(np.int64))
+    _save_array(index_dir, "term_postings", (keys & 0xFFFFFFFF).astype(np.int32))
+    del keys, pairs
+
+    # Journals: sorted names, then the documents of each journal
+    journals = docs["journal"] if n_docs else pd.Series([], dtype=object)
+    journals = journals.where(journals.map(lambda value: isinstance(value, str)))
+    codes, names = pd.factorize(journals, sort=True)
+    has_journal = codes >= 0
+    journal_offsets, journal_postings = _csr(
+        codes[has_journal],
+        np.flatnonzero(has_journal).astype(np.int32),
+        len(names),
+    )
+    _save_strings(index_dir, "journal", list(names))
+    _save_array(index_dir, "journal_postings_offsets", journal_offsets)
+    _save_array(index_dir, "journal_postings", journal_postings)
+    _save_array(index_dir, "doc_journal", codes.astype(np.int32))
+
+    # Dates: day numbers per document, and documents sorted by date
+    dates = pd.to_datetime(
+        docs["date"] if n_docs else pd.Series([], dtype=object),
+        format="%Y-%m-%d",
+        errors="coerce",
+    )
+    days = np.full(n_docs, MISSING_DATE, dtype=np.int32)
+    valid = dates.notna().to_numpy()
+    days[valid] = (dates[valid].to_numpy(dtype="datetime64[D]")).astype(np.int32)
+    date_order = np.flatnonzero(valid)
+    date_order = date_order[np.argsort(days[date_order], kind="stable")]
+    _save_array(index_dir, "doc_date", days)
+    _save_array(index_dir, "date_order", date_order.astype(np.int32))
+    _save_array(index_dir, "date_sorted", days[date_order])
+
+    sources = [source for _, source, _ in INDEXED_SOURCES]
+    source_codes = (
+        docs["source"].map(sources.index).to_numpy(dtype=np.uint8)
+        if n_docs
+        else np.empty(0, dtype=np.uint8)
+    )
+    _save_array(index_dir, "doc_source", source_codes)
+    _save_strings(index_dir, "doc_id", docs["id"] if n_docs else [])
+    _save_strings(index_dir, "doc_title", titles)
+
+    # Written last: an index without its meta file is never opened
+    meta = {
+        "version": TITLE_INDEX_VERSION,
+        "sources": sources,
+        "documents": n_docs,
+        "terms": len(terms),
+        "journals": len(names),
+    }
+    meta_path = os.path.join(index_dir, META_FILE)
+    with open(f"{meta_path}.{os.getpid()}.tmp", "w", encoding="utf-8") as file:
+        json.dump(meta, file, indent=4)
+    os.replace(f"{meta_path}.{os.getpid()}.tmp", meta_path)
+
+    logging.info(
+        f"✔ Title index saved at: {index_dir} "
+        f"({n_docs} publications, {len(terms)} terms, {len(names)} journals)"
+    )
+    return meta
+
+
+class TitleIndex:
+    """
+    Read-only view over an index written by `build_title_index`.
+
+    Arrays are memory-mapped on first use: a query binary-searches the sorted
+    terms and journals, then only reads the postings and documents it needs.
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        Open an index.
+
+        Args:
+            index_dir (str): Folder holding the index files.
+
+        Raises:
+            FileNotFoundError: If the folder holds no index.
+            ValueError: If the index was written with another layout version.
+        """
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, META_FILE), "r", encoding="utf-8") as file:
+            self.meta = json.load(file)
+        if self.meta.get("version") != TITLE_INDEX_VERSION:
+            raise ValueError(
+                f"Unsupported title index version {self.meta.get('version')} "
+                f"in {index_dir}."
+            )
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.meta["documents"]
+
+    def _array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(
+                os.path.join(self.index_dir, f"{name}.npy"), mmap_mode="r"
+            )
+        return self._arrays[name]
+
+    def _bytes(self, kind: str, position: int) -> bytes:
+        offsets = self._array(f"{kind}_offsets")
+        start, end = int(offsets[position]), int(offsets[position + 1])
+        return bytes(self._array(f"{kind}_blob")[start:end])
+
+    def _string(self, kind: str, position: int) -> str:
+        return self._bytes(kind, position).decode("utf-8")
+
+    def _find(self, kind: str, value: str) -> int:
+        """Binary search a sorted name; returns its position or -1."""
+        target = value.encode("utf-8")
+        low, high = 0, len(self._array(f"{kind}_offsets")) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._bytes(kind, middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        size = len(self._array(f"{kind}_offsets")) - 1
+        if low < size and self._bytes(kind, low) == target:
+            return low
+        return -1
+
+    def _postings(self, kind: str, value: str) -> np.ndarray:
+        position = self._find(kind, value)
+        if position < 0:
+            return np.empty(0, dtype=np.int32)
+        offsets = self._array(f"{kind}_postings_offsets")
+        start, end = int(offsets[position]), int(offsets[position + 1])
+        return self._array(f"{kind}_postings")[start:end]
+
+    def _date_range(self, start: Optional[str], end: Optional[str]) -> np.ndarray:
+        """Documents dated within [start, end], in document order."""
+        dates = self._array("date_sorted")
+        low = 0 if start is None else np.searchsorted(dates, _day(start), "left")
+        high = len(dates) if end is None else np.searchsorted(dates, _day(end), "right")
+        return np.sort(self._array("date_order")[low:high])
+
+    def search(
+        self,
+        terms: Optional[str] = None,
+        journal: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Find the documents matching every given filter.
+
+        Args:
+            terms (Optional[str]): Words that must all appear in the title, in
+                any order and case, e.g. a drug name.
+            journal (Optional[str]): Exact journal name.
+            start (Optional[str]): First date, 'YYYY-MM-DD', included.
+            end (Optional[str]): Last date, 'YYYY-MM-DD', included.
+
+        Returns:
+            np.ndarray: Sorted document numbers, see `publications`.
+
+        Raises:
+            ValueError: If no filter is given or a date is not 'YYYY-MM-DD'.
+        """
+        postings = []
+        if terms is not None:
+            words = title_terms(terms)
+            if not words:
+                raise ValueError(f"The terms '{terms}' contain no word.")
+            postings += [self._postings("term", word) for word in words]
+        if journal is not None:
+            postings.append(self._postings("journal", journal))
+        dated = start is not None or end is not None
+        if not postings:
+            if not dated:
+                raise ValueError("Give at least terms, a journal or a date range.")
+            return self._date_range(start, end)
+
+        # Start from the shortest postings and look the others up by bisection
+        postings.sort(key=len)
+        found = np.asarray(postings[0])
+        for other in postings[1:]:
+            if not len(found):
+                break
+            positions = np.searchsorted(other, found)
+            positions[positions == len(other)] = 0
+            found = found[np.asarray(other[positions]) == found]
+
+        if dated and len(found):
+            days = np.asarray(self._array("doc_date")[found])
+            keep = days != MISSING_DATE
+            if start is not None:
+                keep &= days >= _day(start)
+            if end is not None:
+                keep &= days <= _day(end)
+            found = found[keep]
+        return found.astype(np.int64)
+
+    def publications(self, documents: Sequence[int]) -> List[dict]:
+        """
+        Read documents from the index.
+
+        Args:
+            documents (Sequence[int]): Document numbers returned by `search`.
+
+        Returns:
+            List[dict]: Per document: source, id, title, journal and date.
+        """
+        sources = self.meta["sources"]
+        results = []
+        for document in documents:
+            document = int(document)
+            journal = int(self._array("doc_journal")[document])
+            day = int(self._array("doc_date")[document])
+            results.append(
+                {
+                    "source": sources[int(self._array("doc_source")[document])],
+                    "id": self._string("doc_id", document),
+                    "title": self._string("doc_title", document),
+                    "journal": self._string("journal", journal) if journal >= 0 else "",
+                    "date": (
+                        str(np.datetime64(day, "D")) if day != MISSING_DATE else ""
+                    ),
+                }
+            )
+        return results
+
+    def query(
+        self,
+        terms: Optional[str] = None,
+        journal: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> dict:
+        """
+        Answer "which publications mention X in journal Y between A and B".
+
+        Args:
+            terms, journal, start, end: Filters, see `search`.
+            limit (Optional[int]): Most publications returned; all if None.
+
+        Returns:
+            dict: The number of matching publications and the first `limit`
+                of them, in document order.
+        """
+        found = self.search(terms, journal, start, end)
+        return {
+            "count": len(found),
+            "publications": self.publications(found[:limit]),
+        }
+
+
+def _day(date: str) -> int:
+    try:
+        return int(np.datetime64(date, "D").astype(np.int64))
+    except ValueError:
+        raise ValueError(f"Invalid date '{date}', expected 'YYYY-MM-DD'.")
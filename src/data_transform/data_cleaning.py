@@ -3,11 +3,6 @@ import logging
 import pandas as pd
 from typing import Dict
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
 
 def clean_data(dataframes_load_csv: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
     """
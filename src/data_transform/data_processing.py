@@ -1,43 +1,116 @@
 import logging
-from data_extract.extract import load_csv, load_json
+import os
+import pandas as pd
+from typing import Optional
+from data_extract.extract import SOURCE_SCHEMAS, load_csv, load_json
+from data_extract.ingest import load_sources
 from config import (
     DRUGS_FILE,
+    DRUG_SYNONYMS_FILE,
     PUBMED_CSV_FILE,
     CLINICAL_TRIALS_CSV_FILE,
     PUBMED_JSON_FILE,
+    INGEST_WORKERS,
+    INGEST_BATCH_FILES,
 )
 
 
-def load_csv_files():
+def _load_sources(input_files: dict) -> dict:
+    """Load each named source concurrently with its schema and log the outcome."""
+    schemas = {
+        "PubMed": SOURCE_SCHEMAS["pubmed"],
+        "ClinicalTrials": SOURCE_SCHEMAS["clinical_trials"],
+        "Drugs": SOURCE_SCHEMAS["drugs"],
+    }
+
+    for name, file_path in input_files.items():
+        logging.info(f"📂 Loading {name} files from: {file_path}...")
+
+    dataframes = load_sources(
+        {name: (file_path, schemas[name]) for name, file_path in input_files.items()},
+        workers=INGEST_WORKERS,
+        batch_files=INGEST_BATCH_FILES,
+    )
+
+    for name, df in dataframes.items():
+        if df is None:
+            logging.error(f"❌ {name} could not be loaded from: {input_files[name]}")
+        else:
+            logging.info(f"✔ {name} loaded successfully. {df.shape[0]} rows found.")
+
+    return dataframes
+
+
+def load_csv_files(input_files: Optional[dict] = None):
     """
     Load CSV datasets and return them as DataFrames.
 
+    Each configured path may be a single file, a directory or a glob pattern;
+    the three sources load concurrently (see `load_sources`).
+
+    Args:
+        input_files (Optional[dict]): Path of each of 'PubMed', 'ClinicalTrials'
+            and 'Drugs', e.g. a generated dataset; defaults to the configured files.
+
     Returns:
         dict: A dictionary containing DataFrames for 'PubMed', 'ClinicalTrials', and 'Drugs'.
               If a file fails to load, its value will be None.
     """
-    csv_files = {
-        "PubMed": PUBMED_CSV_FILE,
-        "ClinicalTrials": CLINICAL_TRIALS_CSV_FILE,
-        "Drugs": DRUGS_FILE,
-    }
+    if input_files is None:
+        input_files = {
+            "PubMed": PUBMED_CSV_FILE,
+            "ClinicalTrials": CLINICAL_TRIALS_CSV_FILE,
+            "Drugs": DRUGS_FILE,
+        }
+    return _load_sources(input_files)
 
-    dataframes = {}
-
-    for name, file_path in csv_files.items():
-        try:
-            logging.info(f"📂 Loading {name} CSV file from: {file_path}...")
-            df = load_csv(file_path)
-            dataframes[name] = df
-            logging.info(f"✔ {name} CSV loaded successfully. {df.shape[0]} rows found.")
-        except FileNotFoundError:
-            logging.error(f"❌ {name} CSV file not found at path: {file_path}")
-            dataframes[name] = None
-        except ValueError as e:
-            logging.error(f"❌ Error loading {name} CSV: {e}")
-            dataframes[name] = None
 
-    return dataframes
+def load_input_files():
+    """
+    Load every input, PubMed from both its CSV and its JSON file.
+
+    The PubMed JSON records are appended to the PubMed CSV rows, with ids read
+    as strings in both, so they go through the same cleaning and matching.
+
+    Returns:
+        dict: A dictionary containing DataFrames for 'PubMed', 'ClinicalTrials', and 'Drugs'.
+              If a source fails to load, its value will be None.
+    """
+    return _load_sources(
+        {
+            "PubMed": [PUBMED_CSV_FILE, PUBMED_JSON_FILE],
+            "ClinicalTrials": CLINICAL_TRIALS_CSV_FILE,
+            "Drugs": DRUGS_FILE,
+        }
+    )
+
+
+def load_drug_synonyms(
+    file_path: Optional[str] = DRUG_SYNONYMS_FILE,
+) -> Optional[pd.DataFrame]:
+    """
+    Load the drug synonyms, one row per surface form with its 'atccode'.
+
+    Synonyms are optional: no path, or a missing file, means no synonyms.
+
+    Args:
+        file_path (Optional[str]): CSV or Parquet file of synonyms; defaults to
+            the configured file.
+
+    Returns:
+        pd.DataFrame or None: The synonyms, or None if there are none.
+
+    Raises:
+        ValueError: If the file exists but cannot be loaded.
+    """
+    if not file_path or not os.path.exists(file_path):
+        logging.info("No drug synonyms file, matching drug names only.")
+        return None
+    synonyms_df = load_csv(file_path, schema=SOURCE_SCHEMAS["drug_synonyms"])
+    if synonyms_df is None:
+        raise ValueError(f"Failed to load drug synonyms file: {file_path}")
+    logging.info(f"✔ Drug synonyms loaded. {synonyms_df.shape[0]} synonyms found.")
+    return synonyms_df
 
 
 def load_json_file():
@@ -49,7 +122,9 @@ def load_json_file():
     """
     try:
         logging.info(f"📂 Loading PubMed JSON file from: {PUBMED_JSON_FILE}...")
-        pubmed_json_df = load_json(PUBMED_JSON_FILE)
+        pubmed_json_df = load_json(PUBMED_JSON_FILE, schema=SOURCE_SCHEMAS["pubmed"])
+        if pubmed_json_df is None:
+            raise ValueError("the file could not be parsed")
         logging.info(
             f"✔ PubMed JSON loaded successfully. {pubmed_json_df.shape[0]} rows found."
         )
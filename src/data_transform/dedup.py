@@ -0,0 +1,198 @@
+import logging
+import os
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+from config import DEDUP_PARTITIONS, DEDUP_PARTITION_ROWS, DEDUP_SPILL_DIR
+
+# A partition is split again at most this many times: past that, its rows
+# share too many hash bits to be split any further (e.g. one repeated id)
+MAX_SPLIT_DEPTH = 4
+
+# (ids as strings, 64-bit hashes of the ids, positions of the rows in the stream)
+IdBatch = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _dump(file: BinaryIO, value) -> None:
+    pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _iter_spilled(path: str) -> Iterator:
+    # The spill files only hold values written by this module
+    with open(path, "rb") as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+def _partition_path(directory: str, partition: int) -> str:
+    return os.path.join(directory, f"{partition}.pkl")
+
+
+def _partition_ids(
+    batches: Iterable[IdBatch], directory: str, partitions: int, depth: int
+) -> np.ndarray:
+    """
+    Spill id batches to `partitions` files of `directory`, by hash.
+
+    Each level of splitting reads other bits of the hash, and rows keep their
+    stream order within a partition. Returns the number of rows per partition.
+    """
+    os.makedirs(directory, exist_ok=True)
+    divisor = np.uint64(partitions) ** np.uint64(depth)
+    counts = np.zeros(partitions, dtype=np.int64)
+    files = [open(_partition_path(directory, p), "wb") for p in range(partitions)]
+    try:
+        for ids, hashes, positions in batches:
+            keys = (hashes // divisor) % np.uint64(partitions)
+            order = np.argsort(keys, kind="stable")
+            bounds = np.searchsorted(keys[order], np.arange(partitions + 1))
+            for partition in np.flatnonzero(np.diff(bounds)):
+                start, end = bounds[partition], bounds[partition + 1]
+                rows = order[start:end]
+                _dump(files[partition], (ids[rows], hashes[rows], positions[rows]))
+                counts[partition] += len(rows)
+    finally:
+        for file in files:
+            file.close()
+    return counts
+
+
+def _mark_duplicates(
+    path: str,
+    rows: int,
+    bitmap: np.ndarray,
+    partitions: int,
+    partition_rows: int,
+    depth: int,
+) -> int:
+    """
+    Set the bit of every row of the partition `path` whose id was seen before.
+
+    A partition of more than `partition_rows` rows is split on the next hash
+    bits first, so that only `partition_rows` ids are held at a time.
+    Returns the number of duplicates.
+    """
+    if rows > partition_rows and depth < MAX_SPLIT_DEPTH:
+        directory = f"{path}.split"
+        counts = _partition_ids(_iter_spilled(path), directory, partitions, depth + 1)
+        os.remove(path)
+        return sum(
+            _mark_duplicates(
+                _partition_path(directory, partition),
+                int(count),
+                bitmap,
+                partitions,
+                partition_rows,
+                depth + 1,
+            )
+            for partition, count in enumerate(counts)
+            if count
+        )
+
+    batches = list(_iter_spilled(path))
+    os.remove(path)
+    ids = np.concatenate([batch[0] for batch in batches])
+    positions = np.concatenate([batch[2] for batch in batches])
+    # Rows are in stream order, so the first occurrence is the one kept
+    duplicates = positions[pd.Series(ids).duplicated().to_numpy()]
+    np.bitwise_or.at(
+        bitmap, duplicates >> 3, np.left_shift(1, duplicates & 7).astype(np.uint8)
+    )
+    return len(duplicates)
+
+
+def _spill_chunks(
+    chunks: Iterable[pd.DataFrame], id_column: str, spool: BinaryIO
+) -> Iterator[IdBatch]:
+    """Write each chunk to `spool` and yield its id batch."""
+    offset = 0
+    for chunk in chunks:
+        try:
+            ids = chunk[id_column].astype(str).to_numpy(dtype=object)
+        except KeyError:
+            raise ValueError(f"Column '{id_column}' not found in the dataframe.")
+        _dump(spool, chunk)
+        positions = np.arange(offset, offset + len(ids), dtype=np.int64)
+        offset += len(ids)
+        yield ids, pd.util.hash_array(ids), positions
+
+
+def iter_deduplicated_chunks(
+    chunks: Iterable[pd.DataFrame],
+    id_column: str = "id",
+    spill_dir: Optional[str] = DEDUP_SPILL_DIR,
+    partitions: int = DEDUP_PARTITIONS,
+    partition_rows: int = DEDUP_PARTITION_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Drop the rows whose id already appeared earlier in a stream of chunks.
+
+    The first occurrence of an id is kept, as `remove_duplicate_ids_and_reindex`
+    does on a whole dataframe, and ids are compared by their string form.
+    Memory stays bounded whatever the number of ids, as nothing grows with it
+    but a bitmap on disk:
+        1. each chunk is spooled to disk, and its ids and row positions are
+           spilled to hash partitions, so equal ids land in the same file;
+        2. each partition is de-duplicated on its own, and the positions of
+           duplicates are set in a memory-mapped bitmap of one bit per row;
+        3. the spooled chunks are read back and filtered with the bitmap.
+    The first chunk is thus only yielded once the whole stream has been read.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): The chunks, e.g. of several files.
+        id_column (str): The name of the ID column.
+        spill_dir (Optional[str]): Folder of the spill files, removed at the
+            end; defaults to the system temporary folder.
+        partitions (int): Number of hash partitions.
+        partition_rows (int): Most ids de-duplicated in memory at a time.
+
+    Yields:
+        pd.DataFrame: The chunks without duplicate ids, with a fresh index.
+
+    Raises:
+        ValueError: If the ID column is missing from a chunk.
+    """
+    with tempfile.TemporaryDirectory(prefix="dedup_", dir=spill_dir) as work_dir:
+        spool_path = os.path.join(work_dir, "chunks.pkl")
+        ids_dir = os.path.join(work_dir, "ids")
+        with open(spool_path, "wb") as spool:
+            counts = _partition_ids(
+                _spill_chunks(chunks, id_column, spool), ids_dir, partitions, 0
+            )
+
+        total = int(counts.sum())
+        bitmap = np.memmap(
+            os.path.join(work_dir, "duplicates.bitmap"),
+            dtype=np.uint8,
+            mode="w+",
+            shape=(max(1, (total + 7) // 8),),
+        )
+        removed = sum(
+            _mark_duplicates(
+                _partition_path(ids_dir, partition),
+                int(count),
+                bitmap,
+                partitions,
+                partition_rows,
+                0,
+            )
+            for partition, count in enumerate(counts)
+            if count
+        )
+        logging.info(f"Removed {removed} duplicate ids out of {total} rows.")
+
+        offset = 0
+        for chunk in _iter_spilled(spool_path):
+            first, last = offset // 8, (offset + len(chunk) + 7) // 8
+            start = offset - first * 8
+            end = start + len(chunk)
+            bits = np.unpackbits(bitmap[first:last], bitorder="little")
+            duplicate = bits[start:end].astype(bool)
+            offset += len(chunk)
+            yield chunk[~duplicate].reset_index(drop=True)
@@ -1,71 +1,578 @@
+import numpy as np
 import pandas as pd
+import os
 import re
 import logging
-from typing import Dict, List
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+from .matcher import MATCHER_ENGINES, DrugMatcher
+from .matcher_cache import cached_matcher_path, load_matcher, load_or_build_matcher
 
+SOURCES = ("pubmed", "clinical_trials")
 
-def find_mentions(
-    pubmed_df: pd.DataFrame, clinical_trials_df: pd.DataFrame, drugs_df: pd.DataFrame
-) -> List[Dict[str, str]]:
+TITLE_COLUMNS = {"pubmed": "title", "clinical_trials": "scientific_title"}
+
+MENTION_COLUMNS = [
+    "drug_id",
+    "publication_id",
+    "drug",
+    "source",
+    "title",
+    "journal",
+    "date",
+]
+
+PUBLICATION_FIELDS = ["source", "title", "journal", "date"]
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Number of drugs listed in the slowest / most mentioned entries of match stats
+MATCH_STATS_TOP_DRUGS = 10
+
+# Matcher of the current worker process, built once by `_init_match_worker`
+_worker_matcher = None
+
+
+def get_drug_names(drugs_df: pd.DataFrame) -> List[str]:
     """
-    Identify mentions of drugs in publications from PubMed and ClinicalTrials dataframes.
+    Return the de-duplicated drug names; a drug's key is its position in this list.
+
+    Args:
+        drugs_df (pd.DataFrame): DataFrame containing drug names.
+
+    Returns:
+        List[str]: Drug names in order of first appearance.
+
+    Raises:
+        ValueError: If the dataframe has no 'drug' column.
+    """
+    if "drug" not in drugs_df.columns:
+        raise ValueError("The drugs dataframe must have a 'drug' column.")
+    return list(dict.fromkeys(drugs_df["drug"].dropna()))
+
+
+def get_drug_synonyms(
+    drugs_df: pd.DataFrame, synonyms_df: Optional[pd.DataFrame]
+) -> List[Tuple[str, int]]:
+    """
+    Resolve the synonyms of each drug to the drug's key.
+
+    Args:
+        drugs_df (pd.DataFrame): DataFrame containing drug names and atccodes.
+        synonyms_df (Optional[pd.DataFrame]): One row per surface form, e.g. a
+            brand or salt name, with the 'atccode' of its canonical drug and
+            the 'synonym'; None for no synonyms.
+
+    Returns:
+        List[Tuple[str, int]]: (synonym, drug key) pairs, keys as in
+            `get_drug_names`. Synonyms of an unknown atccode are skipped.
+
+    Raises:
+        ValueError: If a dataframe lacks the 'atccode' or 'synonym' column.
+    """
+    if synonyms_df is None or synonyms_df.empty:
+        return []
+    missing = {"atccode", "synonym"} - set(synonyms_df.columns)
+    if missing or "atccode" not in drugs_df.columns:
+        raise ValueError(
+            "Synonyms need 'atccode' and 'synonym' columns, and drugs an 'atccode'."
+        )
+
+    keys = {name: key for key, name in enumerate(get_drug_names(drugs_df))}
+    atccode_keys = {}
+    for atccode, name in zip(drugs_df["atccode"].astype(str), drugs_df["drug"]):
+        if name in keys:
+            atccode_keys.setdefault(atccode, keys[name])
+
+    synonyms_df = synonyms_df.dropna(subset=["atccode", "synonym"])
+    resolved = synonyms_df["atccode"].astype(str).map(atccode_keys)
+    known = resolved.notna().to_numpy()
+    if not known.all():
+        unknown = synonyms_df["atccode"][~known].unique()
+        logging.warning(
+            f"⚠ {int((~known).sum())} synonyms of unknown atccodes skipped: "
+            f"{', '.join(map(str, unknown[:5]))}"
+        )
+    return list(
+        zip(
+            synonyms_df["synonym"].to_numpy(dtype=object)[known].tolist(),
+            resolved[known].astype(np.int64).tolist(),
+        )
+    )
+
+
+def build_matcher(
+    drug_names: List[str],
+    engine: str = "automaton",
+    synonyms: Optional[List[Tuple[str, int]]] = None,
+    cache_dir: Optional[str] = None,
+) -> Union[DrugMatcher, List[re.Pattern]]:
+    """
+    Compile the matcher of an engine: the automaton, or one regex per drug.
+
+    With synonyms, the automaton holds every surface form, and the regex of a
+    drug alternates between its name and its synonyms.
+
+    Args:
+        drug_names (List[str]): Drug names returned by `get_drug_names`.
+        engine (str): Matching engine, either "automaton" or "regex".
+        synonyms (Optional[List[Tuple[str, int]]]): (synonym, drug key) pairs
+            returned by `get_drug_synonyms`.
+        cache_dir (Optional[str]): Folder where the automaton is cached,
+            keyed on a hash of the drug dictionary; None always compiles it.
+            Regex patterns are not cached.
+
+    Returns:
+        Union[DrugMatcher, List[re.Pattern]]: The compiled matcher.
+
+    Raises:
+        ValueError: If the engine is unknown.
+    """
+    if engine not in MATCHER_ENGINES:
+        raise ValueError(
+            f"Unknown matcher engine '{engine}'. Expected one of {MATCHER_ENGINES}."
+        )
+    if engine == "automaton":
+        if cache_dir:
+            return load_or_build_matcher(cache_dir, drug_names, synonyms)
+        return DrugMatcher(drug_names, synonyms)
+
+    variants = [[drug] for drug in drug_names]
+    for synonym, drug_id in synonyms or ():
+        variants[drug_id].append(synonym)
+    return [
+        re.compile(
+            rf"\b(?:{'|'.join(map(re.escape, names))})\b"
+            if len(names) > 1
+            else rf"\b{re.escape(names[0])}\b",
+            re.IGNORECASE,
+        )
+        for names in variants
+    ]
+
+
+def _match_pairs(
+    titles: pd.Series,
+    matcher: Union[DrugMatcher, List[re.Pattern]],
+    timings: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(matcher, DrugMatcher):
+        return _match_pairs_automaton(titles, matcher)
+    return _match_pairs_regex(titles, matcher, timings)
+
+
+def _match_pairs_regex(
+    titles: pd.Series,
+    patterns: List[re.Pattern],
+    timings: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (drug keys, title positions) of every mention, one regex scan per drug.
+
+    The scan time of each drug is added to `timings[drug key]` when given.
+    """
+    drug_ids, positions = [], []
+    for drug_id, pattern in enumerate(patterns):
+        start = time.perf_counter()
+        mask = titles.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+        if timings is not None:
+            timings[drug_id] += time.perf_counter() - start
+        rows = mask.nonzero()[0]
+        drug_ids.append(np.full(len(rows), drug_id, dtype=np.int64))
+        positions.append(rows.astype(np.int64))
+    if not drug_ids:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(drug_ids), np.concatenate(positions)
+
+
+def _match_pairs_automaton(
+    titles: pd.Series, matcher: DrugMatcher
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (drug keys, title positions) of every mention, one scan per title."""
+    matches = [matcher.match(title) for title in titles]
+    counts = np.fromiter(map(len, matches), dtype=np.int64, count=len(matches))
+    drug_ids = np.fromiter(
+        (drug_id for found in matches for drug_id in found),
+        dtype=np.int64,
+        count=int(counts.sum()),
+    )
+    positions = np.repeat(np.arange(len(matches), dtype=np.int64), counts)
+    return drug_ids, positions
+
+
+def _init_match_worker(
+    drug_names: List[str],
+    engine: str,
+    synonyms: List[Tuple[str, int]],
+    cache_path: Optional[str] = None,
+) -> None:
+    """Load or build the matcher once per worker process instead of once per chunk."""
+    global _worker_matcher
+    _worker_matcher = load_matcher(cache_path) if cache_path else None
+    if _worker_matcher is None:
+        _worker_matcher = build_matcher(drug_names, engine, synonyms)
+
+
+def _match_chunk(titles: list) -> Tuple[np.ndarray, np.ndarray]:
+    """Match one chunk of titles in a worker; positions are relative to the chunk."""
+    return _match_pairs(pd.Series(titles, dtype=object), _worker_matcher)
+
+
+def _iter_chunk_results(
+    executor: ProcessPoolExecutor, chunks: Iterator[list], window: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Submit chunks with at most `window` in flight and yield results in order."""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(_match_chunk, chunk))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _match_sources_parallel(
+    sources: List[pd.Series],
+    drug_names: List[str],
+    engine: str,
+    workers: int,
+    chunk_size: int,
+    synonyms: List[Tuple[str, int]],
+    cache_dir: Optional[str] = None,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Match several title columns on a process pool, one task per chunk of titles.
+
+    Partial results are merged back in submission order, so the output is the
+    same as a serial run. With a cache folder, the automaton is compiled at
+    most once, here, and every worker loads it instead of compiling it.
+    """
+    cache_path = None
+    if cache_dir and engine == "automaton":
+        cache_path = cached_matcher_path(cache_dir, drug_names, synonyms)[0]
+
+    bounds = [
+        (source_index, start, min(start + chunk_size, len(titles)))
+        for source_index, titles in enumerate(sources)
+        for start in range(0, len(titles), chunk_size)
+    ]
+    chunks = (
+        sources[source_index].iloc[start:end].tolist()
+        for source_index, start, end in bounds
+    )
+
+    partial = [([], []) for _ in sources]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_match_worker,
+        initargs=(drug_names, engine, synonyms, cache_path),
+    ) as executor:
+        results = _iter_chunk_results(executor, chunks, window=2 * workers)
+        for (source_index, start, _), (drug_ids, positions) in zip(bounds, results):
+            partial[source_index][0].append(drug_ids)
+            partial[source_index][1].append(positions + start)
+
+    empty = np.empty(0, dtype=np.int64)
+    return [
+        (
+            np.concatenate(drug_ids) if drug_ids else empty,
+            np.concatenate(positions) if positions else empty,
+        )
+        for drug_ids, positions in partial
+    ]
+
+
+def _source_mentions(
+    df: pd.DataFrame,
+    title_col: str,
+    source_name: str,
+    drug_ids: np.ndarray,
+    positions: np.ndarray,
+    drug_names: List[str],
+    publication_offset: int = 0,
+) -> pd.DataFrame:
+    """Assemble the mention rows of one source, ordered by drug then publication."""
+    order = np.lexsort((positions, drug_ids))
+    drug_ids, positions = drug_ids[order], positions[order]
+
+    if "journal" in df.columns:
+        journal = df["journal"].to_numpy(dtype=object)[positions]
+    else:
+        journal = np.full(len(positions), "", dtype=object)
+
+    if "date" in df.columns:
+        date = df["date"].to_numpy(dtype=object)[positions]
+        date[pd.isna(date)] = ""
+    else:
+        date = np.full(len(positions), "", dtype=object)
+
+    return pd.DataFrame(
+        {
+            "drug_id": drug_ids,
+            "publication_id": positions + publication_offset,
+            "drug": pd.Categorical.from_codes(drug_ids, categories=drug_names),
+            "source": pd.Categorical.from_codes(
+                np.full(len(positions), SOURCES.index(source_name)), categories=SOURCES
+            ),
+            "title": df[title_col].to_numpy(dtype=object)[positions],
+            "journal": journal,
+            "date": date,
+        }
+    )
+
+
+def _check_title_column(df: pd.DataFrame, source_name: str) -> None:
+    title_col = TITLE_COLUMNS[source_name]
+    if title_col not in df.columns:
+        raise ValueError(
+            f"Missing required '{title_col}' column in {source_name} dataframe."
+        )
+
+
+def find_source_mention_table(
+    df: pd.DataFrame,
+    source_name: str,
+    drug_names: List[str],
+    matcher: Union[DrugMatcher, List[re.Pattern]],
+    publication_offset: int = 0,
+) -> pd.DataFrame:
+    """
+    Identify mentions of drugs in a dataframe, or chunk, of a single source.
+
+    Used to match a source chunk by chunk with a matcher built once.
+
+    Args:
+        df (pd.DataFrame): Publications of the source.
+        source_name (str): Either "pubmed" or "clinical_trials".
+        drug_names (List[str]): Drug names returned by `get_drug_names`.
+        matcher (Union[DrugMatcher, List[re.Pattern]]): Matcher returned by
+            `build_matcher` for these drug names.
+        publication_offset (int): Added to row positions to form `publication_id`,
+            i.e. the number of publications in the previous chunks.
+
+    Returns:
+        pd.DataFrame: One row per mention with the columns of `MENTION_COLUMNS`.
+
+    Raises:
+        ValueError: If the title column of the source is missing.
+    """
+    _check_title_column(df, source_name)
+    title_col = TITLE_COLUMNS[source_name]
+    drug_ids, positions = _match_pairs(df[title_col], matcher)
+    return _source_mentions(
+        df, title_col, source_name, drug_ids, positions, drug_names, publication_offset
+    )
+
+
+def _match_stats(
+    drug_names: List[str],
+    synonyms: int,
+    pairs: List[Tuple[np.ndarray, np.ndarray]],
+    titles: int,
+    build_seconds: float,
+    match_seconds: float,
+    timings: Optional[np.ndarray],
+) -> Dict[str, object]:
+    """Summarize the cost of matching, per drug and per title."""
+    counts = np.zeros(len(drug_names), dtype=np.int64)
+    for drug_ids, _ in pairs:
+        counts += np.bincount(drug_ids, minlength=len(drug_names))
+
+    top = np.argsort(-counts, kind="stable")[:MATCH_STATS_TOP_DRUGS]
+    slowest = []
+    if timings is not None:
+        slowest = [
+            {"drug": drug_names[drug_id], "seconds": round(float(timings[drug_id]), 6)}
+            for drug_id in np.argsort(-timings, kind="stable")[:MATCH_STATS_TOP_DRUGS]
+        ]
+    return {
+        "drugs": len(drug_names),
+        "synonyms": synonyms,
+        "titles": titles,
+        "mentions": int(counts.sum()),
+        "build_seconds": round(build_seconds, 6),
+        "match_seconds": round(match_seconds, 6),
+        "seconds_per_drug": (
+            round(match_seconds / len(drug_names), 9) if drug_names else None
+        ),
+        "seconds_per_title": round(match_seconds / titles, 9) if titles else None,
+        "slowest_patterns": slowest,
+        "most_mentioned_drugs": [
+            {"drug": drug_names[drug_id], "mentions": int(counts[drug_id])}
+            for drug_id in top
+            if counts[drug_id]
+        ],
+    }
+
+
+def find_mention_table(
+    pubmed_df: pd.DataFrame,
+    clinical_trials_df: pd.DataFrame,
+    drugs_df: pd.DataFrame,
+    engine: str = "automaton",
+    workers: Optional[int] = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stats: Optional[dict] = None,
+    synonyms_df: Optional[pd.DataFrame] = None,
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Identify mentions of drugs in publications and return them as a columnar table.
+
+    Rows are ordered by source, then drug, then publication. `drug_id` is the
+    position of the drug in the de-duplicated drug list and `publication_id` the
+    row position of the publication in its source dataframe. The table is the
+    same whatever the number of workers. A mention of a synonym is attributed
+    to its canonical drug.
 
     Args:
         pubmed_df (pd.DataFrame): DataFrame containing PubMed data.
         clinical_trials_df (pd.DataFrame): DataFrame containing Clinical Trials data.
         drugs_df (pd.DataFrame): DataFrame containing drug names.
+        engine (str): Matching engine, either "automaton" (single scan per title)
+            or "regex" (one regex scan per drug, kept as the reference path).
+        workers (Optional[int]): Number of worker processes; 1 matches in this
+            process and None uses every available core.
+        chunk_size (int): Number of titles sent to a worker per task.
+        stats (Optional[dict]): Filled, when given, with the cost of matching:
+            build and match seconds, seconds per drug and per title, the drugs
+            with the most mentions and, for the regex engine in a single
+            process, the slowest patterns.
+        synonyms_df (Optional[pd.DataFrame]): Synonyms of the drugs, see
+            `get_drug_synonyms`.
+        cache_dir (Optional[str]): Folder of the compiled automaton cache, see
+            `build_matcher`.
 
     Returns:
-        List[Dict[str, str]]: List of dictionaries containing drug mentions in publications.
+        pd.DataFrame: One row per mention with the columns of `MENTION_COLUMNS`.
 
     Raises:
         ValueError: If required columns are missing from any dataframe.
     """
 
     # Validate required columns
-    if "drug" not in drugs_df.columns:
-        raise ValueError("The drugs dataframe must have a 'drug' column.")
+    drug_names = get_drug_names(drugs_df)
+    synonyms = get_drug_synonyms(drugs_df, synonyms_df)
+    if engine not in MATCHER_ENGINES:
+        raise ValueError(
+            f"Unknown matcher engine '{engine}'. Expected one of {MATCHER_ENGINES}."
+        )
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be a positive number of titles.")
+    workers = workers or os.cpu_count() or 1
 
-    data_sources = {
-        "pubmed": {"df": pubmed_df, "title_col": "title"},
-        "clinical_trials": {"df": clinical_trials_df, "title_col": "scientific_title"},
-    }
+    data_sources = {"pubmed": pubmed_df, "clinical_trials": clinical_trials_df}
+    for source_name, df in data_sources.items():
+        _check_title_column(df, source_name)
 
-    mentions = []
-    drug_patterns = {
-        drug: re.compile(rf"\b{re.escape(drug)}\b", re.IGNORECASE)
-        for drug in drugs_df["drug"].dropna()
-    }
+    titles = [
+        df[TITLE_COLUMNS[source_name]] for source_name, df in data_sources.items()
+    ]
 
-    for source_name, source_data in data_sources.items():
-        df, title_col = source_data["df"], source_data["title_col"]
-
-        if title_col not in df.columns:
-            raise ValueError(
-                f"Missing required '{title_col}' column in {source_name} dataframe."
-            )
-
-        df = df.dropna(subset=[title_col])  # Remove rows with empty titles
-
-        for drug, pattern in drug_patterns.items():
-            matches = df[df[title_col].str.contains(pattern, regex=True, na=False)]
-            for _, row in matches.iterrows():
-                mentions.append(
-                    {
-                        "drug": drug,
-                        "source": source_name,
-                        "title": row[title_col],
-                        "journal": row.get("journal", ""),
-                        "date": row.get("date", "")
-                        if pd.notna(row.get("date"))
-                        else "",
-                    }
-                )
-
-    logging.info(f"Found {len(mentions)} drug mentions in publications.")
-    return mentions
+    # Per-pattern timings only exist for the regex engine, in this process
+    timings = None
+    if stats is not None and engine == "regex" and workers == 1:
+        timings = np.zeros(len(drug_names))
+
+    # Empty titles never match, so positions stay aligned with each dataframe
+    start = time.perf_counter()
+    build_seconds = 0.0
+    if workers > 1:
+        pairs = _match_sources_parallel(
+            titles, drug_names, engine, workers, chunk_size, synonyms, cache_dir
+        )
+    else:
+        matcher = build_matcher(drug_names, engine, synonyms, cache_dir)
+        build_seconds = time.perf_counter() - start
+        pairs = [
+            _match_pairs(source_titles, matcher, timings) for source_titles in titles
+        ]
+    match_seconds = time.perf_counter() - start - build_seconds
+
+    if stats is not None:
+        stats.update(
+            engine=engine,
+            workers=workers,
+            **_match_stats(
+                drug_names,
+                len(synonyms),
+                pairs,
+                sum(len(source_titles) for source_titles in titles),
+                build_seconds,
+                match_seconds,
+                timings,
+            ),
+        )
+
+    tables = [
+        _source_mentions(
+            df, TITLE_COLUMNS[source_name], source_name, drug_ids, positions, drug_names
+        )
+        for (source_name, df), (drug_ids, positions) in zip(data_sources.items(), pairs)
+    ]
+
+    mention_table = pd.concat(tables, ignore_index=True)
+
+    logging.info(f"Found {len(mention_table)} drug mentions in publications.")
+    return mention_table
+
+
+def mention_table_to_records(mention_table: pd.DataFrame) -> List[Dict[str, str]]:
+    """
+    Convert a mention table into the list-of-dicts representation.
+
+    Args:
+        mention_table (pd.DataFrame): Table returned by `find_mention_table`.
+
+    Returns:
+        List[Dict[str, str]]: One dictionary per mention with the keys
+            drug, source, title, journal and date.
+    """
+    return mention_table[["drug"] + PUBLICATION_FIELDS].to_dict("records")
+
+
+def find_mentions(
+    pubmed_df: pd.DataFrame,
+    clinical_trials_df: pd.DataFrame,
+    drugs_df: pd.DataFrame,
+    engine: str = "automaton",
+    workers: Optional[int] = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    synonyms_df: Optional[pd.DataFrame] = None,
+) -> List[Dict[str, str]]:
+    """
+    Identify mentions of drugs in publications from PubMed and ClinicalTrials dataframes.
+
+    Thin wrapper around `find_mention_table` kept for callers that expect a list
+    of dictionaries.
+
+    Args:
+        pubmed_df (pd.DataFrame): DataFrame containing PubMed data.
+        clinical_trials_df (pd.DataFrame): DataFrame containing Clinical Trials data.
+        drugs_df (pd.DataFrame): DataFrame containing drug names.
+        engine (str): Matching engine, either "automaton" or "regex".
+        workers (Optional[int]): Number of worker processes, see `find_mention_table`.
+        chunk_size (int): Number of titles sent to a worker per task.
+        synonyms_df (Optional[pd.DataFrame]): Synonyms of the drugs, see
+            `get_drug_synonyms`.
+
+    Returns:
+        List[Dict[str, str]]: List of dictionaries containing drug mentions in publications.
+
+    Raises:
+        ValueError: If required columns are missing from any dataframe.
+    """
+    return mention_table_to_records(
+        find_mention_table(
+            pubmed_df,
+            clinical_trials_df,
+            drugs_df,
+            engine=engine,
+            workers=workers,
+            chunk_size=chunk_size,
+            synonyms_df=synonyms_df,
+        )
+    )
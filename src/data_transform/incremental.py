@@ -0,0 +1,615 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple, Union
+
+from .utils import utils
+from .drug_mentions import (
+    SOURCES,
+    TITLE_COLUMNS,
+    build_matcher,
+    find_source_mention_table,
+    get_drug_names,
+    get_drug_synonyms,
+)
+from .matcher import MATCHER_VERSION
+from .streaming import clean_publication_chunk, source_paths
+from .data_processing import load_drug_synonyms
+from data_extract.extract import (
+    SOURCE_SCHEMAS,
+    concat_frames,
+    is_csv,
+    load_csv,
+    load_file,
+    parse_csv,
+)
+from data_extract.object_store import get_object_store, is_object_url, open_object
+from config import (
+    DRUGS_FILE,
+    DRUG_SYNONYMS_FILE,
+    PUBMED_CSV_FILE,
+    PUBMED_JSON_FILE,
+    CLINICAL_TRIALS_CSV_FILE,
+    STATE_DIR,
+)
+
+# Bump when the layout of the state files changes; older states are discarded
+STATE_VERSION = 3
+
+MANIFEST_FILE = "manifest.json"
+PUBLICATIONS_FILE = "publications.parquet"
+MENTIONS_FILE = "mentions.parquet"
+
+DEFAULT_INCREMENTAL_FILES = {
+    "pubmed": [PUBMED_CSV_FILE, PUBMED_JSON_FILE],
+    "clinical_trials": CLINICAL_TRIALS_CSV_FILE,
+}
+
+# Index of the file of a publication in the paths of its source
+FILE_COLUMN = "file"
+PUBLICATION_STATE_COLUMNS = ["source", "key", "file", "position", "hash"]
+MENTION_STATE_COLUMNS = ["source", "key", "drug", "title", "journal", "date"]
+
+
+def _open_binary(file_path: str):
+    """Open a local file, or an object by ranged reads, see `open_object`."""
+    return open_object(file_path) if is_object_url(file_path) else open(file_path, "rb")
+
+
+def _read_range(file_path: str, start: int, end: Optional[int] = None) -> bytes:
+    """Read the bytes `start` to `end` (excluded) of a local file or an object."""
+    if is_object_url(file_path):
+        return get_object_store().read(file_path, start, end)
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        return file.read(-1 if end is None else end - start)
+
+
+def _read_first_line(file_path: str) -> bytes:
+    """Read the first line of a file or an object, line break included."""
+    head = b""
+    with _open_binary(file_path) as file:
+        for block in iter(lambda: file.read(1 << 16), b""):
+            head += block
+            if b"\n" in block:
+                break
+    end = head.find(b"\n") + 1 or len(head)
+    return head[:end]
+
+
+def _stat(file_path: str) -> Tuple[int, Optional[int]]:
+    """Size and modification time (ns, if known) of a file or an object."""
+    if is_object_url(file_path):
+        info = get_object_store().info(file_path)
+        return info.size, info.mtime_ns
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def file_state(
+    file_path: str, previous: Optional[Dict] = None
+) -> Tuple[Dict, Optional[str]]:
+    """
+    Compute the size, modification time and SHA-256 of a file, reading it in
+    blocks, and in the same pass the SHA-256 of its previous content.
+
+    A file whose size and modification time are those of `previous` is not
+    read: its previous state is returned as it is.
+
+    Args:
+        file_path (str): The path to the file, or an object URL.
+        previous (Optional[Dict]): State of the file in the previous run.
+
+    Returns:
+        Tuple[Dict, Optional[str]]: The path, size, modification time and
+            hexadecimal digest of the file, and the digest of its first
+            `previous["size"]` bytes, None if the file is shorter.
+    """
+    size, mtime_ns = _stat(file_path)
+    if previous is not None and mtime_ns is not None:
+        if (previous["size"], previous.get("mtime_ns")) == (size, mtime_ns):
+            return dict(previous), previous["sha256"]
+
+    prefix_size = previous["size"] if previous is not None else None
+    digest = hashlib.sha256()
+    prefix_digest = None
+    size = 0
+    with _open_binary(file_path) as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            cut = -1 if prefix_size is None else prefix_size - size
+            if 0 <= cut < len(block):
+                # hexdigest() does not end the digest, which goes on after it
+                digest.update(block[:cut])
+                prefix_digest = digest.hexdigest()
+                digest.update(block[cut:])
+            else:
+                digest.update(block)
+            size += len(block)
+    if prefix_size == size:
+        prefix_digest = digest.hexdigest()
+    state = {
+        "path": file_path,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "sha256": digest.hexdigest(),
+    }
+    return state, prefix_digest
+
+
+def _same_content(previous_states: Optional[list], states: list) -> bool:
+    """Whether two lists of `file_state` name the same files with the same bytes."""
+    return previous_states is not None and [
+        (old["path"], old["sha256"]) for old in previous_states or ()
+    ] == [(new["path"], new["sha256"]) for new in states]
+
+
+def publication_hashes(df: pd.DataFrame, source_name: str) -> pd.DataFrame:
+    """
+    Key and content hash of every publication of a cleaned source dataframe.
+
+    The key is the publication id in its string form. The hash covers the
+    cleaned title, journal and date, i.e. everything that ends up in the graph.
+
+    Args:
+        df (pd.DataFrame): Cleaned, de-duplicated publications of one source.
+        source_name (str): Either "pubmed" or "clinical_trials".
+
+    Returns:
+        pd.DataFrame: One row per publication with the columns source, key,
+            position (row position in `df`) and hash.
+    """
+    content = pd.DataFrame(
+        {
+            column: df[column].astype(object) if column in df.columns else ""
+            for column in [TITLE_COLUMNS[source_name], "journal", "date"]
+        },
+        index=df.index,
+    )
+    return pd.DataFrame(
+        {
+            "source": source_name,
+            "key": df["id"].astype(str).to_numpy(),
+            "position": np.arange(len(df), dtype=np.int64),
+            "hash": pd.util.hash_pandas_object(content, index=False).to_numpy(),
+        }
+    )
+
+
+def _empty_state() -> Dict[str, pd.DataFrame]:
+    return {
+        "publications": pd.DataFrame(columns=PUBLICATION_STATE_COLUMNS).astype(
+            {FILE_COLUMN: np.int64, "position": np.int64, "hash": np.uint64}
+        ),
+        "mentions": pd.DataFrame(columns=MENTION_STATE_COLUMNS),
+    }
+
+
+def load_state(state_dir: str, engine: str) -> Optional[dict]:
+    """
+    Load the manifest and state tables of the previous run.
+
+    Args:
+        state_dir (str): Folder holding the state files.
+        engine (str): Matching engine of the current run.
+
+    Returns:
+        dict or None: The manifest with the "publications" and "mentions" tables,
+            or None if there is no usable state (missing, other version or engine).
+    """
+    manifest_path = os.path.join(state_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        expected = (STATE_VERSION, engine, MATCHER_VERSION)
+        found = tuple(
+            manifest.get(name) for name in ("version", "engine", "matcher_version")
+        )
+        if found != expected:
+            logging.info("State from another version or engine, running in full.")
+            return None
+        manifest["publications"] = pd.read_parquet(
+            os.path.join(state_dir, PUBLICATIONS_FILE)
+        )
+        manifest["mentions"] = pd.read_parquet(os.path.join(state_dir, MENTIONS_FILE))
+        return manifest
+    except FileNotFoundError:
+        logging.info(f"No previous state found in {state_dir}, running in full.")
+    except (json.JSONDecodeError, OSError, ValueError) as e:
+        logging.warning(f"⚠ Ignoring unreadable state in {state_dir}: {e}")
+    return None
+
+
+def _replace_file(path: str, write) -> None:
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+def save_state(
+    state_dir: str,
+    file_states: Dict[str, list],
+    engine: str,
+    publications: pd.DataFrame,
+    mentions: pd.DataFrame,
+) -> None:
+    """
+    Persist the state of a run; the manifest is written last so it never
+    points at tables from another run.
+
+    Args:
+        state_dir (str): Folder holding the state files.
+        file_states (Dict[str, list]): Path, size and SHA-256 of the files of
+            each input ("drugs" and sources), see `file_state`.
+        engine (str): Matching engine of the run.
+        publications (pd.DataFrame): Publication keys, files, positions and
+            hashes.
+        mentions (pd.DataFrame): Mention rows keyed by source and publication key.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    _replace_file(
+        os.path.join(state_dir, PUBLICATIONS_FILE),
+        lambda path: publications.to_parquet(path, index=False),
+    )
+    _replace_file(
+        os.path.join(state_dir, MENTIONS_FILE),
+        lambda path: mentions.to_parquet(path, index=False),
+    )
+    manifest = {
+        "version": STATE_VERSION,
+        "engine": engine,
+        "matcher_version": MATCHER_VERSION,
+        "files": file_states,
+    }
+
+    def write_manifest(path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=4)
+
+    _replace_file(os.path.join(state_dir, MANIFEST_FILE), write_manifest)
+
+
+def _delta_files(
+    previous_states: Optional[list], states: list, prefixes: list
+) -> Optional[Tuple[Dict[int, int], np.ndarray]]:
+    """
+    Find the new content of a source whose previously known files are all
+    still there, in the same order, unchanged or with rows appended: files
+    new to the source, e.g. the file of a new day in a directory, and CSV
+    files whose previous content, ending with a line break, is still their
+    first bytes.
+
+    Returns:
+        Optional[Tuple[Dict[int, int], np.ndarray]]: The offset to read each
+            new or grown file from (0 for a new file), by index in the paths
+            of the source, and the current index of each previous file; None
+            if a previous file was removed, moved or changed otherwise.
+    """
+    if previous_states is None:
+        return None
+    index_of = {new["path"]: index for index, new in enumerate(states)}
+    if len(index_of) != len(states):
+        return None
+    moved = np.array(
+        [index_of.get(old["path"], -1) for old in previous_states], dtype=np.int64
+    )
+    if (moved < 0).any() or (np.diff(moved) <= 0).any():
+        return None
+
+    offsets = dict.fromkeys(sorted(set(range(len(states))) - set(moved.tolist())), 0)
+    for old, index in zip(previous_states, moved.tolist()):
+        new = states[index]
+        if old["sha256"] == new["sha256"]:
+            continue
+        if not is_csv(new["path"]) or not 0 < old["size"] < new["size"]:
+            return None
+        if prefixes[index] != old["sha256"]:
+            return None
+        if _read_range(new["path"], old["size"] - 1, old["size"]) != b"\n":
+            return None
+        offsets[index] = old["size"]
+    return dict(sorted(offsets.items())), moved
+
+
+def _read_new_rows(
+    paths: List[str], offsets: Dict[int, int], source_name: str
+) -> Optional[pd.DataFrame]:
+    """
+    Load new files whole, and parse the rows appended to grown CSV files
+    behind the header of each file.
+
+    Returns:
+        Optional[pd.DataFrame]: The new rows, in file order, with the index of
+            their file in `FILE_COLUMN`, or None if a file cannot be read.
+    """
+    frames = []
+    for index, offset in offsets.items():
+        if offset == 0:
+            frame = load_file(paths[index], schema=SOURCE_SCHEMAS[source_name])
+            if frame is None:
+                return None
+            frames.append(frame.assign(**{FILE_COLUMN: index}))
+            continue
+        try:
+            header = _read_first_line(paths[index])
+            tail = _read_range(paths[index], offset)
+            frame = parse_csv(io.BytesIO(header + tail), SOURCE_SCHEMAS[source_name])
+        except Exception as e:
+            logging.warning(
+                f"⚠ Failed to parse the rows appended to {paths[index]} ({e}), "
+                f"reading the whole file."
+            )
+            return None
+        frames.append(frame.assign(**{FILE_COLUMN: index}))
+    return concat_frames(frames)
+
+
+def _load_source(paths: List[str], source_name: str) -> pd.DataFrame:
+    """Load every file of a source, with the index of its file in `FILE_COLUMN`."""
+    frames = []
+    for index, path in enumerate(paths):
+        frame = load_file(path, schema=SOURCE_SCHEMAS[source_name])
+        if frame is None:
+            raise ValueError(f"Failed to load {source_name} file: {path}")
+        frames.append(frame.assign(**{FILE_COLUMN: index}))
+    return concat_frames(frames)
+
+
+def _clean_source(
+    df: pd.DataFrame, source_name: str
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Clean and de-duplicate publications, then hash them with their files."""
+    df = clean_publication_chunk(df, TITLE_COLUMNS[source_name])
+    df = utils.remove_duplicate_ids_and_reindex(df, "id")
+    files = df.pop(FILE_COLUMN).to_numpy(dtype=np.int64)
+    current = publication_hashes(df, source_name)
+    current.insert(2, FILE_COLUMN, files)
+    return df, current
+
+
+def _append_publications(
+    previous: pd.DataFrame, appended: pd.DataFrame
+) -> Optional[Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Merge new publications into the previous ones of their source.
+
+    As in `clean_data`, an id seen in an earlier or the same file keeps its
+    first occurrence, and new rows are dropped; an id seen in a later file
+    would be replaced by the new row, which is left to a full read.
+
+    Args:
+        previous (pd.DataFrame): Previous publication state of the source, with
+            the current index of each file.
+        appended (pd.DataFrame): Hashes of the new publications.
+
+    Returns:
+        Optional[Tuple[pd.DataFrame, np.ndarray]]: The publication state of the
+            source, renumbered in batch order, and the mask of the new
+            publications to match; None if a full read is needed.
+    """
+    seen = appended[["key", FILE_COLUMN]].merge(
+        previous[["key", FILE_COLUMN]], on="key", how="left", suffixes=("", "_seen")
+    )
+    seen_files = seen[f"{FILE_COLUMN}_seen"].to_numpy(dtype=float)
+    if (seen_files > seen[FILE_COLUMN].to_numpy()).any():
+        return None
+    new = np.isnan(seen_files)
+
+    # New rows follow the previous rows of their file
+    appended = appended.assign(position=appended["position"] + len(previous))
+    publications = pd.concat([previous, appended[new]], ignore_index=True)
+    order = np.lexsort(
+        (publications["position"].to_numpy(), publications[FILE_COLUMN].to_numpy())
+    )
+    publications = publications.iloc[order].reset_index(drop=True)
+    publications["position"] = np.arange(len(publications), dtype=np.int64)
+    return publications, new
+
+
+def _assemble_mention_table(
+    publications: pd.DataFrame, mentions: pd.DataFrame, drug_names: list
+) -> pd.DataFrame:
+    """Rebuild the batch mention table, in batch order, from the state tables."""
+    table = mentions.merge(
+        publications[["source", "key", "position"]], on=["source", "key"], how="inner"
+    )
+    drug_ids = pd.Index(drug_names).get_indexer(table["drug"])
+    source_ids = pd.Index(SOURCES).get_indexer(table["source"])
+    order = np.lexsort((table["position"].to_numpy(), drug_ids, source_ids))
+
+    return pd.DataFrame(
+        {
+            "drug_id": drug_ids[order].astype(np.int64),
+            "publication_id": table["position"].to_numpy()[order],
+            "drug": pd.Categorical.from_codes(drug_ids[order], categories=drug_names),
+            "source": pd.Categorical.from_codes(source_ids[order], categories=SOURCES),
+            "title": table["title"].to_numpy(dtype=object)[order],
+            "journal": table["journal"].to_numpy(dtype=object)[order],
+            "date": table["date"].to_numpy(dtype=object)[order],
+        }
+    )
+
+
+def update_mention_table(
+    files: Optional[Dict[str, Union[str, List[str]]]] = None,
+    drugs_file: str = DRUGS_FILE,
+    state_dir: str = STATE_DIR,
+    engine: str = "automaton",
+    synonyms_file: Optional[str] = DRUG_SYNONYMS_FILE,
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Incrementally update the mention table from the state of the previous run.
+
+    A manifest keeps the path, size, modification time and SHA-256 of every
+    input file and, per source, the file and content hash of every publication
+    id. Files whose size and modification time did not change are not read at
+    all; other files are hashed, and unchanged content is not read again.
+
+    When the previous files of a source are all still there, unchanged or with
+    rows appended, only the new content is read: files new to the source, e.g.
+    the daily file arriving in a directory, are loaded whole, and a CSV file
+    that only had rows appended (its previous content is still its first
+    bytes) is read from its previous end. Only these new rows are parsed,
+    cleaned, hashed and matched. Any other change (a file removed, moved or
+    rewritten) re-reads, re-cleans and re-hashes every file of the source in
+    full, then matches only added publications and publications whose content
+    changed; mentions of deleted publications are dropped. When the drugs file, the synonyms file or
+    the engine changes, every publication is matched again. Ids are compared by
+    their string form and, as in `clean_data`, the first occurrence of an id
+    wins.
+
+    The returned table always covers every publication: the graph built from it
+    is rebuilt and written in full by the caller.
+
+    Args:
+        files (Optional[Dict[str, Union[str, List[str]]]]): CSV, Parquet or JSON
+            file, directory or glob, or list of those, per source ("pubmed"
+            and "clinical_trials"); defaults to the paths from config.
+        drugs_file (str): Path to the drugs CSV.
+        state_dir (str): Folder holding the manifest and state tables.
+        engine (str): Matching engine, either "automaton" or "regex".
+        synonyms_file (Optional[str]): Path to the drug synonyms, if any.
+        cache_dir (Optional[str]): Folder of the compiled automaton cache, see
+            `build_matcher`.
+
+    Returns:
+        pd.DataFrame: The same mention table as `find_mention_table` on the
+            cleaned inputs.
+
+    Raises:
+        ValueError: If a file cannot be loaded or a required column is missing.
+    """
+    files = files or DEFAULT_INCREMENTAL_FILES
+    previous = load_state(state_dir, engine)
+    previous_files = previous["files"] if previous is not None else {}
+
+    # The synonyms change what a drug matches, like the drugs file itself
+    drug_files = [drugs_file]
+    if synonyms_file and os.path.exists(synonyms_file):
+        drug_files.append(synonyms_file)
+    file_states, prefixes = {}, {}
+    # Directories and globs are listed once, then hashed and loaded
+    for name, paths in [("drugs", drug_files)] + [
+        (source_name, source_paths(files, source_name)) for source_name in SOURCES
+    ]:
+        known = {old["path"]: old for old in previous_files.get(name, [])}
+        hashed = [file_state(path, known.get(path)) for path in paths]
+        file_states[name] = [state for state, _ in hashed]
+        prefixes[name] = [prefix for _, prefix in hashed]
+
+    if previous is not None and not _same_content(
+        previous_files.get("drugs"), file_states["drugs"]
+    ):
+        logging.info(
+            "Drugs or synonyms file changed, matching every publication again."
+        )
+        previous = None
+    state = previous or {"files": {}, **_empty_state()}
+
+    drugs_df = load_csv(drugs_file, schema=SOURCE_SCHEMAS["drugs"])
+    if drugs_df is None:
+        raise ValueError(f"Failed to load drugs file: {drugs_file}")
+    drugs_df = utils.convert_id_to_string(drugs_df, "atccode")
+    drugs_df = utils.remove_duplicate_ids_and_reindex(drugs_df, "atccode")
+    drug_names = get_drug_names(drugs_df)
+    synonyms = get_drug_synonyms(drugs_df, load_drug_synonyms(synonyms_file))
+    matcher = None
+
+    publications, mentions = [], []
+    for source_name in SOURCES:
+        paths = [entry["path"] for entry in file_states[source_name]]
+        previous_publications = state["publications"][
+            state["publications"]["source"] == source_name
+        ]
+        previous_mentions = state["mentions"][
+            state["mentions"]["source"] == source_name
+        ]
+
+        if _same_content(state["files"].get(source_name), file_states[source_name]):
+            logging.info(f"{source_name} file unchanged, reusing previous mentions.")
+            publications.append(previous_publications)
+            mentions.append(previous_mentions)
+            continue
+
+        appended = None
+        delta_files = _delta_files(
+            state["files"].get(source_name),
+            file_states[source_name],
+            prefixes[source_name],
+        )
+        if delta_files is not None:
+            offsets, moved = delta_files
+            new_rows = _read_new_rows(paths, offsets, source_name)
+            if new_rows is not None:
+                df, current = _clean_source(new_rows, source_name)
+                # Files added before a previous file shift its index
+                previous_publications = previous_publications.assign(
+                    **{
+                        FILE_COLUMN: moved[
+                            previous_publications[FILE_COLUMN].to_numpy()
+                        ]
+                    }
+                )
+                appended = _append_publications(previous_publications, current)
+
+        if appended is not None:
+            # Only the new rows were read: previous mentions all stand
+            source_publications, delta = appended
+            kept_mentions = previous_mentions
+            deleted = np.zeros(0, dtype=bool)
+            unchanged = np.ones(len(previous_publications), dtype=bool)
+        else:
+            df, current = _clean_source(_load_source(paths, source_name), source_name)
+            same = current.merge(
+                previous_publications[["key", "hash"]], on=["key", "hash"]
+            )
+            unchanged = current["key"].isin(same["key"]).to_numpy()
+            deleted = ~previous_publications["key"].isin(current["key"]).to_numpy()
+            # Publications to match: added ones and ones whose content changed
+            delta = ~unchanged
+            source_publications = current
+            kept_mentions = previous_mentions[
+                previous_mentions["key"].isin(current["key"][unchanged]).to_numpy()
+            ]
+
+        if matcher is None:
+            matcher = build_matcher(drug_names, engine, synonyms, cache_dir)
+        delta_table = find_source_mention_table(
+            df[delta].reset_index(drop=True), source_name, drug_names, matcher
+        )
+        delta_keys = current["key"].to_numpy()[delta]
+
+        mentions.append(kept_mentions)
+        mentions.append(
+            pd.DataFrame(
+                {
+                    "source": source_name,
+                    "key": delta_keys[delta_table["publication_id"].to_numpy()],
+                    "drug": delta_table["drug"].astype(object).to_numpy(),
+                    "title": delta_table["title"].to_numpy(),
+                    "journal": delta_table["journal"].to_numpy(),
+                    "date": delta_table["date"].to_numpy(),
+                },
+                columns=MENTION_STATE_COLUMNS,
+            )
+        )
+        publications.append(source_publications)
+
+        read = "new rows" if appended is not None else "files in full"
+        logging.info(
+            f"{source_name} ({read}): {int(delta.sum())} added or changed, "
+            f"{int(deleted.sum())} deleted, {int(unchanged.sum())} unchanged "
+            f"publications."
+        )
+
+    publications = pd.concat(publications, ignore_index=True)
+    mentions = pd.concat(mentions, ignore_index=True)
+    save_state(state_dir, file_states, engine, publications, mentions)
+
+    mention_table = _assemble_mention_table(publications, mentions, drug_names)
+    logging.info(f"Found {len(mention_table)} drug mentions in publications.")
+    return mention_table
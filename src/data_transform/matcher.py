@@ -0,0 +1,153 @@
+import re
+from collections import deque
+from itertools import chain
+from typing import Iterable, List, Optional, Tuple
+
+# A title is split into maximal runs of word characters and single non-word
+# characters, so every position where `\b` can hold is a token boundary.
+TOKEN_PATTERN = re.compile(r"\w+|\W")
+
+MATCHER_ENGINES = ("regex", "automaton")
+# Bump when the compiled automaton or the matching rules change: cached
+# automatons of another version are compiled again, see `matcher_cache`
+MATCHER_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a lower-cased text into word runs and single non-word characters.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        List[str]: The tokens, in order.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _is_word_token(token: str) -> bool:
+    return token[0].isalnum() or token[0] == "_"
+
+
+class DrugMatcher:
+    """
+    Aho-Corasick automaton over title tokens reporting every drug a title contains.
+
+    Each title is scanned exactly once, so the cost grows with the total title
+    length and not with the number of drugs or synonyms. Matching follows the
+    same rules as `re.compile(rf"\\b{re.escape(drug)}\\b", re.IGNORECASE)`:
+    case-insensitive, with word boundaries on both ends of the drug name.
+    Synonyms are compiled into the same automaton and report their drug's key.
+    """
+
+    def __init__(
+        self,
+        drug_names: Iterable[str],
+        synonyms: Optional[Iterable[Tuple[str, int]]] = None,
+    ):
+        """
+        Compile the automaton.
+
+        Args:
+            drug_names (Iterable[str]): Drug names; a drug's key is its position.
+            synonyms (Optional[Iterable[Tuple[str, int]]]): Other surface forms
+                of the drugs, e.g. brand names, as (synonym, drug key) pairs.
+
+        Raises:
+            ValueError: If a synonym refers to an unknown drug key.
+        """
+        self.drug_names = list(drug_names)
+
+        # One dict of token transitions per state, state 0 being the root
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]
+        # Per pattern: (drug key, number of tokens, needs word before, needs
+        # word after); the outputs of a state are pattern positions
+        self._patterns = []
+
+        patterns = chain(
+            ((name, drug_id) for drug_id, name in enumerate(self.drug_names)),
+            synonyms or (),
+        )
+        for name, drug_id in patterns:
+            if not 0 <= drug_id < len(self.drug_names):
+                raise ValueError(f"Synonym '{name}' refers to unknown drug {drug_id}.")
+            tokens = tokenize(name) if isinstance(name, str) else []
+            if not tokens:
+                continue
+
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                state = next_state
+            self._outputs[state] += (len(self._patterns),)
+
+            # `\b` next to a non-word character needs a word character beside it
+            self._patterns.append(
+                (
+                    drug_id,
+                    len(tokens),
+                    not _is_word_token(tokens[0]),
+                    not _is_word_token(tokens[-1]),
+                )
+            )
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+
+    def match(self, text: Optional[str]) -> List[int]:
+        """
+        Return the keys of every drug mentioned in a text.
+
+        Args:
+            text (Optional[str]): The text to scan; non-strings match nothing.
+
+        Returns:
+            List[int]: Sorted, de-duplicated drug keys.
+        """
+        if not isinstance(text, str):
+            return []
+
+        tokens = tokenize(text)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found = set()
+        state = 0
+
+        for position, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+
+            for pattern in outputs[state]:
+                drug_id, length, word_before, word_after = self._patterns[pattern]
+                if word_before:
+                    start = position - length + 1
+                    if start == 0 or not _is_word_token(tokens[start - 1]):
+                        continue
+                if word_after:
+                    if position + 1 == len(tokens) or not _is_word_token(
+                        tokens[position + 1]
+                    ):
+                        continue
+                found.add(drug_id)
+
+        return sorted(found)
@@ -0,0 +1,210 @@
+import gc
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import unicodedata
+from typing import Iterable, List, Optional, Tuple
+
+from .matcher import MATCHER_VERSION, DrugMatcher
+
+# Bump when the layout of the cache files changes
+MATCHER_CACHE_VERSION = 1
+
+MATCHER_CACHE_PREFIX = "matcher-"
+MATCHER_CACHE_SUFFIX = ".pkl"
+# Cache files kept, the most recently used first; one per drug dictionary
+MATCHER_CACHE_KEEP = 4
+PICKLE_PROTOCOL = 5
+
+
+def matcher_cache_key(
+    drug_names: List[str], synonyms: Optional[Iterable[Tuple[str, int]]] = None
+) -> str:
+    """
+    Content hash of everything the compiled automaton depends on.
+
+    Besides the drug names and synonyms, the key covers the matcher and cache
+    versions, the Python version, which pickles the automaton, and the Unicode
+    database, which decides what `\\w` tokenizes; a change in any of them
+    selects another cache file.
+
+    Args:
+        drug_names (List[str]): Drug names returned by `get_drug_names`.
+        synonyms (Optional[Iterable[Tuple[str, int]]]): (synonym, drug key)
+            pairs returned by `get_drug_synonyms`.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    header = [
+        MATCHER_CACHE_VERSION,
+        MATCHER_VERSION,
+        sys.implementation.name,
+        sys.version_info[:2],
+        unicodedata.unidata_version,
+    ]
+    digest.update(json.dumps(header).encode("utf-8"))
+    for values in (drug_names, list(synonyms or ())):
+        digest.update(json.dumps(values, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def matcher_cache_path(cache_dir: str, key: str) -> str:
+    """Path of the cache file of a key returned by `matcher_cache_key`."""
+    return os.path.join(
+        cache_dir, f"{MATCHER_CACHE_PREFIX}automaton-{key[:32]}{MATCHER_CACHE_SUFFIX}"
+    )
+
+
+def load_matcher(path: str, key: Optional[str] = None) -> Optional[DrugMatcher]:
+    """
+    Load a cached automaton.
+
+    Args:
+        path (str): Cache file written by `save_matcher`.
+        key (Optional[str]): Expected key; a file of another key is ignored.
+
+    Returns:
+        Optional[DrugMatcher]: The automaton, or None if the file is missing,
+            unreadable or of another version or key.
+    """
+    # The automaton is millions of small containers: the garbage collector
+    # would scan them again and again while they are created
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, "rb") as file:
+            header = pickle.load(file)
+            expected = {"version": MATCHER_CACHE_VERSION, "key": key or header["key"]}
+            if header != expected:
+                logging.warning(f"⚠ Ignoring matcher cache of another version: {path}")
+                return None
+            matcher = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"⚠ Ignoring unreadable matcher cache {path}: {e}")
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if not isinstance(matcher, DrugMatcher):
+        logging.warning(f"⚠ Ignoring matcher cache without an automaton: {path}")
+        return None
+    return matcher
+
+
+def save_matcher(matcher: DrugMatcher, path: str, key: str) -> None:
+    """
+    Write an automaton to its cache file, atomically, then drop the least
+    recently used cache files beyond `MATCHER_CACHE_KEEP`.
+
+    Args:
+        matcher (DrugMatcher): The compiled automaton.
+        path (str): Cache file, see `matcher_cache_path`.
+        key (str): Key of the automaton, checked by `load_matcher`.
+    """
+    cache_dir = os.path.dirname(path) or "."
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            header = {"version": MATCHER_CACHE_VERSION, "key": key}
+            pickle.dump(header, file, protocol=PICKLE_PROTOCOL)
+            pickle.dump(matcher, file, protocol=PICKLE_PROTOCOL)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    pattern = os.path.join(cache_dir, f"{MATCHER_CACHE_PREFIX}*{MATCHER_CACHE_SUFFIX}")
+    cached = sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True)
+    for stale in cached[MATCHER_CACHE_KEEP:]:
+        try:
+            os.remove(stale)
+        except OSError:
+            # Already pruned by another process
+            pass
+
+
+def _save_or_log(matcher: DrugMatcher, path: str, key: str) -> None:
+    """Save an automaton with `save_matcher`; the cache never fails the pipeline."""
+    try:
+        save_matcher(matcher, path, key)
+        logging.info(f"✔ Matcher cached at: {path}")
+    except OSError as e:
+        logging.error(f"❌ Failed to cache the matcher at {path}: {e}")
+
+
+def cached_matcher_path(
+    cache_dir: str,
+    drug_names: List[str],
+    synonyms: Optional[List[Tuple[str, int]]] = None,
+    key: Optional[str] = None,
+) -> Tuple[str, Optional[DrugMatcher]]:
+    """
+    Make sure the automaton of a drug dictionary is cached, compiling it on a
+    miss, without loading it on a hit; e.g. before starting worker processes
+    that each load it with `load_matcher`.
+
+    Args:
+        cache_dir (str): Folder of the cache files.
+        drug_names (List[str]): Drug names returned by `get_drug_names`.
+        synonyms (Optional[List[Tuple[str, int]]]): (synonym, drug key) pairs.
+        key (Optional[str]): Their `matcher_cache_key`, if already computed.
+
+    Returns:
+        Tuple[str, Optional[DrugMatcher]]: The cache file, and the automaton
+            if it was just compiled.
+    """
+    key = key or matcher_cache_key(drug_names, synonyms)
+    path = matcher_cache_path(cache_dir, key)
+    if os.path.exists(path):
+        try:
+            # Keep the most recently used files when pruning
+            os.utime(path)
+        except OSError:
+            # Read-only cache, e.g. shipped in an image
+            pass
+        return path, None
+
+    matcher = DrugMatcher(drug_names, synonyms)
+    _save_or_log(matcher, path, key)
+    return path, matcher
+
+
+def load_or_build_matcher(
+    cache_dir: str,
+    drug_names: List[str],
+    synonyms: Optional[List[Tuple[str, int]]] = None,
+) -> DrugMatcher:
+    """
+    Load the cached automaton of a drug dictionary, compiling and caching it
+    when the dictionary, the matcher version or the Python version changed.
+
+    Args:
+        cache_dir (str): Folder of the cache files.
+        drug_names (List[str]): Drug names returned by `get_drug_names`.
+        synonyms (Optional[List[Tuple[str, int]]]): (synonym, drug key) pairs.
+
+    Returns:
+        DrugMatcher: The automaton, equal to `DrugMatcher(drug_names, synonyms)`.
+    """
+    key = matcher_cache_key(drug_names, synonyms)
+    path, matcher = cached_matcher_path(cache_dir, drug_names, synonyms, key)
+    if matcher is not None:
+        return matcher
+    matcher = load_matcher(path, key)
+    if matcher is not None:
+        logging.info(f"✔ Matcher loaded from cache: {path}")
+        return matcher
+
+    # Corrupted or truncated file: replace it
+    matcher = DrugMatcher(drug_names, synonyms)
+    _save_or_log(matcher, path, key)
+    return matcher
@@ -1,54 +1,308 @@
 import logging
-from typing import Dict, List
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Union
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+PUBLICATION_FIELDS = ["source", "title", "journal", "date"]
 
 
-def build_relationships(
-    mentions: List[Dict[str, str]]
-) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+def order_by_drug(mention_table: pd.DataFrame) -> pd.DataFrame:
     """
-    Build relationships between drugs and their mentions in publications.
+    Group the rows of a mention table by drug, in order of first appearance.
+
+    This is the order in which `build_relationships` lists drugs and their
+    publications; rows of a drug keep their relative order.
 
     Args:
-        mentions (List[Dict[str, str]]): A list of drug mention dictionaries.
+        mention_table (pd.DataFrame): Table returned by `find_mention_table`.
 
     Returns:
-        Dict[str, Dict[str, List[Dict[str, str]]]]: A dictionary mapping each drug to its publication mentions.
+        pd.DataFrame: The reordered table.
+    """
+    codes, _ = pd.factorize(mention_table["drug"])
+    return mention_table.iloc[np.argsort(codes, kind="stable")]
+
+
+def _narrow(codes: np.ndarray) -> np.ndarray:
+    """Store interned codes in the smallest integer type that holds them."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if len(codes) == 0 or codes.max() <= np.iinfo(dtype).max:
+            return codes.astype(dtype)
+    return codes.astype(np.int64)
+
 
-    Raises:
-        ValueError: If the mentions list is empty or contains invalid entries.
+def _intern(values: np.ndarray) -> tuple:
+    """Replace values by small integer codes into an array of distinct values."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return _narrow(codes), np.asarray(uniques, dtype=object)
+
+
+def _same_values(left: np.ndarray, right: np.ndarray) -> bool:
+    missing = pd.isna(left)
+    return bool(((left == right) | (missing & pd.isna(right))).all())
+
+
+class RelationshipGraph(Mapping):
     """
+    Drug -> publications graph stored as arrays, read as the nested mapping
+    `{drug: {"publications": [{"source", "title", "journal", "date"}, ...]}}`.
+
+    Each publication is stored once, however many drugs it mentions: its title
+    as one reference, its source, journal and date as small integer codes into
+    arrays of distinct values. The publications of a drug are a slice of an
+    integer edge array (CSR layout). The nested dicts of a drug are only built
+    when it is looked up, e.g. one drug at a time by `save_to_json`.
+
+    Equality, iteration order and `dict(graph)` are those of the mapping
+    returned by `build_relationships`.
+    """
+
+    __slots__ = (
+        "_drugs",
+        "_drug_index",
+        "_offsets",
+        "_edges",
+        "_titles",
+        "_sources",
+        "_source_names",
+        "_journals",
+        "_journal_names",
+        "_dates",
+        "_date_names",
+    )
 
-    if not mentions:
-        logging.warning(
-            "No mentions provided. Returning an empty relationships dictionary."
+    def __init__(
+        self,
+        drugs: List[str],
+        offsets: np.ndarray,
+        edges: np.ndarray,
+        publications: Dict[str, np.ndarray],
+    ):
+        """
+        Args:
+            drugs (List[str]): Drug names, in graph order.
+            offsets (np.ndarray): The publications of drug `i` are
+                `edges[offsets[i]:offsets[i + 1]]`.
+            edges (np.ndarray): Publication row of each mention.
+            publications (Dict[str, np.ndarray]): The source, title, journal
+                and date of each publication, as separate arrays.
+        """
+        self._drugs = list(drugs)
+        self._drug_index = {drug: index for index, drug in enumerate(self._drugs)}
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._edges = _narrow(np.asarray(edges, dtype=np.int64))
+        self._titles = np.asarray(publications["title"], dtype=object)
+        self._sources, self._source_names = _intern(publications["source"])
+        self._journals, self._journal_names = _intern(publications["journal"])
+        self._dates, self._date_names = _intern(publications["date"])
+
+    @classmethod
+    def from_mention_table(cls, mention_table: pd.DataFrame) -> "RelationshipGraph":
+        """
+        Build the graph of a mention table whose drugs are all valid.
+
+        Drugs are listed in order of first appearance (see `order_by_drug`).
+        Mentions sharing a source and `publication_id` are one publication.
+
+        Args:
+            mention_table (pd.DataFrame): Table returned by `find_mention_table`,
+                or any table with the columns drug, source, title, journal, date.
+
+        Returns:
+            RelationshipGraph: The graph.
+        """
+        table = order_by_drug(mention_table)
+        codes, names = pd.factorize(table["drug"].astype(object))
+        counts = np.bincount(codes, minlength=len(names))
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        fields = {
+            field: table[field].to_numpy(dtype=object) for field in PUBLICATION_FIELDS
+        }
+        edges = np.arange(len(table), dtype=np.int64)
+        first_rows = edges
+        if "publication_id" in table.columns and len(table):
+            source_codes, _ = pd.factorize(fields["source"], use_na_sentinel=False)
+            ids = table["publication_id"].to_numpy(dtype=np.int64)
+            shared, _ = pd.factorize(source_codes * (int(ids.max()) + 1) + ids)
+            # Codes follow first appearance, so first rows come out in code order
+            _, rows = np.unique(shared, return_index=True)
+            if all(
+                _same_values(fields[field][rows][shared], fields[field])
+                for field in PUBLICATION_FIELDS
+            ):
+                edges, first_rows = shared, rows
+
+        publications = {field: values[first_rows] for field, values in fields.items()}
+        return cls(list(names), offsets, edges, publications)
+
+    @classmethod
+    def empty(cls) -> "RelationshipGraph":
+        """Return a graph without drugs."""
+        return cls(
+            [],
+            np.zeros(1, dtype=np.int64),
+            np.empty(0, dtype=np.int64),
+            {field: np.empty(0, dtype=object) for field in PUBLICATION_FIELDS},
         )
-        return {}
 
-    relationships = {}
+    def __getitem__(self, drug: str) -> Dict[str, List[Dict[str, Any]]]:
+        index = self._drug_index[drug]
+        return {"publications": self._publications(index)}
 
-    # Process each mention and build relationships
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._drugs)
+
+    def __len__(self) -> int:
+        return len(self._drugs)
+
+    def __contains__(self, drug: object) -> bool:
+        return drug in self._drug_index
+
+    def __repr__(self) -> str:
+        return f"RelationshipGraph({dict(self)!r})"
+
+    def _publications(self, index: int) -> List[Dict[str, Any]]:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        rows = self._edges[start:end]
+        return [
+            {"source": source, "title": title, "journal": journal, "date": date}
+            for source, title, journal, date in zip(
+                self._source_names[self._sources[rows]],
+                self._titles[rows],
+                self._journal_names[self._journals[rows]],
+                self._date_names[self._dates[rows]],
+            )
+        ]
+
+    @property
+    def mentions(self) -> int:
+        """Number of (drug, publication) edges."""
+        return len(self._edges)
+
+    @property
+    def publications(self) -> int:
+        """Number of distinct publications."""
+        return len(self._titles)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays, title strings excluded as they are shared."""
+        arrays = (
+            self._offsets,
+            self._edges,
+            self._titles,
+            self._sources,
+            self._journals,
+            self._dates,
+            self._source_names,
+            self._journal_names,
+            self._date_names,
+        )
+        return sum(array.nbytes for array in arrays)
+
+    def to_mention_frame(self) -> pd.DataFrame:
+        """
+        Expand the graph to one row per mention, in graph order, without dicts.
+
+        Returns:
+            pd.DataFrame: The columns drug, source, title, journal and date.
+        """
+        drugs = np.repeat(np.asarray(self._drugs, dtype=object), np.diff(self._offsets))
+        rows = self._edges
+        return pd.DataFrame(
+            {
+                "drug": drugs,
+                "source": self._source_names[self._sources[rows]],
+                "title": self._titles[rows],
+                "journal": self._journal_names[self._journals[rows]],
+                "date": self._date_names[self._dates[rows]],
+            }
+        )
+
+    def to_dict(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Materialize the nested dict representation."""
+        return dict(self.items())
+
+
+def _valid_mention_table(mention_table: pd.DataFrame) -> pd.DataFrame:
+    # Validate each distinct drug name once rather than once per mention
+    invalid = [
+        drug
+        for drug in pd.unique(mention_table["drug"].astype(object))
+        if not isinstance(drug, str) or not drug.strip()
+    ]
+    for drug in invalid:
+        logging.warning(f"Skipping invalid drug entry: {drug!r}")
+
+    if invalid:
+        mention_table = mention_table[
+            ~mention_table["drug"].astype(object).isin(invalid).to_numpy()
+        ]
+    return mention_table
+
+
+def _mention_table_from_records(mentions: List[Dict[str, str]]) -> pd.DataFrame:
+    columns = {field: [] for field in ["drug"] + PUBLICATION_FIELDS}
     for mention in mentions:
         drug = mention.get("drug")
         if not isinstance(drug, str) or not drug.strip():
             logging.warning(f"Skipping invalid drug entry: {mention}")
             continue  # Skip invalid drug names
 
-        publication_data = {
-            "source": mention.get("source", ""),
-            "title": mention.get("title", ""),
-            "journal": mention.get("journal", ""),
-            "date": mention.get("date", ""),
-        }
+        columns["drug"].append(drug)
+        for field in PUBLICATION_FIELDS:
+            columns[field].append(mention.get(field, ""))
+    return pd.DataFrame(columns, dtype=object)
 
-        # Use setdefault to simplify dictionary structure creation
-        relationships.setdefault(drug, {"publications": []})["publications"].append(
-            publication_data
-        )
 
-    logging.info(f"Built relationships for {len(relationships)} unique drugs.")
-    return relationships
+def build_relationship_graph(
+    mentions: Union[List[Dict[str, str]], pd.DataFrame]
+) -> RelationshipGraph:
+    """
+    Build the compact graph between drugs and the publications mentioning them.
+
+    Args:
+        mentions (Union[List[Dict[str, str]], pd.DataFrame]): A list of drug mention
+            dictionaries, or the columnar table returned by `find_mention_table`.
+
+    Returns:
+        RelationshipGraph: A mapping of each drug to its publication mentions,
+            the nested dicts being built on access.
+    """
+    if len(mentions) == 0:
+        logging.warning("No mentions provided. Returning an empty relationships graph.")
+        return RelationshipGraph.empty()
+
+    if isinstance(mentions, pd.DataFrame):
+        table = _valid_mention_table(mentions)
+    else:
+        table = _mention_table_from_records(mentions)
+
+    graph = RelationshipGraph.from_mention_table(table)
+    logging.info(
+        f"Built relationships for {len(graph)} unique drugs "
+        f"({graph.publications} publications, {graph.mentions} mentions)."
+    )
+    return graph
+
+
+def build_relationships(
+    mentions: Union[List[Dict[str, str]], pd.DataFrame]
+) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+    """
+    Build relationships between drugs and their mentions in publications.
+
+    Materializes `build_relationship_graph` as nested dicts, for callers that
+    need a plain dict; the pipeline keeps the compact graph.
+
+    Args:
+        mentions (Union[List[Dict[str, str]], pd.DataFrame]): A list of drug mention
+            dictionaries, or the columnar table returned by `find_mention_table`.
+
+    Returns:
+        Dict[str, Dict[str, List[Dict[str, str]]]]: A dictionary mapping each drug to its publication mentions.
+    """
+    return build_relationship_graph(mentions).to_dict()
@@ -0,0 +1,173 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from .utils import utils
+from .dedup import iter_deduplicated_chunks
+from .drug_mentions import (
+    SOURCES,
+    TITLE_COLUMNS,
+    build_matcher,
+    find_source_mention_table,
+    get_drug_names,
+    get_drug_synonyms,
+)
+from .relationships import RelationshipGraph, build_relationship_graph
+from .data_processing import load_drug_synonyms
+from data_extract.extract import SOURCE_SCHEMAS, load_csv, load_file
+from data_extract.ingest import resolve_input_files
+from config import (
+    DRUGS_FILE,
+    DRUG_SYNONYMS_FILE,
+    PUBMED_CSV_FILE,
+    PUBMED_JSON_FILE,
+    CLINICAL_TRIALS_CSV_FILE,
+)
+
+DEFAULT_STREAM_FILES = {
+    "pubmed": [PUBMED_CSV_FILE, PUBMED_JSON_FILE],
+    "clinical_trials": CLINICAL_TRIALS_CSV_FILE,
+}
+
+
+def source_paths(
+    files: Dict[str, Union[str, List[str]]], source_name: str
+) -> List[str]:
+    """
+    The input files of a source, given as one path or a list of paths; each
+    path may be a file, a directory or a glob, see `resolve_input_files`.
+    """
+    return resolve_input_files(files[source_name])
+
+
+def iter_source_chunks(
+    paths: List[str], chunk_size: int, schema: Dict[str, str]
+) -> Iterator[pd.DataFrame]:
+    """
+    Read the files of one source one after the other, by chunks.
+
+    Raises:
+        ValueError: If a file cannot be loaded.
+    """
+    for path in paths:
+        reader = load_file(path, chunksize=chunk_size, schema=schema)
+        if reader is None:
+            raise ValueError(f"Failed to load file: {path}")
+        yield from reader
+
+
+def clean_publication_chunk(df: pd.DataFrame, title_column: str) -> pd.DataFrame:
+    """
+    Apply the row-wise cleaning steps of `clean_data` to one chunk of publications.
+
+    Args:
+        df (pd.DataFrame): A chunk of PubMed or ClinicalTrials rows.
+        title_column (str): The name of the title column.
+
+    Returns:
+        pd.DataFrame: The cleaned chunk, duplicates not yet removed.
+    """
+    df = utils.standardize_date_format(df, "date")
+    if title_column in df.columns:
+        # A chunk whose titles are all empty is read as a float column
+        df[title_column] = df[title_column].astype(object)
+    df = utils.sanitize_title_text(df, title_column)
+    return utils.remove_rows_with_empty_titles_or_journals(df, title_column, "journal")
+
+
+def iter_clean_publication_chunks(
+    chunks: Iterable[pd.DataFrame], title_column: str, id_column: str = "id"
+) -> Iterator[pd.DataFrame]:
+    """
+    Clean a stream of publication chunks and drop ids already seen in earlier chunks.
+
+    The first occurrence of an id is kept, as `remove_duplicate_ids_and_reindex`
+    does on a whole dataframe. Ids are compared by their string form, since the
+    dtype inferred for a column may differ from one chunk to the next. Ids are
+    de-duplicated on disk by `iter_deduplicated_chunks`, in bounded memory.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Raw chunks, e.g. from `load_csv(chunksize=...)`.
+        title_column (str): The name of the title column.
+        id_column (str): The name of the ID column.
+
+    Yields:
+        pd.DataFrame: Cleaned, de-duplicated chunks with a fresh index.
+    """
+    cleaned = (clean_publication_chunk(chunk, title_column) for chunk in chunks)
+    yield from iter_deduplicated_chunks(cleaned, id_column)
+
+
+def stream_relationships(
+    files: Optional[Dict[str, Union[str, List[str]]]] = None,
+    drugs_file: str = DRUGS_FILE,
+    chunk_size: int = 100_000,
+    engine: str = "automaton",
+    synonyms_file: Optional[str] = DRUG_SYNONYMS_FILE,
+    cache_dir: Optional[str] = None,
+) -> RelationshipGraph:
+    """
+    Run extract, clean and match chunk by chunk and accumulate the relationships.
+
+    Only one chunk of publications is held in memory at a time, along with the
+    mentions found so far, so peak memory is set by `chunk_size` plus the size
+    of the relationships themselves; the ids seen so far are kept on disk.
+    The result is the same as the batch pipeline on the same files: dates are
+    parsed value by value, whatever the chunk they fall in.
+
+    Args:
+        files (Optional[Dict[str, Union[str, List[str]]]]): CSV, Parquet or JSON
+            file, directory or glob, or list of those, per source ("pubmed" and "clinical_trials");
+            defaults to the paths from config, PubMed being read from its CSV
+            and then its JSON file.
+        drugs_file (str): Path to the drugs CSV, loaded in full.
+        chunk_size (int): Number of CSV rows read per chunk.
+        engine (str): Matching engine, either "automaton" or "regex".
+        synonyms_file (Optional[str]): Path to the drug synonyms, if any.
+        cache_dir (Optional[str]): Folder of the compiled automaton cache, see
+            `build_matcher`.
+
+    Returns:
+        RelationshipGraph: A mapping of each drug to its publication mentions,
+            equal to `build_relationships` on the batch mention table.
+
+    Raises:
+        ValueError: If a file cannot be loaded or a required column is missing.
+    """
+    files = files or DEFAULT_STREAM_FILES
+
+    drugs_df = load_csv(drugs_file, schema=SOURCE_SCHEMAS["drugs"])
+    if drugs_df is None:
+        raise ValueError(f"Failed to load drugs file: {drugs_file}")
+    drugs_df = utils.convert_id_to_string(drugs_df, "atccode")
+    drugs_df = utils.remove_duplicate_ids_and_reindex(drugs_df, "atccode")
+
+    drug_names = get_drug_names(drugs_df)
+    synonyms = get_drug_synonyms(drugs_df, load_drug_synonyms(synonyms_file))
+    matcher = build_matcher(drug_names, engine, synonyms, cache_dir)
+
+    tables = []
+    for source_name in SOURCES:
+        reader = iter_source_chunks(
+            source_paths(files, source_name), chunk_size, SOURCE_SCHEMAS[source_name]
+        )
+
+        offset = 0
+        for chunk in iter_clean_publication_chunks(reader, TITLE_COLUMNS[source_name]):
+            mention_table = find_source_mention_table(
+                chunk, source_name, drug_names, matcher, publication_offset=offset
+            )
+            offset += len(chunk)
+
+            # Only the mentions of a chunk are kept, not its publications
+            tables.append(mention_table)
+
+        logging.info(f"Streamed {offset} {source_name} publications.")
+
+    if not tables:
+        return RelationshipGraph.empty()
+    # Rows in batch order: by source, then drug key, then publication
+    mentions = pd.concat(tables, ignore_index=True)
+    order = np.lexsort((mentions["drug_id"].to_numpy(), mentions["source"].cat.codes))
+    return build_relationship_graph(mentions.iloc[order])
@@ -1,10 +1,24 @@
+import numpy as np
 import pandas as pd
+import re
+from data_extract.dates import normalize_dates, report_unparseable_dates
+
+# Bytes removed from titles once non-ASCII characters are dropped: everything
+# but word characters, whitespace and "-" (the regex [^\w\s-] on ASCII text)
+_TITLE_DELETE = bytes(
+    byte for byte in range(128) if re.match(r"[\w\s-]", chr(byte)) is None
+)
+# Whitespace that `bytes.split` does not split on, unlike `\s` and `str.split`
+_TITLE_TRANSLATION = bytes.maketrans(b"\x1c\x1d\x1e\x1f", b"    ")
 
 
 def standardize_date_format(df: pd.DataFrame, date_column: str) -> pd.DataFrame:
     """
     Standardizes the date format to 'YYYY-MM-DD' for a given column.
 
+    Each distinct value is parsed once with the format chain of
+    `normalize_dates`; values no format matches are logged and left empty.
+
     Args:
         df (pd.DataFrame): The dataframe containing the date column.
         date_column (str): The name of the date column.
@@ -13,10 +27,8 @@ def standardize_date_format(df: pd.DataFrame, date_column: str) -> pd.DataFrame:
         pd.DataFrame: The dataframe with standardized date format.
     """
     try:
-        df[date_column] = pd.to_datetime(df[date_column], errors="coerce").dt.strftime(
-            "%Y-%m-%d"
-        )
-        df[date_column] = df[date_column].replace("NaT", "")
+        df[date_column], unparseable = normalize_dates(df[date_column])
+        report_unparseable_dates(date_column, unparseable)
         return df
     except KeyError:
         raise ValueError(f"Column '{date_column}' not found in the dataframe.")
@@ -44,6 +56,48 @@ def convert_id_to_string(df: pd.DataFrame, id_column: str) -> pd.DataFrame:
         raise Exception(f"Error converting ID column to string: {e}")
 
 
+def normalize_title(text: str) -> str:
+    """
+    Normalize one title in a single pass over its bytes.
+
+    Same result as the former chain of column operations: drop non-ASCII
+    characters, remove characters other than word characters, whitespace and
+    "-", title-case, strip and collapse whitespace runs into one space.
+
+    Args:
+        text (str): The title.
+
+    Returns:
+        str: The normalized title.
+    """
+    data = text.encode("ascii", "ignore").translate(_TITLE_TRANSLATION, _TITLE_DELETE)
+    words = data.title().split()
+    return b" ".join(words).decode("ascii")
+
+
+def _missing_title(value: object) -> object:
+    # What the string methods return: None and NA are kept, other values are NaN
+    return value if value is None or value is pd.NA else np.nan
+
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """
+    Normalize a column of titles with `normalize_title`, one pass per title.
+
+    Args:
+        titles (pd.Series): The titles; values that are not strings become
+            missing, as with the pandas string methods.
+
+    Returns:
+        pd.Series: The normalized titles, as an object column.
+    """
+    normalized = [
+        normalize_title(value) if isinstance(value, str) else _missing_title(value)
+        for value in titles.to_numpy(dtype=object)
+    ]
+    return pd.Series(normalized, index=titles.index, dtype=object)
+
+
 def sanitize_title_text(df: pd.DataFrame, title_column: str) -> pd.DataFrame:
     """
     Sanitizes and normalizes the text in the title column by:
@@ -52,6 +106,8 @@ def sanitize_title_text(df: pd.DataFrame, title_column: str) -> pd.DataFrame:
     3. Capitalizing words properly
     4. Stripping extra spaces
 
+    All steps run in a single pass per title, see `normalize_titles`.
+
     Args:
         df (pd.DataFrame): The dataframe containing the title column.
         title_column (str): The name of the title column.
@@ -60,16 +116,7 @@ def sanitize_title_text(df: pd.DataFrame, title_column: str) -> pd.DataFrame:
         pd.DataFrame: The dataframe with sanitized title text.
     """
     try:
-        df[title_column] = (
-            df[title_column].str.encode("ascii", "ignore").str.decode("utf-8")
-        )
-        df[title_column] = df[title_column].str.replace(r"[^\w\s-]", "", regex=True)
-        df[title_column] = (
-            df[title_column]
-            .str.title()
-            .str.strip()
-            .str.replace(r"\s+", " ", regex=True)
-        )
+        df[title_column] = normalize_titles(df[title_column])
         return df
     except KeyError:
         raise ValueError(f"Column '{title_column}' not found in the dataframe.")
@@ -1,69 +1,191 @@
+import argparse
+import json
 import sys
 import os
+from typing import TYPE_CHECKING, List, Optional
 
 # Dynamically add project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import OUTPUT_JSON_PATH, AD_HOC_OUTPUT_PATH
+from config import (
+    AD_HOC_DIR,
+    AD_HOC_TOP_K,
+    TITLE_INDEX_ENABLED,
+    TITLE_INDEX_DIR,
+    MATCHER_ENGINE,
+    MATCH_WORKERS,
+    MATCH_CHUNK_SIZE,
+    MATCHER_CACHE_DIR,
+    PIPELINE_MODE,
+    STREAMING_CHUNK_SIZE,
+    METRICS_ENABLED,
+    METRICS_DIR,
+    PROFILING_ENABLED,
+    PROFILE_DIR,
+    LOG_LEVEL,
+    LOG_FORMAT,
+)
 import logging
 
+# Pipeline modules (pandas, numpy, pyarrow) are imported by the functions
+# using them, so that importing this module, `--help` and `query` stay fast
+if TYPE_CHECKING:
+    from monitoring.metrics import PipelineMetrics
 
-from data_transform.data_processing import load_csv_files
-from data_transform.drug_mentions import find_mentions
-from data_transform.relationships import build_relationships
-from data_transform.data_cleaning import clean_data
-from ad_hoc.ad_hoc import get_top_journal_by_unique_drugs
-from data_load.load import save_to_json
+PIPELINE_MODES = ("batch", "streaming", "incremental")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
+def run_ad_hoc(data, metrics: "PipelineMetrics"):
+    """Compute and save the ad hoc analytics of the mentions or relationships."""
+    from ad_hoc.analytics import run_analytics, save_analytics
+    from monitoring.metrics import count_rows
 
-def process_data():
-    """Main pipeline function to process drug mentions in publications."""
-    try:
-        # Extract
-        logging.info("=" * 50)
-        logging.info("1- Loading CSV files...\n")
+    logging.info("=" * 50)
+    logging.info(f"6- Generating ad_hoc...{''}\n")
 
-        loaded_dataframes = load_csv_files()
+    with metrics.stage("ad_hoc", rows_in=count_rows(data)) as stage:
+        analytics = run_analytics(data, top_k=AD_HOC_TOP_K)
+        stage["rows_out"] = len(analytics)
 
-        # trasform
-        logging.info("=" * 50)
-        logging.info("2- Cleaning data...\n")
+    logging.info("=" * 50)
+    logging.info(f"7- Saving ad hoc files to {AD_HOC_DIR}...\n")
+    with metrics.stage("save_ad_hoc", rows_in=len(analytics)):
+        save_analytics(analytics, AD_HOC_DIR)
 
-        cleaned_data_df = clean_data(loaded_dataframes)
 
-        logging.info("=" * 50)
-        logging.info("3- Finding drug mentions in publications...\n")
+def stream_data(metrics: "PipelineMetrics" = None):
+    """Streaming variant of `process_data`: publications are read chunk by chunk."""
+    from data_load.outputs import save_graph
+    from data_transform.streaming import stream_relationships
+    from monitoring.metrics import PipelineMetrics
 
-        mentions = find_mentions(
-            cleaned_data_df["PubMed"],
-            cleaned_data_df["ClinicalTrials"],
-            cleaned_data_df["Drugs"],
+    metrics = metrics or PipelineMetrics(enabled=False)
+    logging.info("=" * 50)
+    logging.info(
+        f"1-4- Loading, cleaning, matching and building relationships "
+        f"in chunks of {STREAMING_CHUNK_SIZE} rows...\n"
+    )
+    with metrics.stage("stream_relationships") as stage:
+        relationships = stream_relationships(
+            chunk_size=STREAMING_CHUNK_SIZE,
+            engine=MATCHER_ENGINE,
+            cache_dir=MATCHER_CACHE_DIR,
         )
+        stage["rows_out"] = len(relationships)
+
+    save_graph(relationships, relationships, metrics)
+
+    logging.info("✅ Data processing completed successfully.")
+
+    run_ad_hoc(relationships, metrics)
+
+    return relationships
+
+
+def process_data(mode: str = PIPELINE_MODE):
+    """
+    Main pipeline function to process drug mentions in publications.
+
+    When METRICS_ENABLED is set, the wall time, CPU time, peak RSS growth and
+    rows of each stage are written to METRICS_DIR (pipeline.json and the
+    Prometheus textfile pipeline.prom), including for a failed run.
+    When profiling is on (PROFILING_ENABLED or PIPELINE_PROFILE=1), each stage
+    also writes cProfile, tracemalloc and collapsed-stack reports to a new
+    folder of PROFILE_DIR.
+
+    Args:
+        mode (str): "batch" loads and cleans every file in memory; "streaming"
+            processes publications chunk by chunk with bounded memory;
+            "incremental" only matches publications added or changed since the
+            previous run.
+    """
+    from data_load.outputs import save_graph
+    from data_transform.data_cleaning import clean_data
+    from data_transform.data_processing import load_drug_synonyms, load_input_files
+    from data_transform.drug_mentions import find_mention_table
+    from data_transform.incremental import update_mention_table
+    from data_transform.relationships import build_relationship_graph
+    from data_load.title_index import build_title_index
+    from monitoring.metrics import PipelineMetrics, count_rows
+    from monitoring.profiling import StageProfiler, profile_run_dir, profiling_enabled
+
+    profiler = None
+    if profiling_enabled(PROFILING_ENABLED):
+        profiler = StageProfiler(profile_run_dir(PROFILE_DIR))
+        logging.info(f"Profiling each stage into {profiler.output_dir}")
+    metrics = PipelineMetrics(METRICS_ENABLED, labels={"mode": mode}, profiler=profiler)
+    try:
+        if mode not in PIPELINE_MODES:
+            raise ValueError(
+                f"Unknown pipeline mode '{mode}'. Expected one of {PIPELINE_MODES}."
+            )
+        if mode == "streaming":
+            return stream_data(metrics)
+
+        if mode == "incremental":
+            logging.info("=" * 50)
+            logging.info("1-3- Matching new or changed publications...\n")
+
+            with metrics.stage("update_mention_table") as stage:
+                mentions = update_mention_table(
+                    engine=MATCHER_ENGINE, cache_dir=MATCHER_CACHE_DIR
+                )
+                stage["rows_out"] = len(mentions)
+        else:
+            # Extract
+            logging.info("=" * 50)
+            logging.info("1- Loading input files...\n")
+
+            with metrics.stage("load_input_files") as stage:
+                loaded_dataframes = load_input_files()
+                stage["rows_out"] = count_rows(loaded_dataframes)
+
+            # trasform
+            logging.info("=" * 50)
+            logging.info("2- Cleaning data...\n")
+
+            with metrics.stage("clean_data", count_rows(loaded_dataframes)) as stage:
+                cleaned_data_df = clean_data(loaded_dataframes)
+                stage["rows_out"] = count_rows(cleaned_data_df)
+
+            if TITLE_INDEX_ENABLED:
+                logging.info(f"Indexing cleaned titles into {TITLE_INDEX_DIR}...")
+                with metrics.stage("build_title_index", count_rows(cleaned_data_df)):
+                    build_title_index(cleaned_data_df, TITLE_INDEX_DIR)
+
+            logging.info("=" * 50)
+            logging.info("3- Finding drug mentions in publications...\n")
+
+            publications = len(cleaned_data_df["PubMed"]) + len(
+                cleaned_data_df["ClinicalTrials"]
+            )
+            with metrics.stage("find_mentions", publications) as stage:
+                stage["match"] = {}
+                mentions = find_mention_table(
+                    cleaned_data_df["PubMed"],
+                    cleaned_data_df["ClinicalTrials"],
+                    cleaned_data_df["Drugs"],
+                    engine=MATCHER_ENGINE,
+                    workers=MATCH_WORKERS,
+                    chunk_size=MATCH_CHUNK_SIZE,
+                    stats=stage["match"] if metrics.enabled else None,
+                    synonyms_df=load_drug_synonyms(),
+                    cache_dir=MATCHER_CACHE_DIR,
+                )
+                stage["rows_out"] = len(mentions)
 
         logging.info("=" * 50)
         logging.info("4- Building relationships...\n")
-        relationships = build_relationships(mentions)
+        with metrics.stage("build_relationships", len(mentions)) as stage:
+            relationships = build_relationship_graph(mentions)
+            stage["rows_out"] = len(relationships)
 
         # load
-        logging.info("=" * 50)
-        logging.info(f"5- Saving final JSON output to {OUTPUT_JSON_PATH}...\n")
-        save_to_json(relationships, OUTPUT_JSON_PATH)
+        save_graph(relationships, mentions, metrics)
 
         logging.info("✅ Data processing completed successfully.")
 
-        logging.info("=" * 50)
-        logging.info(f"6- Generating ad_hoc...{''}\n")
-
-        dataframe_df = get_top_journal_by_unique_drugs(OUTPUT_JSON_PATH)
-
-        logging.info("=" * 50)
-        logging.info(f"7- Saving adoc file {AD_HOC_OUTPUT_PATH}...\n")
-        save_to_json(dataframe_df, AD_HOC_OUTPUT_PATH)
+        run_ad_hoc(mentions, metrics)
 
         return relationships
 
@@ -71,6 +193,80 @@ def process_data():
         logging.error(f"❌ An error occurred during data processing: {e}", exc_info=True)
         return None
 
+    finally:
+        metrics.save(METRICS_DIR, "pipeline")
+
+
+def query_title_index(
+    terms: Optional[str] = None,
+    journal: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: Optional[int] = 20,
+    index_dir: str = TITLE_INDEX_DIR,
+) -> dict:
+    """
+    Find the publications mentioning terms, in a journal and a date range.
+
+    Reads the title index written by the last batch run, not the dataset.
+
+    Args:
+        terms (Optional[str]): Words that must all appear in the title.
+        journal (Optional[str]): Exact journal name.
+        start (Optional[str]): First date, 'YYYY-MM-DD', included.
+        end (Optional[str]): Last date, 'YYYY-MM-DD', included.
+        limit (Optional[int]): Most publications returned; all if None.
+        index_dir (str): Folder of the title index.
+
+    Returns:
+        dict: The number of matching publications and the first `limit` ones.
+    """
+    from data_load.title_index import TitleIndex
+
+    return TitleIndex(index_dir).query(terms, journal, start, end, limit)
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Command line entry point.
+
+    `python src/main.py [run] [--mode MODE]` runs the pipeline;
+    `python src/main.py query --term X --journal Y --from A --to B` prints the
+    matching publications as JSON.
+    """
+    parser = argparse.ArgumentParser(description="Drug mentions pipeline.")
+    commands = parser.add_subparsers(dest="command")
+    run = commands.add_parser("run", help="Run the pipeline (default).")
+    run.add_argument("--mode", choices=PIPELINE_MODES, default=PIPELINE_MODE)
+    query = commands.add_parser("query", help="Query the title index.")
+    query.add_argument("--term", dest="terms", help="Words of the title, e.g. a drug.")
+    query.add_argument("--journal", help="Exact journal name.")
+    query.add_argument("--from", dest="start", help="First date, YYYY-MM-DD.")
+    query.add_argument("--to", dest="end", help="Last date, YYYY-MM-DD.")
+    query.add_argument("--limit", type=int, default=20, help="0 for every match.")
+    query.add_argument("--index-dir", default=TITLE_INDEX_DIR)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+
+    if args.command != "query":
+        return process_data(getattr(args, "mode", PIPELINE_MODE))
+
+    try:
+        result = query_title_index(
+            args.terms,
+            args.journal,
+            args.start,
+            args.end,
+            args.limit or None,
+            args.index_dir,
+        )
+    except FileNotFoundError:
+        parser.error(f"No title index in {args.index_dir}, run the pipeline first.")
+    except ValueError as e:
+        parser.error(str(e))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return result
+
 
 if __name__ == "__main__":
-    process_data()
+    main()
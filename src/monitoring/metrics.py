@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import resource
+import sys
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from .profiling import StageProfiler
+
+METRIC_PREFIX = "drug_pipeline"
+
+# Stage measures exported to Prometheus: (record key, metric name, help text)
+PROMETHEUS_STAGE_METRICS = [
+    ("wall_seconds", "stage_wall_seconds", "Wall time of the stage."),
+    ("cpu_seconds", "stage_cpu_seconds", "CPU time of the process during the stage."),
+    (
+        "peak_rss_delta_bytes",
+        "stage_peak_rss_delta_bytes",
+        "Growth of the process peak RSS during the stage.",
+    ),
+    ("rows_in", "stage_rows_in", "Rows read by the stage."),
+    ("rows_out", "stage_rows_out", "Rows produced by the stage."),
+    ("rows_per_second", "stage_rows_per_second", "Throughput of the stage."),
+    ("success", "stage_success", "1 if the stage completed, else 0."),
+]
+
+
+def _peak_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def count_rows(value: Any) -> Optional[int]:
+    """
+    Count the rows of a stage input or output.
+
+    Args:
+        value (Any): A dataframe, a dict of dataframes (rows are summed, None
+            values skipped) or any sized value such as the relationships.
+
+    Returns:
+        Optional[int]: The number of rows, or None if it cannot be counted.
+    """
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, Mapping) and any(
+        isinstance(item, pd.DataFrame) for item in value.values()
+    ):
+        return sum(len(item) for item in value.values() if item is not None)
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _write_atomic(path: str, content: str) -> None:
+    # The textfile collector may read at any time: never expose a partial file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class PipelineMetrics:
+    """
+    Collect timings, memory and row counts of each pipeline stage.
+
+    Each stage is measured with `stage`, a context manager yielding the record
+    of the stage; the caller sets `rows_out` (and any extra detail) on it.
+    A disabled collector measures nothing and `save` writes nothing, so the
+    instrumentation can stay in place at no cost. Given a profiler, each stage
+    also runs under it, whether or not metrics are enabled.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        labels: Optional[Dict[str, Any]] = None,
+        profiler: Optional[StageProfiler] = None,
+    ):
+        """
+        Args:
+            enabled (bool): Whether stages are measured.
+            labels (Optional[Dict[str, Any]]): Labels of the run, e.g. the
+                pipeline mode, added to every Prometheus sample.
+            profiler (Optional[StageProfiler]): Profiler run around each stage.
+        """
+        self.enabled = enabled
+        self.labels = dict(labels or {})
+        self.profiler = profiler
+        self.stages: List[Dict[str, Any]] = []
+        self.started_at = datetime.now(timezone.utc)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[dict]:
+        """
+        Measure the enclosed block as the stage `name`.
+
+        Args:
+            name (str): Name of the stage.
+            rows_in (Optional[int]): Rows read by the stage, used for rows/sec.
+
+        Yields:
+            dict: The record of the stage; set `rows_out` and extra details on it.
+        """
+        record: Dict[str, Any] = {"stage": name, "rows_in": rows_in, "rows_out": None}
+        profile = self.profiler.profile(name) if self.profiler else nullcontext()
+        with profile:
+            if not self.enabled:
+                yield record
+                return
+            with self._measure(record):
+                yield record
+
+    @contextmanager
+    def _measure(self, record: Dict[str, Any]) -> Iterator[None]:
+        name = record["stage"]
+
+        rss_before = _peak_rss_bytes()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        record["success"] = 0
+        try:
+            yield
+            record["success"] = 1
+        finally:
+            wall = time.perf_counter() - wall_start
+            rows = record["rows_in"]
+            rows = record["rows_out"] if rows is None else rows
+            record.update(
+                wall_seconds=round(wall, 6),
+                cpu_seconds=round(time.process_time() - cpu_start, 6),
+                peak_rss_delta_bytes=_peak_rss_bytes() - rss_before,
+                rows_per_second=round(rows / wall, 3) if rows and wall else None,
+            )
+            self.stages.append(record)
+            logging.info(
+                f"⏱ {name}: {wall:.3f}s wall, {record['cpu_seconds']:.3f}s CPU, "
+                f"rows in/out {record['rows_in']}/{record['rows_out']}"
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: The run labels, start time and the record of each stage.
+        """
+        return {
+            "labels": self.labels,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "total_wall_seconds": round(
+                sum(stage["wall_seconds"] for stage in self.stages), 6
+            ),
+            "stages": self.stages,
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Format the stage measures in the Prometheus text exposition format.
+
+        Returns:
+            str: One gauge per measure, with a `stage` label per sample.
+        """
+        lines = []
+        for key, metric, help_text in PROMETHEUS_STAGE_METRICS:
+            name = f"{METRIC_PREFIX}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for stage in self.stages:
+                if stage.get(key) is None:
+                    continue
+                labels = _format_labels({**self.labels, "stage": stage["stage"]})
+                lines.append(f"{name}{labels} {stage[key]}")
+
+        name = f"{METRIC_PREFIX}_match_seconds_per_drug"
+        lines += [
+            f"# HELP {name} Matching time divided by the number of drugs.",
+            f"# TYPE {name} gauge",
+        ]
+        for stage in self.stages:
+            per_drug = stage.get("match", {}).get("seconds_per_drug")
+            if per_drug is not None:
+                labels = _format_labels({**self.labels, "stage": stage["stage"]})
+                lines.append(f"{name}{labels} {per_drug}")
+
+        name = f"{METRIC_PREFIX}_last_run_timestamp_seconds"
+        lines += [
+            f"# HELP {name} Start time of the last run.",
+            f"# TYPE {name} gauge",
+            f"{name}{_format_labels(self.labels)} {self.started_at.timestamp()}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def save(self, output_dir: str, name: str) -> Optional[Dict[str, str]]:
+        """
+        Write `<name>.json` and the textfile-collector file `<name>.prom`.
+
+        Args:
+            output_dir (str): Folder receiving both files.
+            name (str): Base name of the files.
+
+        Returns:
+            Optional[Dict[str, str]]: The path of each file, or None if the
+                collector is disabled.
+        """
+        if not self.enabled:
+            return None
+        paths = {
+            "json": os.path.join(output_dir, f"{name}.json"),
+            "prometheus": os.path.join(output_dir, f"{name}.prom"),
+        }
+        try:
+            _write_atomic(paths["json"], json.dumps(self.to_dict(), indent=2))
+            _write_atomic(paths["prometheus"], self.to_prometheus())
+        except (OSError, TypeError, ValueError) as e:
+            # Metrics never fail the pipeline
+            logging.error(f"❌ Failed to save metrics to {output_dir}: {e}")
+            return None
+        logging.info(f"✔ Metrics saved at: {paths['json']}")
+        return paths
@@ -0,0 +1,191 @@
+import cProfile
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+PROFILE_ENV_VAR = "PIPELINE_PROFILE"
+PROFILE_DIR_ENV_VAR = "PIPELINE_PROFILE_DIR"
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+# Number of allocation sites listed in each report
+TOP_ALLOCATIONS = 25
+# Frames kept per allocation traceback
+TRACEMALLOC_FRAMES = 10
+
+
+def profiling_enabled(default: bool = False) -> bool:
+    """
+    Whether profiling is switched on, read from the environment at call time.
+
+    Args:
+        default (bool): Value used when `PIPELINE_PROFILE` is not set.
+
+    Returns:
+        bool: True if `PIPELINE_PROFILE` is "1", "true", "yes" or "on".
+    """
+    value = os.environ.get(PROFILE_ENV_VAR)
+    if value is None:
+        return default
+    return value.strip().lower() in _TRUE_VALUES
+
+
+def profile_run_dir(base_dir: str, run_id: Optional[str] = None) -> str:
+    """
+    Folder holding the reports of one run.
+
+    Args:
+        base_dir (str): Root folder of all runs; `PIPELINE_PROFILE_DIR`
+            overrides it when set.
+        run_id (Optional[str]): Identifier of the run, e.g. the Airflow `run_id`;
+            defaults to the current UTC time.
+
+    Returns:
+        str: `<base_dir>/<run_id>`, with characters unsafe in a path replaced.
+    """
+    base_dir = os.environ.get(PROFILE_DIR_ENV_VAR) or base_dir
+    run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return os.path.join(base_dir, re.sub(r"[^\w.-]", "_", run_id))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class _StackSampler(threading.Thread):
+    """Sample the stack of one thread at a fixed interval, as collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+class StageProfiler:
+    """
+    Profile pipeline stages and write one set of reports per stage.
+
+    For a stage `name`, the run folder receives:
+        - `<name>.pstats`: the cProfile dump, readable with `pstats` or snakeviz;
+        - `<name>.pstats.txt`: its 40 most expensive functions by cumulative time;
+        - `<name>.allocations.txt`: the peak traced memory and the top
+          allocation sites seen by tracemalloc;
+        - `<name>.collapsed`: sampled stacks in the collapsed format of
+          flamegraph.pl and speedscope.
+    """
+
+    def __init__(
+        self, output_dir: str, sample_interval: float = DEFAULT_SAMPLE_INTERVAL
+    ):
+        """
+        Args:
+            output_dir (str): Folder of the run, see `profile_run_dir`.
+            sample_interval (float): Seconds between two stack samples.
+        """
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.reports: Dict[str, Dict[str, str]] = {}
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """
+        Run the enclosed block under cProfile, tracemalloc and the stack sampler.
+
+        Args:
+            name (str): Name of the stage, used for the report files.
+        """
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+        profiler = cProfile.Profile()
+        sampler.start()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            stacks = sampler.stop()
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if not tracing:
+                tracemalloc.stop()
+            self._write_reports(name, profiler, snapshot, peak, stacks)
+
+    def _write_reports(
+        self,
+        name: str,
+        profiler: cProfile.Profile,
+        snapshot: tracemalloc.Snapshot,
+        peak: int,
+        stacks: Counter,
+    ) -> None:
+        base = os.path.join(self.output_dir, re.sub(r"[^\w.-]", "_", name))
+        paths = {
+            "pstats": f"{base}.pstats",
+            "pstats_text": f"{base}.pstats.txt",
+            "allocations": f"{base}.allocations.txt",
+            "collapsed": f"{base}.collapsed",
+        }
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            profiler.dump_stats(paths["pstats"])
+            with open(paths["pstats_text"], "w", encoding="utf-8") as file:
+                stats = pstats.Stats(profiler, stream=file)
+                stats.sort_stats("cumulative").print_stats(40)
+
+            # Leave out the allocations of the profilers themselves
+            snapshot = snapshot.filter_traces(
+                [
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, __file__),
+                ]
+            )
+            with open(paths["allocations"], "w", encoding="utf-8") as file:
+                file.write(f"Peak traced memory: {peak / 1024 ** 2:.1f} MiB\n")
+                file.write("Largest allocation sites still alive at the end:\n")
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                    frame = stat.traceback[0]
+                    file.write(
+                        f"{stat.size / 1024:.1f} KiB in {stat.count} blocks: "
+                        f"{frame.filename}:{frame.lineno}\n"
+                    )
+
+            with open(paths["collapsed"], "w", encoding="utf-8") as file:
+                for stack, count in stacks.most_common():
+                    file.write(f"{stack} {count}\n")
+        except OSError as e:
+            # Profiling never fails the pipeline
+            logging.error(f"❌ Failed to write the profile of {name}: {e}")
+            return
+
+        self.reports[name] = paths
+        logging.info(f"✔ Profile of {name} saved at: {base}.*")
@@ -0,0 +1,94 @@
+import json
+
+import pandas as pd
+import pytest
+from src.ad_hoc.ad_hoc import get_top_journal_by_unique_drugs
+from src.ad_hoc.analytics import (
+    METRICS,
+    build_count_cube,
+    register_metric,
+    run_analytics,
+    save_analytics,
+)
+from src.data_transform.drug_mentions import find_mention_table
+from src.data_transform.relationships import build_relationships
+
+
+@pytest.fixture
+def mention_table():
+    pubmed_df = pd.DataFrame(
+        {
+            "title": ["DrugA and DrugB", "DrugA again", "DrugC alone"],
+            "journal": ["Journal1", "Journal1", "Journal2"],
+            "date": ["2019-01-01", "2020-01-02", "2020-01-03"],
+        }
+    )
+    clinical_trials_df = pd.DataFrame(
+        {
+            "scientific_title": ["DrugC and DrugB"],
+            "journal": ["Journal2"],
+            "date": [""],
+        }
+    )
+    drugs_df = pd.DataFrame({"drug": ["DrugA", "DrugB", "DrugC"]})
+    return find_mention_table(pubmed_df, clinical_trials_df, drugs_df)
+
+
+def test_metrics_from_mention_table(mention_table):
+    results = run_analytics(mention_table, top_k=1)
+
+    assert results["most_mentioned_journal"] == {"journal": "Journal1", "mentions": 3}
+    assert results["top_journals_by_unique_drugs"] == [
+        {"journal": "Journal1", "unique_drugs": 2, "mentions": 3}
+    ]
+    assert results["mentions_per_drug_per_source"] == {
+        "DrugA": {"pubmed": 2},
+        "DrugB": {"pubmed": 1, "clinical_trials": 1},
+        "DrugC": {"pubmed": 1, "clinical_trials": 1},
+    }
+    assert results["drugs_per_journal_per_year"] == {
+        "Journal1": {"2019": 2, "2020": 1},
+        "Journal2": {"2020": 1, "unknown": 2},
+    }
+
+
+def test_relationships_and_mention_table_agree(mention_table, tmp_path):
+    relationships = build_relationships(mention_table)
+    graph_path = tmp_path / "graph.json"
+    graph_path.write_text(json.dumps(relationships), encoding="utf-8")
+
+    results = run_analytics(relationships)
+
+    assert results == run_analytics(mention_table)
+    assert results["most_mentioned_journal"] == get_top_journal_by_unique_drugs(
+        str(graph_path)
+    )
+    pd.testing.assert_frame_equal(
+        build_count_cube(relationships), build_count_cube(mention_table)
+    )
+
+
+def test_registered_metric_uses_the_cube(mention_table, monkeypatch):
+    monkeypatch.setattr("src.ad_hoc.analytics.METRICS", dict(METRICS))
+
+    @register_metric("total_mentions")
+    def total_mentions(cube, **options):
+        return int(cube["mentions"].sum())
+
+    results = run_analytics(mention_table, metrics=["total_mentions"])
+
+    assert results == {"total_mentions": 6}
+
+
+def test_unknown_metric(mention_table):
+    with pytest.raises(ValueError):
+        run_analytics(mention_table, metrics=["unknown"])
+
+
+def test_save_analytics(mention_table, tmp_path):
+    paths = save_analytics(
+        run_analytics(mention_table, metrics=["most_mentioned_journal"]), str(tmp_path)
+    )
+
+    with open(paths["most_mentioned_journal"], "r", encoding="utf-8") as file:
+        assert json.load(file) == {"journal": "Journal1", "mentions": 3}
@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+from src.data_load.artifacts import (
+    read_artifact,
+    read_artifacts,
+    remove_run_artifacts,
+    run_artifact_dir,
+    write_artifact,
+    write_artifacts,
+)
+from src.data_transform.drug_mentions import find_mention_table
+
+
+def test_typed_dataframe_round_trip(tmp_path):
+    df = pd.DataFrame(
+        {
+            "id": pd.array(["9", "NCT1", None], dtype="string[pyarrow]"),
+            "title": ["A", None, "C"],
+            "journal": pd.Categorical(["J1", "J2", "J1"]),
+            "date": pd.to_datetime(["2020-01-01", None, "2019-05-02"]),
+            "mixed": [1, "2", None],
+        }
+    )
+
+    summary = write_artifact(df, str(tmp_path / "run" / "pubmed.arrow"))
+
+    assert summary["rows"] == 3
+    assert summary["columns"] == ["id", "title", "journal", "date", "mixed"]
+    assert os.listdir(tmp_path / "run") == ["pubmed.arrow"]
+    expected = df.assign(mixed=["1", "2", None])
+    pd.testing.assert_frame_equal(read_artifact(summary["path"]), expected)
+
+
+def test_mention_table_round_trip(tmp_path):
+    table = find_mention_table(
+        pd.DataFrame({"title": ["DrugA"], "journal": ["J1"], "date": [""]}),
+        pd.DataFrame({"scientific_title": ["DrugB"], "journal": ["J2"], "date": [""]}),
+        pd.DataFrame({"drug": ["DrugA", "DrugB", "DrugC"]}),
+    )
+
+    summaries = write_artifacts({"mentions": table, "missing": None}, str(tmp_path))
+    result = read_artifacts(summaries)
+
+    assert result["missing"] is None
+    pd.testing.assert_frame_equal(result["mentions"], table)
+
+
+def test_run_artifact_dir():
+    assert run_artifact_dir("/artifacts", "manual__2025-02-21T10:00:00+00:00") == (
+        "/artifacts/manual__2025-02-21T10_00_00_00_00"
+    )
+
+
+def test_remove_run_artifacts(tmp_path):
+    kept = run_artifact_dir(str(tmp_path), "run_1")
+    write_artifact(pd.DataFrame({"a": [1]}), os.path.join(kept, "a.arrow"))
+    run_dir = run_artifact_dir(str(tmp_path), "run:2")
+    write_artifact(pd.DataFrame({"a": [1]}), os.path.join(run_dir, "a.arrow"))
+
+    remove_run_artifacts(str(tmp_path), "run:2")
+    remove_run_artifacts(str(tmp_path), "run:2")
+
+    assert os.listdir(tmp_path) == ["run_1"]
@@ -0,0 +1,74 @@
+import json
+
+import pandas as pd
+import pytest
+from src.benchmark.generate import drug_names, generate_dataset
+from src.benchmark.harness import BENCHMARK_STAGES, compare_results, main
+
+
+def test_generate_dataset_is_deterministic(tmp_path):
+    first = generate_dataset(str(tmp_path / "a"), 500, 20, chunk_size=128)
+    second = generate_dataset(str(tmp_path / "b"), 500, 20, chunk_size=128)
+
+    for name, path in first.items():
+        with open(path, "rb") as a, open(second[name], "rb") as b:
+            assert a.read() == b.read()
+
+    pubmed = pd.read_csv(first["PubMed"])
+    clinical_trials = pd.read_csv(first["ClinicalTrials"])
+    drugs = pd.read_csv(first["Drugs"])
+    assert len(pubmed) + len(clinical_trials) == 500
+    assert len(clinical_trials) == 100
+    assert pubmed["id"].is_unique
+    assert drugs["drug"].tolist() == drug_names(20)
+
+    pattern = "|".join(drugs["drug"])
+    mentioned = pubmed["title"].str.contains(pattern, case=False)
+    assert 0.2 < mentioned.mean() < 0.4
+
+
+def test_drug_names_are_distinct():
+    names = drug_names(20_000)
+
+    assert len(set(names)) == 20_000
+    assert all(name.isalpha() and name.isupper() for name in names)
+
+
+def test_invalid_scale(tmp_path):
+    with pytest.raises(ValueError):
+        generate_dataset(str(tmp_path), n_publications=10, n_drugs=0)
+
+
+def test_benchmark_writes_every_stage(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    args = ["--publications", "300", "--drugs", "15", "--no-trace-memory"]
+    main(args + ["--output", str(baseline_path)])
+
+    run_args = [
+        "--output",
+        str(tmp_path / "run.json"),
+        "--baseline",
+        str(baseline_path),
+    ]
+    results = main(args + run_args)
+
+    saved = json.loads((tmp_path / "run.json").read_text(encoding="utf-8"))
+    assert [stage["stage"] for stage in saved["stages"]] == BENCHMARK_STAGES
+    assert saved["rows"] == {"PubMed": 240, "ClinicalTrials": 60, "Drugs": 15}
+    assert saved["mentions"] > 0
+    assert saved["scale"]["publications"] == 300
+    assert set(results["comparison"]) == set(BENCHMARK_STAGES)
+
+
+def test_compare_results():
+    baseline = {"stages": [{"stage": "clean_data", "seconds": 2.0}]}
+    current = {
+        "stages": [
+            {"stage": "clean_data", "seconds": 1.0},
+            {"stage": "ad_hoc", "seconds": 0.5},
+        ]
+    }
+
+    assert compare_results(baseline, current) == {
+        "clean_data": {"baseline_seconds": 2.0, "current_seconds": 1.0, "ratio": 0.5}
+    }
@@ -1,7 +1,7 @@
 import pytest
 import pandas as pd
 from unittest.mock import patch
-from src.data_transform.data_processing import load_csv_files
+from src.data_transform.data_processing import load_csv_files, load_drug_synonyms
 
 
 @pytest.fixture
@@ -61,3 +61,17 @@ def test_load_csv_files_file_not_found(mock_load_csv):
     # Check that ClinicalTrials and Drugs are valid DataFrames
     assert isinstance(result["ClinicalTrials"], pd.DataFrame)
     assert isinstance(result["Drugs"], pd.DataFrame)
+
+
+def test_load_drug_synonyms(tmp_path):
+    path = tmp_path / "drug_synonyms.csv"
+    path.write_text("atccode,synonym\nA04AD,Benadryl\n", encoding="utf-8")
+
+    synonyms_df = load_drug_synonyms(str(path))
+
+    assert synonyms_df.to_dict("list") == {
+        "atccode": ["A04AD"],
+        "synonym": ["Benadryl"],
+    }
+    assert load_drug_synonyms(str(tmp_path / "missing.csv")) is None
+    assert load_drug_synonyms(None) is None
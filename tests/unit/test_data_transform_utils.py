@@ -1,6 +1,10 @@
+import random
+
+import numpy as np
 import pytest
 import pandas as pd
 from src.data_transform.utils.utils import (
+    normalize_titles,
     standardize_date_format,
     convert_id_to_string,
     sanitize_title_text,
@@ -44,6 +48,37 @@ def test_sanitize_title_text():
     assert result_df["title_column"][2] == "Title 3"
 
 
+def sanitize_title_reference(titles):
+    # The former column-by-column implementation
+    titles = titles.str.encode("ascii", "ignore").str.decode("utf-8")
+    titles = titles.str.replace(r"[^\w\s-]", "", regex=True)
+    return titles.str.title().str.strip().str.replace(r"\s+", " ", regex=True)
+
+
+def test_sanitize_title_text_edge_cases():
+    titles = ["  hé, llo\x1cwORLD 1st!! ", None, "", "a_b-c\tD", 5, np.nan]
+    df = pd.DataFrame({"title": titles})
+    result = sanitize_title_text(df, "title")["title"]
+
+    assert result.dtype == object
+    assert result[:4].tolist() == ["H Llo World 1St", None, "", "A_B-C D"]
+    assert result[4:].isna().all()
+
+
+@pytest.mark.parametrize("dtype", [object, "string"])
+def test_normalize_titles_matches_reference(dtype):
+    rng = random.Random(0)
+    alphabet = [chr(code) for code in range(128)] + list("éßÅ\x85\u2003ǅﬁ")
+    titles = [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        for _ in range(2_000)
+    ]
+    titles = pd.Series(titles + [None], dtype=dtype)
+
+    expected = sanitize_title_reference(titles)
+    pd.testing.assert_series_equal(normalize_titles(titles), expected)
+
+
 # Test for remove_rows_with_empty_titles_or_journals
 def test_remove_rows_with_empty_titles_or_journals():
     data = {
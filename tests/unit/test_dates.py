@@ -0,0 +1,69 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from src.data_extract.dates import normalize_dates, parse_date, parse_dates
+from src.data_transform.utils.utils import standardize_date_format
+
+
+def test_parse_date_format_chain():
+    assert parse_date("01/02/2019") == "2019-01-02"
+    assert parse_date("25/05/2020") == "2020-05-25"
+    assert parse_date(" 1 January 2020 ") == "2020-01-01"
+    assert parse_date("2020-01-01") == "2020-01-01"
+    assert parse_date("not a date") is None
+
+
+def test_parse_date_infers_other_formats():
+    assert parse_date("2020") == "2020-01-01"
+    assert parse_date("Jan 2020") == "2020-01-01"
+    assert parse_date("January 2020") == "2020-01-01"
+    assert parse_date("2020-01") == "2020-01-01"
+    assert parse_date("1-Jan-2020") == "2020-01-01"
+    assert parse_date("Jan 5 2020") == "2020-01-05"
+    assert parse_date("05.01.2020") == "2020-05-01"
+    assert parse_date("20200105") == "2020-01-05"
+    assert parse_date("31/31/2020") is None
+
+
+def test_normalize_dates_maps_distinct_values_back():
+    values = pd.Series(
+        ["01/01/2019", "1 January 2020", None, "", "soon", "01/01/2019"],
+        index=[5, 4, 3, 2, 1, 0],
+    )
+    dates, unparseable = normalize_dates(values)
+
+    assert dates.index.tolist() == [5, 4, 3, 2, 1, 0]
+    assert dates.tolist()[:2] == ["2019-01-01", "2020-01-01"]
+    assert dates.tolist()[-1] == "2019-01-01"
+    assert dates.iloc[2:5].isna().all()
+    assert unparseable == ["soon"]
+
+
+def test_normalize_dates_of_datetimes():
+    values = pd.Series(pd.to_datetime(["2021-12-01", None]))
+    dates, unparseable = normalize_dates(values)
+
+    assert dates[0] == "2021-12-01"
+    assert pd.isna(dates[1])
+    assert unparseable == []
+
+
+def test_parse_dates_returns_datetimes():
+    values = pd.Series(["25/05/2020", "bad", np.nan], dtype="string[pyarrow]")
+    dates, unparseable = parse_dates(values)
+
+    assert dates.dtype == "datetime64[ns]"
+    assert dates[0] == pd.Timestamp("2020-05-25")
+    assert dates[1:].isna().all()
+    assert unparseable == ["bad"]
+
+
+def test_standardize_date_format_reports_unparseable(caplog):
+    df = pd.DataFrame({"date": ["2020-01-01", "31/31/2020"]})
+    with caplog.at_level(logging.WARNING):
+        result = standardize_date_format(df, "date")
+
+    assert result["date"][0] == "2020-01-01"
+    assert pd.isna(result["date"][1])
+    assert "'31/31/2020'" in caplog.text
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_transform.dedup import iter_deduplicated_chunks
+
+
+def make_chunks(seed, n_chunks=6, rows=50, distinct=120):
+    rng = np.random.default_rng(seed)
+    return [
+        pd.DataFrame(
+            {
+                "id": rng.integers(0, distinct, rows).astype(str),
+                "row": np.arange(index * rows, (index + 1) * rows),
+            }
+        )
+        for index in range(n_chunks)
+    ]
+
+
+@pytest.mark.parametrize("partition_rows", [1_000_000, 7])
+def test_first_occurrence_matches_drop_duplicates(tmp_path, partition_rows):
+    chunks = make_chunks(seed=partition_rows)
+    expected = pd.concat(chunks).drop_duplicates(subset=["id"])
+
+    result = list(
+        iter_deduplicated_chunks(
+            chunks, spill_dir=str(tmp_path), partitions=4, partition_rows=partition_rows
+        )
+    )
+
+    assert [len(chunk.index) for chunk in result] == [
+        int(expected["row"].between(index * 50, index * 50 + 49).sum())
+        for index in range(6)
+    ]
+    assert pd.concat(result)["row"].tolist() == expected["row"].tolist()
+    assert all(chunk.index.equals(pd.RangeIndex(len(chunk))) for chunk in result)
+    # Spill files are removed once the stream is consumed
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_ids_compared_by_string_form(tmp_path):
+    chunks = [
+        pd.DataFrame({"id": [9, 10], "title": ["a", "b"]}),
+        pd.DataFrame({"id": ["9", "11", "11"], "title": ["c", "d", "e"]}),
+        pd.DataFrame({"id": pd.Series([], dtype=object), "title": []}),
+    ]
+
+    result = list(iter_deduplicated_chunks(chunks, spill_dir=str(tmp_path)))
+
+    assert [chunk["title"].tolist() for chunk in result] == [["a", "b"], ["d"], []]
+
+
+def test_missing_id_column(tmp_path):
+    chunks = [pd.DataFrame({"title": ["a"]})]
+
+    with pytest.raises(ValueError):
+        list(iter_deduplicated_chunks(chunks, spill_dir=str(tmp_path)))
@@ -1,6 +1,11 @@
 import pytest
 import pandas as pd
-from src.data_transform.drug_mentions import find_mentions
+from src.data_transform.drug_mentions import (
+    MENTION_COLUMNS,
+    find_mention_table,
+    find_mentions,
+    mention_table_to_records,
+)
 
 
 @pytest.fixture
@@ -100,3 +105,123 @@ def test_find_mentions_empty_titles(mock_data):
 
     # Assert no mentions should be found
     assert len(mentions) == 3
+
+
+def test_find_mentions_engines_agree(mock_data):
+    """Test that the automaton engine returns exactly what the regex engine returns."""
+    pubmed_df, clinical_trials_df, drugs_df = mock_data
+
+    automaton = find_mentions(
+        pubmed_df, clinical_trials_df, drugs_df, engine="automaton"
+    )
+    regex = find_mentions(pubmed_df, clinical_trials_df, drugs_df, engine="regex")
+
+    assert automaton == regex
+
+
+def test_find_mentions_unknown_engine(mock_data):
+    """Test that an unknown engine name is rejected."""
+    pubmed_df, clinical_trials_df, drugs_df = mock_data
+
+    with pytest.raises(ValueError, match="Unknown matcher engine"):
+        find_mentions(pubmed_df, clinical_trials_df, drugs_df, engine="spark")
+
+
+def test_find_mention_table_columns_and_keys(mock_data):
+    """Test that the mention table carries integer keys and the publication columns."""
+    pubmed_df, clinical_trials_df, drugs_df = mock_data
+
+    table = find_mention_table(pubmed_df, clinical_trials_df, drugs_df)
+
+    assert list(table.columns) == MENTION_COLUMNS
+    assert table["drug_id"].dtype == "int64"
+    assert table["publication_id"].dtype == "int64"
+    assert table["drug_id"].tolist() == [0, 1, 2, 0, 1, 2]
+    assert table["publication_id"].tolist() == [0, 1, 2, 0, 1, 2]
+    assert mention_table_to_records(table) == find_mentions(
+        pubmed_df, clinical_trials_df, drugs_df
+    )
+
+
+@pytest.mark.parametrize("engine", ["automaton", "regex"])
+def test_find_mention_table_parallel_matches_serial(mock_data, engine):
+    """Test that a process-pool run returns exactly the serial table."""
+    pubmed_df, clinical_trials_df, drugs_df = mock_data
+
+    serial = find_mention_table(pubmed_df, clinical_trials_df, drugs_df, engine=engine)
+    parallel = find_mention_table(
+        pubmed_df, clinical_trials_df, drugs_df, engine=engine, workers=2, chunk_size=2
+    )
+
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+@pytest.mark.parametrize("engine", ["automaton", "regex"])
+def test_find_mention_table_match_stats(mock_data, engine):
+    """Test that the cost of matching is reported when stats are requested."""
+    pubmed_df, clinical_trials_df, drugs_df = mock_data
+    stats = {}
+
+    find_mention_table(
+        pubmed_df, clinical_trials_df, drugs_df, engine=engine, stats=stats
+    )
+
+    assert stats["engine"] == engine
+    assert (stats["drugs"], stats["titles"], stats["mentions"]) == (3, 6, 6)
+    assert stats["seconds_per_drug"] == pytest.approx(
+        stats["match_seconds"] / 3, rel=0.05
+    )
+    assert [entry["mentions"] for entry in stats["most_mentioned_drugs"]] == [2, 2, 2]
+    slowest = [entry["drug"] for entry in stats["slowest_patterns"]]
+    assert sorted(slowest) == (
+        [] if engine == "automaton" else ["DrugA", "DrugB", "DrugC"]
+    )
+
+
+@pytest.mark.parametrize("engine", ["automaton", "regex"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_find_mention_table_synonyms(engine, workers):
+    """Test that synonyms are attributed to their canonical drug."""
+    pubmed_df = pd.DataFrame(
+        {
+            "title": [
+                "Benadryl for allergy",
+                "Diphenhydramine Hydrochloride and benadryl",
+                "Adrenaline in anaphylaxis",
+                "Benadrylic acid",
+            ],
+            "journal": ["J1", "J2", "J3", "J4"],
+            "date": ["2020-01-01"] * 4,
+        }
+    )
+    clinical_trials_df = pd.DataFrame(
+        {"scientific_title": ["Achromycin trial"], "journal": ["J5"], "date": [""]}
+    )
+    drugs_df = pd.DataFrame(
+        {
+            "atccode": ["A04AD", "A01AD", "S03AA"],
+            "drug": ["DIPHENHYDRAMINE", "EPINEPHRINE", "TETRACYCLINE"],
+        }
+    )
+    synonyms_df = pd.DataFrame(
+        {
+            "atccode": ["A04AD", "A04AD", "A01AD", "UNKNOWN"],
+            "synonym": ["Benadryl", "Diphenhydramine Hydrochloride", "Adrenaline", "X"],
+        }
+    )
+
+    table = find_mention_table(
+        pubmed_df,
+        clinical_trials_df,
+        drugs_df,
+        engine=engine,
+        workers=workers,
+        synonyms_df=synonyms_df,
+    )
+
+    assert table["drug"].tolist() == [
+        "DIPHENHYDRAMINE",
+        "DIPHENHYDRAMINE",
+        "EPINEPHRINE",
+    ]
+    assert table["publication_id"].tolist() == [0, 1, 2]
@@ -2,7 +2,7 @@ import pandas as pd
 from unittest.mock import patch
 import json
 
-from src.data_extract.extract import load_csv, load_json
+from src.data_extract.extract import SOURCE_SCHEMAS, load_csv, load_json
 
 
 @patch("pandas.read_csv")
@@ -51,3 +51,64 @@ def test_load_json_decode_error(mock_read_json):
 
     # Assert: check if None is returned
     assert result is None
+
+
+def _write_pubmed_csv(path):
+    path.write_text(
+        "id,title,date,journal\n"
+        '1,"Drug A study",01/01/2019,"Journal 1"\n'
+        "\t\n"
+        '2,"Drug B study",,"Journal 1"\n',
+        encoding="utf-8",
+    )
+
+
+def test_load_csv_with_schema(tmp_path):
+    csv_path = tmp_path / "pubmed.csv"
+    _write_pubmed_csv(csv_path)
+
+    df = load_csv(str(csv_path), schema=SOURCE_SCHEMAS["pubmed"])
+
+    assert len(df) == 2
+    assert df["journal"].dtype == "category"
+    assert df["title"].dtype == "string[pyarrow]"
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    assert df["date"].iloc[0] == pd.Timestamp("2019-01-01")
+    assert pd.isna(df["date"].iloc[1])
+
+
+def test_load_parquet_by_extension(tmp_path):
+    csv_path, parquet_path = tmp_path / "pubmed.csv", tmp_path / "pubmed.parquet"
+    _write_pubmed_csv(csv_path)
+    pd.read_csv(csv_path).to_parquet(parquet_path, index=False)
+
+    df = load_csv(str(parquet_path), schema=SOURCE_SCHEMAS["pubmed"])
+    chunks = list(
+        load_csv(str(parquet_path), chunksize=1, schema=SOURCE_SCHEMAS["pubmed"])
+    )
+
+    pd.testing.assert_frame_equal(
+        df, load_csv(str(csv_path), schema=SOURCE_SCHEMAS["pubmed"])
+    )
+    assert [len(chunk) for chunk in chunks] == [1, 1]
+    assert chunks[1]["journal"].dtype == "category"
+    assert load_csv(str(tmp_path / "missing.parquet"), chunksize=1) is None
+
+
+def test_load_json_with_trailing_commas(tmp_path):
+    json_path = tmp_path / "pubmed.json"
+    json_path.write_text(
+        '[\n  {"id": 9, "title": "Drug A", "date": "01/01/2020", "journal": "J1"},\n'
+        '  {"id": "10", "title": "Drug B", "date": "", "journal": "J2"},\n]',
+        encoding="utf-8",
+    )
+
+    df = load_json(str(json_path), schema=SOURCE_SCHEMAS["pubmed"])
+    chunks = list(
+        load_json(str(json_path), chunksize=1, schema=SOURCE_SCHEMAS["pubmed"])
+    )
+
+    assert df["id"].tolist() == ["9", "10"]
+    assert df["date"].iloc[0] == pd.Timestamp("2020-01-01")
+    assert [len(chunk) for chunk in chunks] == [1, 1]
+    assert load_json(str(tmp_path / "missing.json"), chunksize=1) is None
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from src.ad_hoc.ad_hoc import (
+    get_top_journal_by_unique_drugs,
+    get_top_journal_from_index,
+)
+from src.data_load.graph_index import GraphIndex, build_graph_index
+from src.data_load.load import save_to_json
+
+RELATIONSHIPS = {
+    "DrugA": {
+        "publications": [
+            {"title": "DrugA study", "journal": "Journal1", "date": "2020-01-01"},
+            {"title": "DrugA again", "journal": "Journal1", "date": "2020-01-02"},
+        ]
+    },
+    "DrugB": {
+        "publications": [
+            {"title": "DrugB étude", "journal": "Journal2", "date": "2020-01-03"},
+            {"title": "DrugA and DrugB", "journal": "Journal1", "date": ""},
+        ]
+    },
+    "DrugC": {
+        "publications": [
+            {"title": "DrugC trial", "journal": "Journal2", "date": "2020-02-01"}
+        ]
+    },
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    json_path = str(tmp_path / "graph.json")
+    spans = save_to_json(RELATIONSHIPS, json_path)
+    build_graph_index(RELATIONSHIPS, str(tmp_path / "index"), json_path, spans)
+    return GraphIndex(str(tmp_path / "index")), json_path
+
+
+def test_top_journal_matches_json_scan(index, tmp_path):
+    graph_index, json_path = index
+
+    assert graph_index.top_journals_by_unique_drugs(k=2) == [
+        {"journal": "Journal1", "unique_drugs": 2, "mentions": 3},
+        {"journal": "Journal2", "unique_drugs": 2, "mentions": 2},
+    ]
+    assert get_top_journal_from_index(
+        str(tmp_path / "index")
+    ) == get_top_journal_by_unique_drugs(json_path)
+
+
+def test_journal_drugs(index):
+    graph_index, _ = index
+
+    assert graph_index.journal_drugs("Journal2") == ["DrugB", "DrugC"]
+    assert graph_index.journal_drugs("Unknown") == []
+
+
+def test_drug_publications_reads_one_entry(index):
+    graph_index, json_path = index
+
+    assert graph_index.drug_publications("DrugB") == (
+        RELATIONSHIPS["DrugB"]["publications"]
+    )
+    with open(json_path, "r", encoding="utf-8") as file:
+        assert json.load(file) == RELATIONSHIPS
+    with pytest.raises(KeyError):
+        graph_index.drug_publications("DrugZ")
+
+
+def test_spans_must_match_drugs(tmp_path):
+    with pytest.raises(ValueError):
+        build_graph_index(RELATIONSHIPS, str(tmp_path), spans=[(0, 1)])
+
+
+def test_missing_index_returns_none(tmp_path):
+    assert get_top_journal_from_index(str(tmp_path / "missing")) is None
@@ -0,0 +1,303 @@
+import os
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from src.data_transform import incremental
+from src.data_transform.data_cleaning import clean_data
+from src.data_transform.drug_mentions import find_mention_table
+from src.data_transform.incremental import update_mention_table
+
+
+def write_inputs(tmp_path, drugs, pubmed, clinical_trials):
+    paths = {}
+    for name, rows in [
+        ("drugs", drugs),
+        ("pubmed", pubmed),
+        ("clinical_trials", clinical_trials),
+    ]:
+        paths[name] = str(tmp_path / f"{name}.csv")
+        pd.DataFrame(rows).to_csv(paths[name], index=False)
+    return paths
+
+
+def batch_table(paths):
+    cleaned = clean_data(
+        {
+            "Drugs": pd.read_csv(paths["drugs"]),
+            "PubMed": pd.read_csv(paths["pubmed"]),
+            "ClinicalTrials": pd.read_csv(paths["clinical_trials"]),
+        }
+    )
+    return find_mention_table(
+        cleaned["PubMed"], cleaned["ClinicalTrials"], cleaned["Drugs"]
+    )
+
+
+def run(tmp_path, paths):
+    return update_mention_table(
+        files={
+            "pubmed": paths["pubmed"],
+            "clinical_trials": paths["clinical_trials"],
+        },
+        drugs_file=paths["drugs"],
+        state_dir=str(tmp_path / "state"),
+    )
+
+
+@pytest.fixture
+def inputs():
+    drugs = {"atccode": ["A1", "B2"], "drug": ["ASPIRIN", "ETHANOL"]}
+    pubmed = {
+        "id": [1, 2, 3, 3],
+        "title": ["Aspirin study", "Ethanol study", "Aspirin and ethanol", "Dup"],
+        "date": ["01/01/2019"] * 4,
+        "journal": ["J1", "J2", "J1", "J3"],
+    }
+    clinical_trials = {
+        "id": ["NCT1"],
+        "scientific_title": ["Ethanol trial"],
+        "date": ["1 January 2020"],
+        "journal": ["J4"],
+    }
+    return drugs, pubmed, clinical_trials
+
+
+def test_first_run_matches_batch(tmp_path, inputs):
+    paths = write_inputs(tmp_path, *inputs)
+
+    pd.testing.assert_frame_equal(run(tmp_path, paths), batch_table(paths))
+
+
+def test_delta_run_only_matches_changed_publications(tmp_path, inputs):
+    drugs, pubmed, clinical_trials = inputs
+    paths = write_inputs(tmp_path, drugs, pubmed, clinical_trials)
+    run(tmp_path, paths)
+
+    # Delete id 1, change id 3, add id 4; clinical trials untouched
+    pubmed = {
+        "id": [4, 2, 3],
+        "title": ["New aspirin paper", "Ethanol study", "Only aspirin now"],
+        "date": ["01/01/2019"] * 3,
+        "journal": ["J5", "J2", "J1"],
+    }
+    paths = write_inputs(tmp_path, drugs, pubmed, clinical_trials)
+
+    with patch.object(
+        incremental,
+        "find_source_mention_table",
+        wraps=incremental.find_source_mention_table,
+    ) as matched:
+        table = run(tmp_path, paths)
+
+    assert matched.call_count == 1
+    assert matched.call_args.args[0]["title"].tolist() == [
+        "New Aspirin Paper",
+        "Only Aspirin Now",
+    ]
+    pd.testing.assert_frame_equal(table, batch_table(paths))
+
+
+def test_unchanged_inputs_match_nothing(tmp_path, inputs):
+    paths = write_inputs(tmp_path, *inputs)
+    first = run(tmp_path, paths)
+
+    with patch.object(incremental, "find_source_mention_table") as matched:
+        second = run(tmp_path, paths)
+
+    matched.assert_not_called()
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_drugs_change_matches_everything_again(tmp_path, inputs):
+    drugs, pubmed, clinical_trials = inputs
+    paths = write_inputs(tmp_path, drugs, pubmed, clinical_trials)
+    run(tmp_path, paths)
+
+    drugs = {"atccode": ["B2", "C3"], "drug": ["ETHANOL", "STUDY"]}
+    paths = write_inputs(tmp_path, drugs, pubmed, clinical_trials)
+
+    pd.testing.assert_frame_equal(run(tmp_path, paths), batch_table(paths))
+
+
+def append_rows(path, rows):
+    pd.DataFrame(rows).to_csv(path, mode="a", header=False, index=False)
+
+
+def test_appended_rows_are_read_alone(tmp_path, inputs):
+    drugs, pubmed, clinical_trials = inputs
+    paths = write_inputs(tmp_path, drugs, pubmed, clinical_trials)
+    run(tmp_path, paths)
+
+    # Id 2 is already known: its first occurrence wins
+    append_rows(
+        paths["pubmed"],
+        {
+            "id": [5, 2, 6],
+            "title": ["Ethanol again", "Aspirin now", "Nothing"],
+            "date": ["01/01/2019"] * 3,
+            "journal": ["J6", "J7", "J8"],
+        },
+    )
+
+    with patch.object(
+        incremental, "load_file", wraps=incremental.load_file
+    ) as loaded, patch.object(
+        incremental,
+        "find_source_mention_table",
+        wraps=incremental.find_source_mention_table,
+    ) as matched:
+        table = run(tmp_path, paths)
+
+    loaded.assert_not_called()
+    assert matched.call_args.args[0]["title"].tolist() == [
+        "Ethanol Again",
+        "Nothing",
+    ]
+    pd.testing.assert_frame_equal(table, batch_table(paths))
+
+    # The next append is read from the new end
+    append_rows(
+        paths["pubmed"],
+        {"id": [7], "title": ["Aspirin"], "date": ["01/01/2019"], "journal": ["J9"]},
+    )
+    with patch.object(
+        incremental,
+        "find_source_mention_table",
+        wraps=incremental.find_source_mention_table,
+    ) as matched:
+        table = run(tmp_path, paths)
+
+    assert matched.call_args.args[0]["title"].tolist() == ["Aspirin"]
+    pd.testing.assert_frame_equal(table, batch_table(paths))
+
+
+def test_appends_across_files_keep_batch_order(tmp_path, inputs):
+    drugs, pubmed, clinical_trials = inputs
+    paths = write_inputs(tmp_path, drugs, pubmed, clinical_trials)
+    later = str(tmp_path / "pubmed_later.csv")
+    rows = {"id": [8], "title": ["Ethanol"], "date": ["01/01/2019"], "journal": ["J"]}
+    pd.DataFrame(rows).to_csv(later, index=False)
+
+    def run_both():
+        return update_mention_table(
+            files={
+                "pubmed": [paths["pubmed"], later],
+                "clinical_trials": paths["clinical_trials"],
+            },
+            drugs_file=paths["drugs"],
+            state_dir=str(tmp_path / "state"),
+        )
+
+    def batch_both():
+        both = pd.concat([pd.read_csv(paths["pubmed"]), pd.read_csv(later)])
+        both.to_csv(tmp_path / "both.csv", index=False)
+        return batch_table({**paths, "pubmed": str(tmp_path / "both.csv")})
+
+    run_both()
+    # Rows appended to the first file come before the second file
+    append_rows(paths["pubmed"], {**rows, "id": [9], "title": ["Aspirin"]})
+    pd.testing.assert_frame_equal(run_both(), batch_both())
+
+    # Id 8 of the second file appended to the first one now wins: read in full
+    append_rows(paths["pubmed"], {**rows, "title": ["Aspirin instead"]})
+    with patch.object(incremental, "load_file", wraps=incremental.load_file) as loaded:
+        table = run_both()
+
+    assert loaded.call_count == 2
+    pd.testing.assert_frame_equal(table, batch_both())
+
+
+def test_directories_and_globs_are_resolved(tmp_path, inputs):
+    paths = write_inputs(tmp_path, *inputs)
+    folder = tmp_path / "pubmed"
+    folder.mkdir()
+    pubmed = pd.read_csv(paths["pubmed"])
+    pubmed[:2].to_csv(folder / "2020-01.csv", index=False)
+    pubmed[2:].to_csv(folder / "2020-02.csv", index=False)
+    trials = tmp_path / "clinical_trials"
+    trials.mkdir()
+    pd.read_csv(paths["clinical_trials"]).to_csv(trials / "ct.csv", index=False)
+
+    table = update_mention_table(
+        files={
+            "pubmed": str(folder / "*.csv"),
+            "clinical_trials": str(trials),
+        },
+        drugs_file=paths["drugs"],
+        state_dir=str(tmp_path / "state"),
+    )
+
+    pd.testing.assert_frame_equal(table, batch_table(paths))
+
+
+def test_new_files_are_read_alone(tmp_path, inputs):
+    drugs, pubmed, clinical_trials = inputs
+    paths = write_inputs(tmp_path, drugs, pubmed, clinical_trials)
+    folder = tmp_path / "pubmed"
+    folder.mkdir()
+    pd.read_csv(paths["pubmed"]).to_csv(folder / "2020-02.csv", index=False)
+
+    def run_folder():
+        return update_mention_table(
+            files={"pubmed": str(folder), "clinical_trials": paths["clinical_trials"]},
+            drugs_file=paths["drugs"],
+            state_dir=str(tmp_path / "state"),
+        )
+
+    def batch_folder():
+        daily = sorted(folder.iterdir())
+        pd.concat(map(pd.read_csv, daily)).to_csv(paths["pubmed"], index=False)
+        return batch_table(paths)
+
+    run_folder()
+    # One file after the known one, one before it; id 2 is already known
+    rows = {"date": ["01/01/2019"] * 2, "journal": ["J", "J"]}
+    pd.DataFrame({"id": [7, 2], "title": ["Aspirin", "Dup"], **rows}).to_csv(
+        folder / "2020-03.csv", index=False
+    )
+    pd.DataFrame({"id": [8, 9], "title": ["Ethanol", "Nothing"], **rows}).to_csv(
+        folder / "2020-01.csv", index=False
+    )
+
+    with patch.object(
+        incremental, "load_file", wraps=incremental.load_file
+    ) as loaded, patch.object(
+        incremental,
+        "find_source_mention_table",
+        wraps=incremental.find_source_mention_table,
+    ) as matched:
+        table = run_folder()
+
+    assert [call.args[0] for call in loaded.call_args_list] == [
+        str(folder / "2020-01.csv"),
+        str(folder / "2020-03.csv"),
+    ]
+    assert matched.call_args.args[0]["title"].tolist() == [
+        "Ethanol",
+        "Nothing",
+        "Aspirin",
+    ]
+    pd.testing.assert_frame_equal(table, batch_folder())
+
+
+def test_files_of_same_size_and_time_are_not_hashed(tmp_path, inputs):
+    paths = write_inputs(tmp_path, *inputs)
+    first = run(tmp_path, paths)
+
+    with patch.object(
+        incremental, "_open_binary", wraps=incremental._open_binary
+    ) as opened:
+        run(tmp_path, paths)
+    opened.assert_not_called()
+
+    # A touched file is hashed again, but its content is not matched again
+    os.utime(paths["pubmed"], ns=(0, 10**9))
+    with patch.object(
+        incremental, "_open_binary", wraps=incremental._open_binary
+    ) as opened, patch.object(incremental, "find_source_mention_table") as matched:
+        second = run(tmp_path, paths)
+
+    opened.assert_called_once_with(paths["pubmed"])
+    matched.assert_not_called()
+    pd.testing.assert_frame_equal(second, first)
@@ -0,0 +1,87 @@
+import pandas as pd
+from src.data_extract.extract import SOURCE_SCHEMAS
+from src.data_extract.ingest import concat_frames, load_sources, resolve_input_files
+
+
+def _write_daily_files(directory, days):
+    directory.mkdir()
+    for day in range(days):
+        (directory / f"2020-01-{day + 1:02d}.csv").write_text(
+            "id,title,date,journal\n"
+            f'{day},"Drug study {day}",01/0{day % 9 + 1}/2020,"Journal {day % 2}"',
+            encoding="utf-8",
+        )
+
+
+def test_resolve_directory_and_glob(tmp_path):
+    _write_daily_files(tmp_path / "pubmed", 3)
+    (tmp_path / "pubmed" / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    files = resolve_input_files(str(tmp_path / "pubmed"))
+
+    assert [path.rsplit("/", 1)[-1] for path in files] == [
+        "2020-01-01.csv",
+        "2020-01-02.csv",
+        "2020-01-03.csv",
+    ]
+    assert resolve_input_files(str(tmp_path / "pubmed" / "*-0[12].csv")) == files[:2]
+
+
+def test_load_sources_from_directories(tmp_path):
+    _write_daily_files(tmp_path / "pubmed", 12)
+    (tmp_path / "drugs.csv").write_text("atccode,drug\nA1,DRUG\n", encoding="utf-8")
+    (tmp_path / "pubmed" / "broken.csv").write_text(
+        'id,title,date,journal\n1,"unterminated,01/01/2020\n', encoding="utf-8"
+    )
+    (tmp_path / "pubmed" / "empty.csv").write_text("", encoding="utf-8")
+
+    result = load_sources(
+        {
+            "PubMed": (str(tmp_path / "pubmed"), SOURCE_SCHEMAS["pubmed"]),
+            "Drugs": (str(tmp_path / "drugs.csv"), SOURCE_SCHEMAS["drugs"]),
+            "Missing": (str(tmp_path / "missing" / "*.csv"), None),
+        },
+        workers=2,
+        batch_files=5,
+    )
+
+    pubmed = result["PubMed"]
+    assert pubmed["id"].tolist() == [str(day) for day in range(12)]
+    assert pubmed["journal"].dtype == "category"
+    assert pubmed["date"].iloc[1] == pd.Timestamp("2020-01-02")
+    assert result["Drugs"]["drug"].tolist() == ["DRUG"]
+    assert result["Missing"] is None
+
+
+def test_unterminated_quote_does_not_swallow_next_files(tmp_path):
+    pubmed_dir = tmp_path / "pubmed"
+    pubmed_dir.mkdir()
+    header = "id,title,date,journal\n"
+    (pubmed_dir / "a.csv").write_text(
+        header + '1,"unterminated,01/01/2020,J\n', encoding="utf-8"
+    )
+    for index in range(3):
+        (pubmed_dir / f"b{index}.csv").write_text(
+            header + f'{10 + index},"Title {index}",01/01/2020,"J"\n',
+            encoding="utf-8",
+        )
+
+    result = load_sources({"PubMed": (str(pubmed_dir), SOURCE_SCHEMAS["pubmed"])})
+
+    pubmed = result["PubMed"]
+    assert pubmed["id"].tolist() == ["10", "11", "12"]
+    assert pubmed["title"].tolist() == ["Title 0", "Title 1", "Title 2"]
+
+
+def test_concat_frames_keeps_categories():
+    frames = [
+        pd.DataFrame({"journal": pd.Categorical(["A"]), "id": [1]}),
+        pd.DataFrame({"journal": pd.Categorical(["B"]), "id": [2]}),
+    ]
+
+    df = concat_frames(frames)
+
+    assert df.columns.tolist() == ["journal", "id"]
+    assert df["journal"].dtype == "category"
+    assert df["journal"].tolist() == ["A", "B"]
+    assert concat_frames([]) is None
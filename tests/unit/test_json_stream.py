@@ -0,0 +1,48 @@
+import io
+
+import pytest
+from src.data_extract.json_stream import iter_json_records
+
+RECORDS = [{"id": 1, "title": "A, [b]"}, {"id": "2", "title": "C } d"}]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '[\n  {"id": 1, "title": "A, [b]"},\n  {"id": "2", "title": "C } d"},\n]',
+        "\ufeff" '[{"id": 1, "title": "A, [b]"},,{"id": "2", "title": "C } d"}]',
+        '{"id": 1, "title": "A, [b]"}\n{"id": "2", "title": "C } d"}\n',
+    ],
+)
+@pytest.mark.parametrize("block_size", [1, 7, 1 << 16])
+def test_iter_json_records(text, block_size):
+    assert list(iter_json_records(io.StringIO(text), block_size)) == RECORDS
+
+
+def test_numbers_cut_by_blocks():
+    assert list(iter_json_records(io.StringIO("[12345, 678]"), block_size=3)) == [
+        12345,
+        678,
+    ]
+
+
+@pytest.mark.parametrize("text", ['[{"id": 1}', '[{"id": }]', "[1, 2"])
+def test_invalid_json(text):
+    with pytest.raises(ValueError):
+        list(iter_json_records(io.StringIO(text), block_size=4))
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1 << 16])
+def test_values_cut_anywhere_are_completed(block_size):
+    text = '[{"a": "x\\u00e9\\"y", "b": -1.5e+3, "c": [true, false, null]}, 7]'
+    expected = [{"a": 'xé"y', "b": -1500.0, "c": [True, False, None]}, 7]
+
+    assert list(iter_json_records(io.StringIO(text), block_size)) == expected
+
+
+def test_invalid_value_raises_before_the_end_of_the_file():
+    file = io.StringIO('[{"id": 1}, {"id": 2 "title": "x"},' + '{"id": 3},' * 10_000)
+
+    with pytest.raises(ValueError):
+        list(iter_json_records(file, block_size=64))
+    assert file.tell() < 1_000
@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+from src.data_load.load import save_to_json
+
+
+@pytest.fixture
+def graph():
+    return {
+        "DIPHENHYDRAMINE": {
+            "publications": [
+                {
+                    "source": "pubmed",
+                    "title": 'Line one\nline two "quoted"',
+                    "journal": "Hôpitaux Universitaires de Genève",
+                    "date": "2019-01-01",
+                }
+            ]
+        },
+        "EMPTY": {"publications": []},
+        "NESTED": {"publications": [{"tags": {"a": [1, 2.5, None, True]}}]},
+    }
+
+
+@pytest.mark.parametrize(
+    "data", [{}, [], {"journal": "Psychopharmacology", "mentions": 2}, [1, {"a": 1}]]
+)
+def test_save_to_json_simple_values_match_json_dump(tmp_path, data):
+    path = tmp_path / "out.json"
+
+    save_to_json(data, str(path))
+
+    assert path.read_text(encoding="utf-8") == json.dumps(
+        data, indent=4, ensure_ascii=False
+    )
+
+
+def test_save_to_json_is_byte_identical_to_json_dump(tmp_path, graph):
+    path = tmp_path / "nested" / "graph.json"
+
+    save_to_json(graph, str(path))
+
+    assert path.read_text(encoding="utf-8") == json.dumps(
+        graph, indent=4, ensure_ascii=False
+    )
+
+
+def test_save_to_json_compact(tmp_path, graph):
+    path = tmp_path / "graph.json"
+
+    save_to_json(graph, str(path), compact=True)
+
+    content = path.read_text(encoding="utf-8")
+    assert "\n" not in content.replace("\\n", "")
+    assert content == json.dumps(graph, ensure_ascii=False, separators=(",", ":"))
+
+
+def test_save_to_json_unserializable_keeps_previous_file(tmp_path, graph):
+    path = tmp_path / "graph.json"
+    save_to_json(graph, str(path))
+
+    with pytest.raises(ValueError, match="not serializable"):
+        save_to_json({"A": {"publications": []}, "B": {"x": object()}}, str(path))
+
+    assert json.loads(path.read_text(encoding="utf-8")) == graph
+    assert os.listdir(tmp_path) == ["graph.json"]
@@ -0,0 +1,84 @@
+import random
+import re
+
+import pytest
+from src.data_transform.matcher import DrugMatcher, tokenize
+
+
+def regex_matches(drug_names, text):
+    """Reference implementation: one `\\bDRUG\\b` regex per drug."""
+    return [
+        drug_id
+        for drug_id, drug in enumerate(drug_names)
+        if re.search(rf"\b{re.escape(drug)}\b", text, re.IGNORECASE)
+    ]
+
+
+def test_tokenize_splits_words_and_single_separators():
+    assert tokenize("Anti-TNF  (x)") == ["anti", "-", "tnf", " ", " ", "(", "x", ")"]
+
+
+def test_match_is_case_insensitive_and_word_bounded():
+    matcher = DrugMatcher(["ETHANOL", "EPINEPHRINE"])
+
+    assert matcher.match("Acute ethanol withdrawal") == [0]
+    assert matcher.match("Methanol and ethanolamine") == []
+    assert matcher.match("Epinephrine, then ETHANOL.") == [0, 1]
+
+
+def test_match_multi_word_and_overlapping_names():
+    matcher = DrugMatcher(["TRANEXAMIC ACID", "ACID", "AMIC ACID"])
+
+    assert matcher.match("Tranexamic Acid Versus Epinephrine") == [0, 1]
+    assert matcher.match("Tranexamic  Acid") == [1]
+
+
+def test_match_names_with_non_word_edges():
+    matcher = DrugMatcher(["C++", "-ol"])
+
+    assert matcher.match("using c++ today") == regex_matches(
+        ["C++", "-ol"], "using c++ today"
+    )
+    assert matcher.match("ethan-ol") == [1]
+    assert matcher.match("ethan -ol") == []
+
+
+def test_match_ignores_non_string_titles():
+    matcher = DrugMatcher(["ATROPINE"])
+
+    assert matcher.match(None) == []
+    assert matcher.match(float("nan")) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_match_agrees_with_regex_reference(seed):
+    rng = random.Random(seed)
+    words = ["aspirin", "acid", "b12", "vit", "x_y", "-", " ", ".", "(", "é"]
+    drug_names = list(
+        {
+            "".join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+            for _ in range(30)
+        }
+    )
+    drug_names = [name for name in drug_names if name.strip()]
+    matcher = DrugMatcher(drug_names)
+
+    for _ in range(200):
+        text = "".join(rng.choice(words).upper() for _ in range(rng.randint(0, 12)))
+        assert matcher.match(text) == regex_matches(drug_names, text)
+
+
+def test_match_synonyms_report_their_drug():
+    matcher = DrugMatcher(
+        ["Diphenhydramine", "Epinephrine"],
+        synonyms=[("Benadryl", 0), ("Adrenaline", 1), ("Diphenhydramine HCl", 0)],
+    )
+
+    assert matcher.match("Benadryl versus adrenaline") == [0, 1]
+    assert matcher.match("Diphenhydramine HCl and benadryl") == [0]
+    assert matcher.match("Benadryls") == []
+
+
+def test_synonym_of_unknown_drug():
+    with pytest.raises(ValueError):
+        DrugMatcher(["Aspirin"], synonyms=[("Bayer", 1)])
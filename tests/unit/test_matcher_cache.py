@@ -0,0 +1,131 @@
+import os
+
+import pandas as pd
+from src.data_transform import matcher_cache
+from src.data_transform.drug_mentions import find_mention_table
+from src.data_transform.matcher import DrugMatcher
+from src.data_transform.matcher_cache import (
+    cached_matcher_path,
+    load_matcher,
+    load_or_build_matcher,
+    matcher_cache_key,
+)
+
+DRUGS = ["aspirin", "diphenhydramine", "tetracycline"]
+SYNONYMS = [("benadryl", 1), ("achromycin", 2)]
+TITLE = "Benadryl and aspirin, not tetracyclines"
+
+
+def _cache_files(cache_dir):
+    return sorted(os.listdir(cache_dir))
+
+
+def test_cache_miss_then_hit(tmp_path, monkeypatch):
+    built = load_or_build_matcher(str(tmp_path), DRUGS, SYNONYMS)
+    files = _cache_files(tmp_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("compiled again")
+
+    monkeypatch.setattr(DrugMatcher, "__init__", fail)
+    loaded = load_or_build_matcher(str(tmp_path), DRUGS, SYNONYMS)
+
+    assert len(files) == 1 and files[0].endswith(".pkl")
+    assert _cache_files(tmp_path) == files
+    assert loaded is not built
+    assert loaded.match(TITLE) == built.match(TITLE) == [0, 1]
+    assert vars(loaded).keys() == vars(built).keys()
+
+
+def test_cache_key_follows_dictionary_and_version(monkeypatch):
+    key = matcher_cache_key(DRUGS, SYNONYMS)
+
+    assert matcher_cache_key(list(DRUGS), list(SYNONYMS)) == key
+    assert matcher_cache_key(DRUGS + ["ibuprofen"], SYNONYMS) != key
+    assert matcher_cache_key(DRUGS, SYNONYMS[:1]) != key
+    assert matcher_cache_key(DRUGS, [("benadryl", 0), ("achromycin", 2)]) != key
+    monkeypatch.setattr(matcher_cache, "MATCHER_VERSION", 999)
+    assert matcher_cache_key(DRUGS, SYNONYMS) != key
+
+
+def test_changed_dictionary_builds_another_cache_file(tmp_path):
+    load_or_build_matcher(str(tmp_path), DRUGS, SYNONYMS)
+    changed = load_or_build_matcher(str(tmp_path), DRUGS, SYNONYMS[:1])
+
+    assert len(_cache_files(tmp_path)) == 2
+    assert changed.match("Achromycin and Benadryl") == [1]
+
+
+def test_cache_keeps_most_recently_used_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(matcher_cache, "MATCHER_CACHE_KEEP", 2)
+    paths = []
+    for count in range(1, 4):
+        paths.append(cached_matcher_path(str(tmp_path), DRUGS[:count])[0])
+        os.utime(paths[-1], (count, count))
+
+    assert _cache_files(tmp_path) == sorted(os.path.basename(p) for p in paths[1:])
+
+
+def test_read_only_cache_and_single_key_hash(tmp_path, monkeypatch):
+    load_or_build_matcher(str(tmp_path), DRUGS, SYNONYMS)
+    hashes = []
+    key = matcher_cache.matcher_cache_key
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(os, "utime", read_only)
+    monkeypatch.setattr(
+        matcher_cache, "matcher_cache_key", lambda *args: hashes.append(1) or key(*args)
+    )
+    loaded = load_or_build_matcher(str(tmp_path), DRUGS, SYNONYMS)
+
+    assert loaded.match(TITLE) == [0, 1]
+    assert len(hashes) == 1
+
+
+def test_corrupted_or_foreign_cache_is_rebuilt(tmp_path):
+    path, _ = cached_matcher_path(str(tmp_path), DRUGS, SYNONYMS)
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) // 2)
+
+    assert load_matcher(path) is None
+    rebuilt = load_or_build_matcher(str(tmp_path), DRUGS, SYNONYMS)
+
+    assert rebuilt.match(TITLE) == [0, 1]
+    assert load_matcher(path, matcher_cache_key(DRUGS, SYNONYMS)) is not None
+    assert load_matcher(path, matcher_cache_key(DRUGS, [])) is None
+    assert load_matcher(str(tmp_path / "missing.pkl")) is None
+
+
+def test_find_mention_table_loads_cached_matcher_in_workers(tmp_path):
+    pubmed_df = pd.DataFrame(
+        {
+            "title": [TITLE, "Achromycin", "Nothing here"],
+            "journal": ["J1", "J2", "J3"],
+            "date": ["2020-01-01"] * 3,
+        }
+    )
+    clinical_trials_df = pd.DataFrame(
+        {"scientific_title": ["Aspirin trial"], "journal": ["J4"], "date": [""]}
+    )
+    drugs_df = pd.DataFrame({"atccode": ["A", "B", "C"], "drug": DRUGS})
+    synonyms_df = pd.DataFrame(
+        {"atccode": ["B", "C"], "synonym": ["Benadryl", "Achromycin"]}
+    )
+    expected = find_mention_table(
+        pubmed_df, clinical_trials_df, drugs_df, synonyms_df=synonyms_df
+    )
+
+    for workers in (2, 1):
+        table = find_mention_table(
+            pubmed_df,
+            clinical_trials_df,
+            drugs_df,
+            workers=workers,
+            chunk_size=1,
+            synonyms_df=synonyms_df,
+            cache_dir=str(tmp_path),
+        )
+        pd.testing.assert_frame_equal(table, expected)
+    assert len(_cache_files(tmp_path)) == 1
@@ -0,0 +1,66 @@
+import json
+
+import pandas as pd
+import pytest
+from src.monitoring.metrics import PipelineMetrics, count_rows
+
+
+def test_stage_records_measures():
+    metrics = PipelineMetrics(labels={"mode": "batch"})
+
+    with metrics.stage("clean_data", rows_in=4) as stage:
+        stage["rows_out"] = 3
+
+    (record,) = metrics.stages
+    assert record["stage"] == "clean_data"
+    assert (record["rows_in"], record["rows_out"], record["success"]) == (4, 3, 1)
+    assert record["wall_seconds"] >= 0 and record["cpu_seconds"] >= 0
+    assert record["peak_rss_delta_bytes"] >= 0
+
+
+def test_failed_stage_is_recorded():
+    metrics = PipelineMetrics()
+
+    with pytest.raises(KeyError):
+        with metrics.stage("find_mentions"):
+            raise KeyError("title")
+
+    assert metrics.stages[0]["success"] == 0
+
+
+def test_disabled_metrics_write_nothing(tmp_path):
+    metrics = PipelineMetrics(enabled=False)
+
+    with metrics.stage("load_input_files") as stage:
+        stage["rows_out"] = 10
+
+    assert metrics.stages == []
+    assert metrics.save(str(tmp_path), "pipeline") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_json_and_prometheus(tmp_path):
+    metrics = PipelineMetrics(labels={"mode": 'say "hi"'})
+    with metrics.stage("find_mentions", rows_in=20) as stage:
+        stage["rows_out"] = 19
+        stage["match"] = {"seconds_per_drug": 0.5}
+
+    paths = metrics.save(str(tmp_path), "pipeline")
+
+    saved = json.loads(open(paths["json"], encoding="utf-8").read())
+    assert saved["labels"] == {"mode": 'say "hi"'}
+    assert saved["stages"][0]["rows_out"] == 19
+    lines = open(paths["prometheus"], encoding="utf-8").read().splitlines()
+    labels = '{mode="say \\"hi\\"",stage="find_mentions"}'
+    assert f"drug_pipeline_stage_rows_out{labels} 19" in lines
+    assert f"drug_pipeline_match_seconds_per_drug{labels} 0.5" in lines
+    assert "# TYPE drug_pipeline_stage_wall_seconds gauge" in lines
+
+
+def test_count_rows():
+    frames = {"PubMed": pd.DataFrame({"id": [1, 2]}), "Drugs": None}
+
+    assert count_rows(frames) == 2
+    assert count_rows(pd.DataFrame({"id": [1]})) == 1
+    assert count_rows({"DRUG": {}}) == 1
+    assert count_rows(object()) is None
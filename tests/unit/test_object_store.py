@@ -0,0 +1,326 @@
+import importlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+import pandas as pd
+import pytest
+from src.data_extract.extract import SOURCE_SCHEMAS, load_file
+from src.data_extract.ingest import load_sources, resolve_input_files
+from src.data_extract.object_store import (
+    ObjectStoreReader,
+    is_object_url,
+    set_object_store,
+    split_object_url,
+    token_from_environment,
+)
+from src.data_transform import incremental
+
+
+class _EmulatorHandler(BaseHTTPRequestHandler):
+    """Path-style S3 subset: ListObjectsV2, HEAD and ranged GET, keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately: do not wait on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b""):
+        self.send_response(status)
+        # HEAD answers the size of the object without sending it
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _list(self, bucket, query):
+        prefix = query.get("prefix", [""])[0]
+        page_size = int(query.get("max-keys", ["1000"])[0])
+        start = int(query.get("continuation-token", ["0"])[0])
+        keys = sorted(key for key in bucket if key.startswith(prefix))
+        end = start + page_size
+        contents = "".join(
+            f"<Contents><Key>{escape(key)}</Key><Size>{len(bucket[key])}</Size>"
+            "</Contents>"
+            for key in keys[start:end]
+        )
+        truncated = end < len(keys)
+        token = f"<NextContinuationToken>{end}</NextContinuationToken>"
+        body = (
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"{contents}<IsTruncated>{str(truncated).lower()}</IsTruncated>"
+            f"{token if truncated else ''}</ListBucketResult>"
+        )
+        self._send(200, body.encode("utf-8"))
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        bucket_name, _, key = unquote(parts.path).lstrip("/").partition("/")
+        bucket = self.server.buckets.get(bucket_name, {})
+        self.server.requests.append((self.command, key, self.headers.get("Range")))
+        failures = self.server.failures.get(key or "?list")
+        if failures:
+            status, body = failures.pop(0)
+            return self._send(status, body)
+        if not key:
+            return self._list(bucket, parse_qs(parts.query))
+        if key not in bucket:
+            return self._send(404, b"<Error><Code>NoSuchKey</Code></Error>")
+        data = bucket[key]
+        byte_range = self.headers.get("Range")
+        if self.command == "HEAD" or not byte_range:
+            return self._send(200, data)
+        first, _, last = byte_range.partition("=")[2].partition("-")
+        start, end = int(first), int(last) + 1 if last else len(data)
+        self._send(206, data[start:end])
+
+    do_HEAD = do_GET
+
+
+@pytest.fixture
+def emulator():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EmulatorHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = []
+    server.buckets = {"bucket": {}}
+    # Responses sent instead of the next requests of a key ("?list": listings)
+    server.failures = {}
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _reader(server, **kwargs):
+    return ObjectStoreReader(
+        endpoint=f"http://127.0.0.1:{server.server_address[1]}", **kwargs
+    )
+
+
+@pytest.fixture
+def store(emulator):
+    reader = _reader(emulator, connections=4)
+    set_object_store(reader)
+    yield emulator
+    set_object_store(None)
+
+
+def test_object_urls():
+    assert is_object_url("gs://bucket/pubmed.csv")
+    assert is_object_url("S3://bucket/")
+    assert not is_object_url("data/pubmed.csv")
+    assert split_object_url("s3://bucket/a/b.csv") == ("s3", "bucket", "a/b.csv")
+    with pytest.raises(ValueError):
+        split_object_url("s3:///key")
+
+
+def test_token_from_environment(monkeypatch):
+    monkeypatch.setenv("OBJECT_STORE_TOKEN", "abc")
+    monkeypatch.setenv("OBJECT_STORE_TOKEN_EXPIRY", "2030-01-01T10:00:00")
+
+    assert token_from_environment() == (
+        "abc",
+        datetime(2030, 1, 1, 10, tzinfo=timezone.utc),
+    )
+
+
+def test_expired_token_is_renewed():
+    soon = datetime.now(timezone.utc) + timedelta(milliseconds=50)
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    tokens = [("fresh", later)]
+    reader = ObjectStoreReader(
+        token="first", token_expiry=soon, token_provider=tokens.pop
+    )
+
+    first = reader.filesystem("gs")
+    assert reader.filesystem("gs") is first
+    time.sleep(0.1)
+    assert reader.filesystem("gs") is not first
+    assert tokens == []
+
+    expired = ObjectStoreReader(token="old", token_expiry=soon - timedelta(hours=1))
+    with pytest.raises(PermissionError):
+        expired.filesystem("gs")
+
+
+def test_list_and_read_many(emulator):
+    objects = {f"daily/{day:04d}.csv": f"id\n{day}\n".encode() for day in range(250)}
+    emulator.buckets["bucket"].update(objects)
+    emulator.buckets["bucket"]["other/skipped.csv"] = b"id\n"
+    emulator.buckets["bucket"]["daily-notes.txt"] = b"skipped"
+    reader = _reader(emulator, connections=4)
+
+    try:
+        listed = reader.list_objects("s3://bucket/daily/")
+        prefixed = reader.list_objects("s3://bucket/daily/000")
+        results = reader.read_many([url for url, _ in listed] + ["s3://bucket/no"])
+    finally:
+        reader.close()
+
+    assert [url for url, _ in listed] == [f"s3://bucket/{key}" for key in objects]
+    assert [url for url, _ in prefixed] == [
+        f"s3://bucket/daily/000{day}.csv" for day in range(10)
+    ]
+    assert dict(results[:-1]) == {
+        f"s3://bucket/{key}": data for key, data in objects.items()
+    }
+    assert results[-1] == ("s3://bucket/no", None)
+
+
+def test_open_reads_ranges(emulator):
+    data = bytes(range(256)) * 10
+    emulator.buckets["bucket"]["blob.bin"] = data
+    reader = _reader(emulator)
+
+    try:
+        with reader.open("gs://bucket/blob.bin") as stream:
+            head = stream.read(150)
+            stream.seek(-30, 2)
+            tail = stream.read()
+        middle = reader.read("gs://bucket/blob.bin", 100, 120)
+        assert reader.size("gs://bucket/blob.bin") == len(data)
+        with pytest.raises(FileNotFoundError):
+            reader.open("gs://bucket/missing.bin")
+        with pytest.raises(FileNotFoundError):
+            reader.size("gs://bucket/missing.bin")
+    finally:
+        reader.close()
+
+    assert (head, tail, middle) == (data[:150], data[-30:], data[100:120])
+    gets = [
+        request for request in emulator.requests if request[:2] == ("GET", "blob.bin")
+    ]
+    assert gets and all(byte_range for _, _, byte_range in gets)
+
+
+def test_transient_errors_are_retried(emulator):
+    emulator.buckets["bucket"]["flaky.csv"] = b"id\n1\n"
+    emulator.failures["flaky.csv"] = [(503, b"<Error><Code>SlowDown</Code></Error>")]
+    reader = _reader(emulator)
+
+    try:
+        assert reader.read("s3://bucket/flaky.csv") == b"id\n1\n"
+    finally:
+        reader.close()
+
+    assert [method for method, key, _ in emulator.requests if key == "flaky.csv"][
+        :2
+    ] == ["HEAD", "HEAD"]
+
+
+def test_errors_are_reported(emulator, caplog):
+    emulator.buckets["bucket"]["secret.csv"] = b"id\n"
+    emulator.buckets["bucket"]["ok.csv"] = b"id\n2\n"
+    denied = (403, b"<Error><Code>AccessDenied</Code></Error>")
+    emulator.failures["secret.csv"] = [denied] * 8
+    emulator.failures["?list"] = [(200, b"<ListBucketResult><Contents>")]
+    reader = _reader(emulator)
+
+    try:
+        results = reader.read_many(["s3://bucket/secret.csv", "s3://bucket/ok.csv"])
+        with pytest.raises(OSError):
+            reader.list_objects("s3://bucket/")
+    finally:
+        reader.close()
+
+    assert results == [
+        ("s3://bucket/secret.csv", None),
+        ("s3://bucket/ok.csv", b"id\n2\n"),
+    ]
+    assert "Failed to read s3://bucket/secret.csv" in caplog.text
+    # Access errors are not retried
+    assert len(emulator.failures["secret.csv"]) == 7
+
+
+def test_loaders_read_objects(store, tmp_path):
+    pubmed = pd.DataFrame(
+        {
+            "id": [str(i) for i in range(60)],
+            "title": [f"Drug study {i}" for i in range(60)],
+            "date": ["01/01/2020"] * 60,
+            "journal": [f"Journal {i % 3}" for i in range(60)],
+        }
+    )
+    bucket = store.buckets["bucket"]
+    bucket["pubmed.csv"] = pubmed.to_csv(index=False).encode()
+    bucket["pubmed.json"] = pubmed.to_json(orient="records").encode()
+    pubmed.to_parquet(tmp_path / "pubmed.parquet")
+    bucket["pubmed.parquet"] = (tmp_path / "pubmed.parquet").read_bytes()
+    for start in range(0, 60, 20):
+        end = start + 20
+        part = pubmed.iloc[start:end].to_csv(index=False).encode()
+        bucket[f"daily/{start:02d}.csv"] = part
+    schema = SOURCE_SCHEMAS["pubmed"]
+    expected = load_file(_write(tmp_path, pubmed), schema=schema)
+
+    for name in ("pubmed.csv", "pubmed.json", "pubmed.parquet"):
+        url = f"s3://bucket/{name}"
+        pd.testing.assert_frame_equal(load_file(url, schema=schema), expected)
+        chunks = list(load_file(url, chunksize=25, schema=schema))
+        assert [len(chunk) for chunk in chunks] == [25, 25, 10]
+    assert load_file("s3://bucket/missing.csv") is None
+
+    assert resolve_input_files("s3://bucket/daily/*.csv") == [
+        "s3://bucket/daily/00.csv",
+        "s3://bucket/daily/20.csv",
+        "s3://bucket/daily/40.csv",
+    ]
+    result = load_sources({"PubMed": ("s3://bucket/daily/", schema)})
+    pd.testing.assert_frame_equal(result["PubMed"], expected)
+
+
+@pytest.fixture
+def pipeline_store(emulator):
+    # The pipeline imports the modules without the "src." prefix
+    module = importlib.import_module(incremental.get_object_store.__module__)
+    module.set_object_store(_reader(emulator, connections=4))
+    yield emulator
+    module.set_object_store(None)
+
+
+def test_incremental_reads_objects(pipeline_store, tmp_path):
+    store = pipeline_store
+    bucket = store.buckets["bucket"]
+    pd.DataFrame({"atccode": ["A1"], "drug": ["ASPIRIN"]}).to_csv(
+        tmp_path / "drugs.csv", index=False
+    )
+    bucket["daily/01.csv"] = b"id,title,date,journal\n1,Aspirin,01/01/2019,J1\n"
+    bucket["trials.csv"] = b"id,scientific_title,date,journal\nNCT1,Aspirin,,J2\n"
+
+    def run():
+        return incremental.update_mention_table(
+            files={
+                "pubmed": "s3://bucket/daily/",
+                "clinical_trials": "s3://bucket/trials.csv",
+            },
+            drugs_file=str(tmp_path / "drugs.csv"),
+            state_dir=str(tmp_path / "state"),
+            synonyms_file=None,
+        )
+
+    assert run()["title"].tolist() == ["Aspirin", "Aspirin"]
+
+    bucket["daily/01.csv"] += b"2,Aspirin again,01/01/2019,J1\n"
+    store.requests.clear()
+    assert run()["title"].tolist() == ["Aspirin", "Aspirin Again", "Aspirin"]
+    # The appended row was read alone, by a ranged request
+    assert ("GET", "daily/01.csv", "bytes=46-75") in store.requests
+
+
+def _write(tmp_path, df):
+    path = tmp_path / "pubmed.csv"
+    df.to_csv(path, index=False)
+    return str(path)
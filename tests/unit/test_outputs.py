@@ -0,0 +1,40 @@
+import os
+
+import pytest
+from src.data_load.outputs import save_graph
+
+RELATIONSHIPS = {
+    "DrugA": {
+        "publications": [
+            {
+                "source": "pubmed",
+                "title": "DrugA study",
+                "journal": "Journal1",
+                "date": "2020-01-01",
+            }
+        ]
+    }
+}
+
+
+def _save(tmp_path, formats):
+    save_graph(
+        RELATIONSHIPS,
+        RELATIONSHIPS,
+        formats=formats,
+        json_path=str(tmp_path / "graph.json"),
+        index_dir=str(tmp_path / "index"),
+        parquet_dir=str(tmp_path / "parquet"),
+    )
+    return sorted(os.listdir(tmp_path))
+
+
+def test_only_requested_formats_are_written(tmp_path):
+    assert _save(tmp_path / "parquet_only", ["parquet"]) == ["parquet"]
+    assert _save(tmp_path / "json_only", ["json"]) == ["graph.json", "index"]
+
+
+def test_unknown_format_is_rejected_before_writing(tmp_path):
+    with pytest.raises(ValueError):
+        _save(tmp_path, ["json", "csv"])
+    assert os.listdir(tmp_path) == []
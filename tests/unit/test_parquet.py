@@ -0,0 +1,125 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+from src.data_load.parquet import (
+    drug_partition_key,
+    mentions_to_arrow,
+    save_to_parquet,
+)
+from src.data_transform.drug_mentions import find_mention_table
+from src.data_transform.relationships import build_relationships
+
+
+@pytest.fixture
+def mention_table():
+    pubmed_df = pd.DataFrame(
+        {
+            "title": ["DrugA and DrugB", "DrugA again"],
+            "journal": ["Journal1", "Journal2"],
+            "date": ["2019-01-01", ""],
+        }
+    )
+    clinical_trials_df = pd.DataFrame(
+        {
+            "scientific_title": ["DrugB trial"],
+            "journal": ["Journal1"],
+            "date": ["2020-02-01"],
+        }
+    )
+    drugs_df = pd.DataFrame({"drug": ["DrugA", "DrugB"]})
+    return find_mention_table(pubmed_df, clinical_trials_df, drugs_df)
+
+
+def _read(path, **kwargs):
+    table = ds.dataset(path, partitioning="hive").to_table(**kwargs).to_pandas()
+    table = table.astype(object)
+    return table.sort_values(list(table.columns)).reset_index(drop=True)
+
+
+def test_partitioned_by_source(mention_table, tmp_path):
+    path = str(tmp_path / "parquet")
+    save_to_parquet(mention_table, path, compression="zstd")
+
+    assert sorted(os.listdir(path)) == ["source=clinical_trials", "source=pubmed"]
+    pubmed = _read(path, filter=ds.field("source") == "pubmed", columns=["drug"])
+    assert pubmed["drug"].tolist() == ["DrugA", "DrugA", "DrugB"]
+
+    file_path = os.path.join(path, "source=pubmed", "part-0.parquet")
+    column = pq.ParquetFile(file_path).metadata.row_group(0).column(0)
+    assert column.compression == "ZSTD"
+    assert column.has_dictionary_page
+
+
+def test_relationships_and_mention_table_agree(mention_table, tmp_path):
+    save_to_parquet(mention_table, str(tmp_path / "table"), ["source", "year"])
+    save_to_parquet(
+        build_relationships(mention_table), str(tmp_path / "graph"), ["source", "year"]
+    )
+
+    table = _read(str(tmp_path / "table"))
+    assert table.equals(_read(str(tmp_path / "graph")))
+    assert len(table) == 4
+    assert sorted(os.listdir(tmp_path / "table" / "source=pubmed")) == [
+        "year=2019",
+        "year=__HIVE_DEFAULT_PARTITION__",
+    ]
+
+
+def test_string_columns_are_dictionary_encoded(mention_table):
+    table = mentions_to_arrow(mention_table)
+
+    assert table.column_names == ["drug", "source", "title", "journal", "date", "year"]
+    assert all(pa.types.is_dictionary(field.type) for field in table.schema)
+
+
+def test_rewrite_replaces_previous_dataset(mention_table, tmp_path):
+    path = str(tmp_path / "parquet")
+    save_to_parquet(mention_table, path, ["source", "drug"])
+    save_to_parquet(mention_table, path, ["source"])
+
+    assert sorted(os.listdir(path)) == ["source=clinical_trials", "source=pubmed"]
+
+
+def test_drug_partitions_use_safe_folder_names(tmp_path):
+    mentions = pd.DataFrame(
+        {
+            "drug": ["A/B", "..", "ASPIRIN"],
+            "source": ["pubmed"] * 3,
+            "title": ["t1", "t2", "t3"],
+            "journal": ["J"] * 3,
+            "date": ["2020-01-01"] * 3,
+        }
+    )
+    path = str(tmp_path / "parquet")
+    save_to_parquet(mentions, path, ["source", "drug", "year"])
+
+    folders = sorted(os.listdir(os.path.join(path, "source=pubmed")))
+    assert folders == sorted(
+        f"drug_key={drug_partition_key(drug)}" for drug in ["A/B", "..", "ASPIRIN"]
+    )
+    assert drug_partition_key("ASPIRIN") == "ASPIRIN"
+    assert drug_partition_key("A/B").startswith("A_B-")
+    assert drug_partition_key("A B") != drug_partition_key("A/B")
+    key = drug_partition_key("A/B")
+    table = _read(path, filter=ds.field("drug_key") == key, columns=["drug", "year"])
+    assert table.values.tolist() == [["A/B", 2020]]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"partition_by": ["title"]},
+        {"partition_by": ["drug"]},
+        {"partition_by": ["year", "source"]},
+        {"partition_by": ["source", "drug", "drug"]},
+        {"partition_by": []},
+        {"compression": "unknown"},
+    ],
+)
+def test_invalid_options(mention_table, tmp_path, options):
+    with pytest.raises(ValueError):
+        save_to_parquet(mention_table, str(tmp_path / "parquet"), **options)
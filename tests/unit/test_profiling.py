@@ -0,0 +1,59 @@
+import pstats
+import time
+
+import pytest
+from src.monitoring.metrics import PipelineMetrics
+from src.monitoring.profiling import StageProfiler, profile_run_dir, profiling_enabled
+
+
+def _busy_stage():
+    rows = [str(value) * 10 for value in range(20_000)]
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        sorted(rows)
+    return rows
+
+
+@pytest.mark.parametrize(
+    "value, expected", [(None, False), ("1", True), ("TRUE", True), ("0", False)]
+)
+def test_profiling_enabled_reads_environment(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("PIPELINE_PROFILE", raising=False)
+    else:
+        monkeypatch.setenv("PIPELINE_PROFILE", value)
+
+    assert profiling_enabled() is expected
+
+
+def test_profile_run_dir(monkeypatch, tmp_path):
+    monkeypatch.delenv("PIPELINE_PROFILE_DIR", raising=False)
+    assert profile_run_dir("profiles", "manual__2025-02-21T10:00") == (
+        "profiles/manual__2025-02-21T10_00"
+    )
+
+    monkeypatch.setenv("PIPELINE_PROFILE_DIR", str(tmp_path))
+    assert profile_run_dir("profiles", "run") == str(tmp_path / "run")
+
+
+def test_stage_reports(tmp_path):
+    profiler = StageProfiler(str(tmp_path), sample_interval=0.001)
+    metrics = PipelineMetrics(enabled=False, profiler=profiler)
+
+    with metrics.stage("clean data"):
+        _busy_stage()
+
+    paths = profiler.reports["clean data"]
+    assert paths["pstats"] == str(tmp_path / "clean_data.pstats")
+    stats = pstats.Stats(paths["pstats"])
+    assert any(function[2] == "_busy_stage" for function in stats.stats)
+    assert "_busy_stage" in open(paths["pstats_text"], encoding="utf-8").read()
+
+    allocations = open(paths["allocations"], encoding="utf-8").read()
+    assert allocations.startswith("Peak traced memory:")
+    assert "monitoring/profiling.py" not in allocations
+
+    collapsed = open(paths["collapsed"], encoding="utf-8").read().splitlines()
+    assert collapsed
+    stack, count = collapsed[0].rsplit(" ", 1)
+    assert "_busy_stage (test_profiling.py" in stack and int(count) > 0
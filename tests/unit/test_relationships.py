@@ -1,5 +1,15 @@
+import pandas as pd
 import pytest
-from src.data_transform.relationships import build_relationships
+from src.data_transform.drug_mentions import (
+    find_mention_table,
+    mention_table_to_records,
+)
+from src.data_load.load import save_to_json
+from src.data_transform.relationships import (
+    RelationshipGraph,
+    build_relationship_graph,
+    build_relationships,
+)
 
 
 @pytest.fixture
@@ -29,3 +39,64 @@ def test_build_relationships(mentions):
     assert "paracetamol" in relationships
     assert len(relationships["aspirin"]["publications"]) == 1
     assert relationships["aspirin"]["publications"][0]["journal"] == "Nature"
+
+
+@pytest.fixture
+def mention_table():
+    pubmed_df = pd.DataFrame(
+        {
+            "title": ["Aspirin and paracetamol", "Paracetamol usage"],
+            "journal": ["Nature", "Science"],
+            "date": ["2023-01-01", None],
+        }
+    )
+    clinical_trials_df = pd.DataFrame(
+        {
+            "scientific_title": ["Aspirin trial"],
+            "journal": ["Lancet"],
+            "date": ["2023-03-01"],
+        }
+    )
+    drugs_df = pd.DataFrame({"drug": ["paracetamol", "aspirin"]})
+    return find_mention_table(pubmed_df, clinical_trials_df, drugs_df)
+
+
+def test_build_relationships_from_mention_table(mention_table):
+    table = mention_table
+    relationships = build_relationships(table)
+
+    assert relationships == build_relationships(mention_table_to_records(table))
+    assert list(relationships) == ["paracetamol", "aspirin"]
+    assert [p["journal"] for p in relationships["aspirin"]["publications"]] == [
+        "Nature",
+        "Lancet",
+    ]
+    assert relationships["paracetamol"]["publications"][1]["date"] == ""
+
+
+def test_graph_reads_as_relationships(mention_table):
+    graph = build_relationship_graph(mention_table)
+
+    assert isinstance(graph, RelationshipGraph)
+    assert graph == build_relationships(mention_table)
+    assert list(graph) == ["paracetamol", "aspirin"]
+    assert "aspirin" in graph and "ibuprofen" not in graph
+    # "Aspirin and paracetamol" mentions both drugs but is stored once
+    assert (graph.mentions, graph.publications) == (4, 3)
+    assert graph.to_mention_frame().to_dict("records") == [
+        {"drug": drug, **publication}
+        for drug, entry in graph.items()
+        for publication in entry["publications"]
+    ]
+
+
+def test_graph_from_records_and_empty_graph(mentions, tmp_path):
+    graph = build_relationship_graph(mentions + [{"drug": " "}])
+
+    assert graph == build_relationships(mentions)
+    assert "Aspirin and its effects" in repr(graph)
+
+    empty = build_relationship_graph([])
+    assert len(empty) == 0 and empty == {}
+    save_to_json(empty, str(tmp_path / "graph.json"))
+    assert (tmp_path / "graph.json").read_text(encoding="utf-8") == "{}"
@@ -0,0 +1,102 @@
+import ast
+import os
+import subprocess
+import sys
+
+from src.benchmark.startup import (
+    DAG_FILE,
+    PROJECT_ROOT,
+    check_budgets,
+    measure_dag_parse,
+    measure_import,
+    parse_importtime,
+)
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      5000 |       5300 |   config
+import time:       300 |       5600 | main
+"""
+
+
+def test_parse_importtime():
+    modules = parse_importtime(IMPORTTIME)
+
+    assert modules["main"] == {"self_us": 300, "cumulative_us": 5600, "depth": 0}
+    assert modules["config"]["depth"] == 1
+    assert list(modules) == ["_io", "config", "main"]
+
+
+def test_main_import_stays_light():
+    result = measure_import("main", runs=1)
+
+    assert result["heavy_modules"] == []
+    assert 0 < result["seconds"] and len(result["slowest_imports"]) <= 10
+
+
+def test_src_modules_import_without_side_effects():
+    modules = [
+        os.path.relpath(os.path.join(root, name), os.path.join(PROJECT_ROOT, "src"))
+        for root, _, files in os.walk(os.path.join(PROJECT_ROOT, "src"))
+        for name in files
+        if name.endswith(".py") and name != "__init__.py"
+    ]
+    names = [module[:-3].replace(os.sep, ".") for module in modules]
+    script = (
+        "import importlib, logging\n"
+        f"for name in {sorted(names)!r}:\n"
+        "    importlib.import_module(name)\n"
+        "assert not logging.getLogger().handlers, logging.getLogger().handlers\n"
+    )
+
+    process = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": f"{PROJECT_ROOT}:{PROJECT_ROOT}/src"},
+    )
+
+    assert process.returncode == 0, process.stderr
+    assert process.stdout == ""
+
+
+def test_dag_file_defers_pipeline_imports():
+    with open(DAG_FILE, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+
+    imported = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            imported.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imported.add(node.module.split(".")[0])
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+            raise AssertionError(f"Call at import time, line {node.lineno}")
+
+    assert imported == {"os", "sys", "airflow", "datetime", "logging", "config"}
+
+
+def test_dag_parse_measure(tmp_path):
+    dag_file = tmp_path / "dag.py"
+    dag_file.write_text("import json\nTASKS = [1, 2]\n", encoding="utf-8")
+
+    result = measure_dag_parse(str(dag_file), runs=1, preload=("json",))
+
+    assert result["heavy_modules"] == []
+    assert result["seconds"] < 1
+    assert measure_dag_parse(str(dag_file), runs=1, preload=("no_such_mod",)) is None
+
+
+def test_check_budgets():
+    results = {
+        "main_import": {"seconds": 0.3, "heavy_modules": ["pandas"]},
+        "dag_parse": None,
+    }
+
+    assert check_budgets(results, {"main_import": 0.1, "dag_parse": 0.5}) == [
+        "main_import took 0.300s > 0.1s",
+        "main_import imported pandas",
+    ]
+    assert check_budgets(results, {"main_import": 1.0}) == [
+        "main_import imported pandas"
+    ]
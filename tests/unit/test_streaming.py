@@ -0,0 +1,143 @@
+import pandas as pd
+import pytest
+from src.data_transform.data_cleaning import clean_data
+from src.data_transform.drug_mentions import find_mention_table
+from src.data_transform.relationships import build_relationships
+from src.data_transform.streaming import (
+    iter_clean_publication_chunks,
+    stream_relationships,
+)
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    drugs = pd.DataFrame(
+        {"atccode": ["A1", "B2", "C3"], "drug": ["ASPIRIN", "ETHANOL", "ATROPINE"]}
+    )
+    pubmed = pd.DataFrame(
+        {
+            "id": [1, 2, 2, 3, 4, 5, 1],
+            "title": [
+                "Atropine and aspirin",
+                "Ethanol intoxication",
+                "Duplicate of 2 with aspirin",
+                None,
+                "Aspirin, again",
+                "Nothing relevant",
+                "Duplicate of 1 with ethanol",
+            ],
+            "date": ["01/01/2019"] * 7,
+            "journal": ["J1", "J2", "J2", "J3", "J1", "J4", "J1"],
+        }
+    )
+    clinical_trials = pd.DataFrame(
+        {
+            "id": ["NCT1", "NCT2", "NCT3"],
+            "scientific_title": ["Ethanol trial", "Aspirin trial", "Atropine trial"],
+            "date": ["1 January 2020", "2 January 2020", "3 January 2020"],
+            "journal": ["J5", "J5", "J6"],
+        }
+    )
+    files = {}
+    for name, df in [
+        ("drugs", drugs),
+        ("pubmed", pubmed),
+        ("clinical_trials", clinical_trials),
+    ]:
+        files[name] = str(tmp_path / f"{name}.csv")
+        df.to_csv(files[name], index=False)
+    return files
+
+
+def batch_relationships(files):
+    cleaned = clean_data(
+        {
+            "Drugs": pd.read_csv(files["drugs"]),
+            "PubMed": pd.read_csv(files["pubmed"]),
+            "ClinicalTrials": pd.read_csv(files["clinical_trials"]),
+        }
+    )
+    return build_relationships(
+        find_mention_table(
+            cleaned["PubMed"], cleaned["ClinicalTrials"], cleaned["Drugs"]
+        )
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_stream_relationships_matches_batch(csv_files, chunk_size):
+    relationships = stream_relationships(
+        files={
+            "pubmed": csv_files["pubmed"],
+            "clinical_trials": csv_files["clinical_trials"],
+        },
+        drugs_file=csv_files["drugs"],
+        chunk_size=chunk_size,
+    )
+
+    expected = batch_relationships(csv_files)
+    assert relationships == expected
+    assert list(relationships) == list(expected)
+
+
+def test_iter_clean_publication_chunks_keeps_first_occurrence():
+    chunks = [
+        pd.DataFrame(
+            {"id": [1, 2], "title": ["A", "B"], "date": ["", ""], "journal": ["J", "J"]}
+        ),
+        pd.DataFrame(
+            {
+                "id": ["2", 3],
+                "title": ["C", "D"],
+                "date": ["", ""],
+                "journal": ["J", "J"],
+            }
+        ),
+    ]
+
+    cleaned = list(iter_clean_publication_chunks(chunks, "title"))
+
+    assert cleaned[0]["title"].tolist() == ["A", "B"]
+    assert cleaned[1]["title"].tolist() == ["D"]
+    assert cleaned[1].index.tolist() == [0]
+
+
+def test_stream_relationships_reads_pubmed_csv_and_json(csv_files, tmp_path):
+    json_path = tmp_path / "pubmed.json"
+    json_path.write_text(
+        '[{"id": 6, "title": "Atropine study", "date": "01/01/2020", "journal": "J7"},'
+        ' {"id": "1", "title": "Duplicate id", "date": "", "journal": "J7"},]',
+        encoding="utf-8",
+    )
+
+    relationships = stream_relationships(
+        files={
+            "pubmed": [csv_files["pubmed"], str(json_path)],
+            "clinical_trials": csv_files["clinical_trials"],
+        },
+        drugs_file=csv_files["drugs"],
+        chunk_size=2,
+    )
+
+    titles = [pub["title"] for pub in relationships["ATROPINE"]["publications"]]
+    assert titles == ["Atropine And Aspirin", "Atropine Study", "Atropine Trial"]
+    assert "Duplicate Id" not in str(relationships)
+
+
+def test_stream_relationships_reads_directories(csv_files, tmp_path):
+    folder = tmp_path / "pubmed"
+    folder.mkdir()
+    pubmed = pd.read_csv(csv_files["pubmed"])
+    pubmed[:4].to_csv(folder / "2020-01.csv", index=False)
+    pubmed[4:].to_csv(folder / "2020-02.csv", index=False)
+
+    relationships = stream_relationships(
+        files={
+            "pubmed": str(folder),
+            "clinical_trials": csv_files["clinical_trials"],
+        },
+        drugs_file=csv_files["drugs"],
+        chunk_size=2,
+    )
+
+    assert relationships == batch_relationships(csv_files)
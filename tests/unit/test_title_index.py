@@ -0,0 +1,151 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_load.title_index import TitleIndex, build_title_index, title_terms
+from src.main import main
+
+DATAFRAMES = {
+    "PubMed": pd.DataFrame(
+        {
+            "id": ["1", "2", "3", "4"],
+            "title": [
+                "Aspirin And Heart Disease",
+                "Heart Failure Treated With Aspirin",
+                "Ethanol Study",
+                np.nan,
+            ],
+            "journal": ["Journal A", "Journal B", "Journal A", "Journal A"],
+            "date": ["2020-01-01", "2020-03-15", None, "2019-12-31"],
+        }
+    ),
+    "ClinicalTrials": pd.DataFrame(
+        {
+            "id": ["NCT01"],
+            "scientific_title": ["Épinéphrine In Heart Surgery"],
+            "journal": ["Journal B"],
+            "date": ["2020-02-01"],
+        }
+    ),
+    "Drugs": pd.DataFrame({"atccode": ["A01"], "drug": ["ASPIRIN"]}),
+}
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    build_title_index(DATAFRAMES, str(tmp_path / "title_index"))
+    return str(tmp_path / "title_index")
+
+
+def _reference_ids(terms=None, journal=None, start=None, end=None):
+    """Ids matching the filters, computed with pandas on the frames themselves."""
+    rows = pd.concat(
+        [
+            DATAFRAMES["PubMed"],
+            DATAFRAMES["ClinicalTrials"].rename(columns={"scientific_title": "title"}),
+        ],
+        ignore_index=True,
+    )
+    keep = pd.Series(True, index=rows.index)
+    for word in title_terms(terms or ""):
+        keep &= rows["title"].map(
+            lambda title: isinstance(title, str) and word in title_terms(title)
+        )
+    if journal is not None:
+        keep &= rows["journal"] == journal
+    dates = pd.to_datetime(rows["date"])
+    if start is not None:
+        keep &= dates >= pd.Timestamp(start)
+    if end is not None:
+        keep &= dates <= pd.Timestamp(end)
+    return rows.loc[keep, "id"].tolist()
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"terms": "heart"},
+        {"terms": "ASPIRIN heart"},
+        {"terms": "heart", "journal": "Journal B"},
+        {"terms": "aspirin", "start": "2020-02-01"},
+        {"journal": "Journal A"},
+        {"start": "2020-01-01", "end": "2020-02-01"},
+        {"end": "2020-12-31"},
+        {"terms": "unknown"},
+        {"journal": "Unknown"},
+    ],
+)
+def test_search_matches_pandas_filters(index_dir, filters):
+    index = TitleIndex(index_dir)
+
+    found = index.publications(index.search(**filters))
+
+    assert [publication["id"] for publication in found] == _reference_ids(**filters)
+
+
+def test_publications_read_back_documents(index_dir):
+    index = TitleIndex(index_dir)
+
+    result = index.query(terms="heart", limit=2)
+
+    assert len(index) == 5
+    assert result["count"] == 3
+    assert result["publications"] == [
+        {
+            "source": "pubmed",
+            "id": "1",
+            "title": "Aspirin And Heart Disease",
+            "journal": "Journal A",
+            "date": "2020-01-01",
+        },
+        {
+            "source": "pubmed",
+            "id": "2",
+            "title": "Heart Failure Treated With Aspirin",
+            "journal": "Journal B",
+            "date": "2020-03-15",
+        },
+    ]
+    # Missing dates read back empty and never match a date range
+    assert index.query(terms="ethanol")["publications"][0]["date"] == ""
+    assert index.search(terms="ethanol", start="1900-01-01").size == 0
+    assert index.query(terms="épinéphrine")["publications"][0]["source"] == (
+        "clinical_trials"
+    )
+
+
+def test_search_requires_a_valid_filter(index_dir):
+    index = TitleIndex(index_dir)
+
+    with pytest.raises(ValueError):
+        index.search()
+    with pytest.raises(ValueError):
+        index.search(terms="--")
+    with pytest.raises(ValueError):
+        index.search(start="01/02/2020")
+
+
+def test_query_command_prints_json(index_dir, capsys):
+    main(
+        [
+            "query",
+            "--term",
+            "aspirin",
+            "--journal",
+            "Journal B",
+            "--from",
+            "2020-01-01",
+            "--index-dir",
+            index_dir,
+        ]
+    )
+
+    printed = json.loads(capsys.readouterr().out)
+    assert printed["count"] == 1
+    assert printed["publications"][0]["id"] == "2"
+
+
+def test_query_command_without_index_fails(tmp_path):
+    with pytest.raises(SystemExit):
+        main(["query", "--term", "aspirin", "--index-dir", str(tmp_path / "none")])